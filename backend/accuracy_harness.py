@@ -0,0 +1,379 @@
+"""
+Accuracy Regression Harness
+Runs the internal calculator over recorded Prokerala reference charts (golden fixtures)
+across worker processes and reports sign, nakshatra, pada and degree mismatches
+
+Fixtures are JSONL, one recorded chart per line:
+  {"id": "...", "datetime": "1989-04-04T21:04:00+05:30", "latitude": 17.385, "longitude": 78.4867,
+   "birth_details": {...Prokerala birth-details data...}, "planet_position": {...planet-position data...}}
+
+Check:   python accuracy_harness.py check fixtures/prokerala.jsonl --workers 8
+Record:  python accuracy_harness.py record births.jsonl fixtures/prokerala.jsonl   (live API, token reused)
+Replay:  python accuracy_harness.py replay fixtures/prokerala.jsonl --port 8790
+         PROKERALA_BASE_URL=http://127.0.0.1:8790 PROKERALA_CLIENT_ID=x PROKERALA_CLIENT_SECRET=y \\
+         python compare_calculations.py
+"""
+
+import json
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from vedic_calculator import get_full_birth_chart
+from compare_calculations import normalize_sign, normalize_nakshatra
+from timezones import parse_local_datetime
+
+PLANET_NAMES = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+
+# Prokerala's id for the ascendant in planet-position responses
+PROKERALA_ASCENDANT_ID = 100
+
+# Longitude difference (degrees) allowed before a degree mismatch is reported
+DEGREE_TOLERANCE = 0.1
+
+# Sign/nakshatra/pada mismatches this close (degrees) to a boundary are reported as "boundary"
+BOUNDARY_TOLERANCE = 0.05
+
+NAKSHATRA_SPAN = 360 / 27
+PADA_SPAN = NAKSHATRA_SPAN / 4
+
+WORKER_CHUNK_SIZE = 64
+
+
+def fixture_birth_utc(fixture: Dict) -> datetime:
+    """Naive UTC datetime for a fixture's offset-aware local datetime"""
+    return parse_local_datetime(fixture["datetime"])
+
+
+def distance_to_boundary(longitude: float, span: float) -> float:
+    """Degrees from longitude to the nearest multiple of span"""
+    offset = longitude % span
+    return min(offset, span - offset)
+
+
+def angular_difference(a: float, b: float) -> float:
+    diff = abs(a - b) % 360
+    return 360 - diff if diff > 180 else diff
+
+
+def classify(field: str, body: str, internal, reference, longitude: float, span: float,
+             boundary_tolerance: float) -> Dict:
+    """Build a mismatch record, flagging ones that sit on a boundary"""
+    near_boundary = distance_to_boundary(longitude, span) <= boundary_tolerance
+    return {
+        "field": field,
+        "body": body,
+        "internal": internal,
+        "reference": reference,
+        "kind": "boundary" if near_boundary else "mismatch",
+    }
+
+
+def compare_fixture(
+    fixture: Dict,
+    degree_tolerance: float = DEGREE_TOLERANCE,
+    boundary_tolerance: float = BOUNDARY_TOLERANCE,
+) -> Dict:
+    """Compare the internal chart for one fixture against its recorded Prokerala data"""
+    internal = get_full_birth_chart(fixture_birth_utc(fixture), fixture["latitude"], fixture["longitude"])
+    birth = fixture.get("birth_details", {})
+    reference_planets = {
+        p.get("name", "").lower(): p for p in fixture.get("planet_position", {}).get("planet_position", [])
+    }
+    reference_asc = next(
+        (p for p in fixture.get("planet_position", {}).get("planet_position", [])
+         if p.get("id") == PROKERALA_ASCENDANT_ID or p.get("name") == "Ascendant"),
+        None,
+    )
+
+    mismatches = []
+    checks = 0
+
+    # Moon nakshatra and pada (birth details)
+    moon_longitude = internal["planets"]["Moon"]["longitude"]
+    if birth.get("nakshatra"):
+        checks += 2
+        ref_nakshatra = birth["nakshatra"].get("name", "")
+        if normalize_nakshatra(internal["moon_nakshatra"]["name"]) != normalize_nakshatra(ref_nakshatra):
+            mismatches.append(classify("nakshatra", "Moon", internal["moon_nakshatra"]["name"], ref_nakshatra,
+                                       moon_longitude, NAKSHATRA_SPAN, boundary_tolerance))
+        ref_pada = birth["nakshatra"].get("pada")
+        if str(internal["moon_nakshatra"]["pada"]) != str(ref_pada):
+            mismatches.append(classify("pada", "Moon", internal["moon_nakshatra"]["pada"], ref_pada,
+                                       moon_longitude, PADA_SPAN, boundary_tolerance))
+
+    # Planet signs and longitudes
+    for name in PLANET_NAMES:
+        ref = reference_planets.get(name.lower())
+        if not ref:
+            continue
+        planet = internal["planets"][name]
+        checks += 2
+
+        ref_sign = ref.get("rasi", {}).get("name", "")
+        if planet["sign"]["western"].lower() != normalize_sign(ref_sign):
+            mismatches.append(classify("sign", name, planet["sign"]["vedic"], ref_sign,
+                                       planet["longitude"], 30, boundary_tolerance))
+
+        diff = angular_difference(planet["longitude"], ref.get("longitude", 0))
+        if diff > degree_tolerance:
+            mismatches.append({"field": "degree", "body": name, "internal": planet["longitude"],
+                               "reference": ref.get("longitude"), "diff": round(diff, 4), "kind": "mismatch"})
+
+    # Ascendant
+    if reference_asc:
+        asc = internal["ascendant"]
+        checks += 2
+        ref_sign = reference_asc.get("rasi", {}).get("name", "")
+        if asc["sign"]["western"].lower() != normalize_sign(ref_sign):
+            mismatches.append(classify("sign", "Ascendant", asc["sign"]["vedic"], ref_sign,
+                                       asc["longitude"], 30, boundary_tolerance))
+        diff = angular_difference(asc["longitude"], reference_asc.get("longitude", 0))
+        if diff > degree_tolerance:
+            mismatches.append({"field": "degree", "body": "Ascendant", "internal": asc["longitude"],
+                               "reference": reference_asc.get("longitude"), "diff": round(diff, 4),
+                               "kind": "mismatch"})
+
+    return {"id": fixture.get("id"), "checks": checks, "mismatches": mismatches}
+
+
+def compare_chunk(args) -> List[Dict]:
+    """Worker task: compare a chunk of fixtures"""
+    fixtures, degree_tolerance, boundary_tolerance = args
+    results = []
+    for fixture in fixtures:
+        try:
+            results.append(compare_fixture(fixture, degree_tolerance, boundary_tolerance))
+        except (KeyError, TypeError, ValueError) as e:
+            results.append({"id": fixture.get("id"), "checks": 0, "mismatches": [], "error": str(e)})
+    return results
+
+
+def run_harness(
+    fixtures: List[Dict],
+    workers: Optional[int] = None,
+    degree_tolerance: float = DEGREE_TOLERANCE,
+    boundary_tolerance: float = BOUNDARY_TOLERANCE,
+) -> List[Dict]:
+    """Compare all fixtures across worker processes (workers=1 runs inline)"""
+    chunks = [
+        (fixtures[i:i + WORKER_CHUNK_SIZE], degree_tolerance, boundary_tolerance)
+        for i in range(0, len(fixtures), WORKER_CHUNK_SIZE)
+    ]
+    if workers == 1 or len(chunks) <= 1:
+        results = [compare_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(compare_chunk, chunks))
+    return [r for chunk in results for r in chunk]
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """Aggregate mismatch counts by field and body"""
+    summary = {
+        "charts": len(results),
+        "charts_with_mismatches": 0,
+        "errors": sum(1 for r in results if r.get("error")),
+        "checks": sum(r["checks"] for r in results),
+        "mismatches": 0,
+        "boundary": 0,
+        "by_field": {},
+        "max_degree_diff": 0.0,
+    }
+    for result in results:
+        hard = [m for m in result["mismatches"] if m["kind"] == "mismatch"]
+        if hard:
+            summary["charts_with_mismatches"] += 1
+        for m in result["mismatches"]:
+            summary["boundary" if m["kind"] == "boundary" else "mismatches"] += 1
+            key = f"{m['field']}:{m['body']}"
+            field = summary["by_field"].setdefault(key, {"mismatch": 0, "boundary": 0})
+            field[m["kind"]] += 1
+            if m["field"] == "degree":
+                summary["max_degree_diff"] = max(summary["max_degree_diff"], m["diff"])
+    return summary
+
+
+def format_summary(summary: Dict, results: List[Dict], show: int = 10) -> str:
+    output = []
+    output.append("=" * 70)
+    output.append("ACCURACY REGRESSION REPORT")
+    output.append("=" * 70)
+    output.append(f"Charts: {summary['charts']}  Checks: {summary['checks']}  Errors: {summary['errors']}")
+    output.append(f"Mismatches: {summary['mismatches']} in {summary['charts_with_mismatches']} charts "
+                  f"(+{summary['boundary']} within {BOUNDARY_TOLERANCE}° of a boundary)")
+    output.append(f"Max degree difference over tolerance: {summary['max_degree_diff']}°")
+
+    if summary["by_field"]:
+        output.append(f"\n{'Field':<24} {'Mismatch':>9} {'Boundary':>9}")
+        output.append("-" * 44)
+        for key, counts in sorted(summary["by_field"].items()):
+            output.append(f"{key:<24} {counts['mismatch']:>9} {counts['boundary']:>9}")
+
+    failing = [r for r in results if any(m["kind"] == "mismatch" for m in r["mismatches"])]
+    if failing:
+        output.append(f"\nFirst {min(show, len(failing))} failing charts:")
+        for r in failing[:show]:
+            details = "; ".join(
+                f"{m['field']} {m['body']}: {m['internal']} vs {m['reference']}"
+                for m in r["mismatches"] if m["kind"] == "mismatch"
+            )
+            output.append(f"  {r['id']}: {details}")
+
+    return "\n".join(output)
+
+
+def load_fixtures(path: str) -> List[Dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ============================================
+# RECORDING AND REPLAY
+# ============================================
+
+def record_fixtures(births: Iterable[Dict], output_path: str) -> int:
+    """Fetch Prokerala data for birth records and append them as fixtures
+
+    Each birth record needs datetime (ISO with UTC offset), latitude and longitude.
+    The OAuth token is fetched once and reused across all requests.
+    """
+    from compare_calculations import get_prokerala_data
+
+    count = 0
+    with open(output_path, "a") as f:
+        for i, birth in enumerate(births):
+            birth_details, planet_position = get_prokerala_data(
+                birth["datetime"], birth["latitude"], birth["longitude"]
+            )
+            f.write(json.dumps({
+                "id": birth.get("id", f"{birth['datetime']}@{birth['latitude']},{birth['longitude']}"),
+                "datetime": birth["datetime"],
+                "latitude": birth["latitude"],
+                "longitude": birth["longitude"],
+                "birth_details": birth_details,
+                "planet_position": planet_position,
+            }) + "\n")
+            count += 1
+    return count
+
+
+def start_replay_server(fixtures: List[Dict], port: int = 0):
+    """Serve recorded responses on Prokerala's paths; returns (server, stats)
+
+    Tokens are issued by /token with an expiry, and the stats count token
+    issuance so clients can be checked for token reuse.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+    by_request = {
+        (f["datetime"], f"{f['latitude']},{f['longitude']}"): f for f in fixtures
+    }
+    stats = {"tokens_issued": 0, "requests": 0, "misses": 0}
+    lock = threading.Lock()
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, payload: Dict) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if urlparse(self.path).path != "/token":
+                return self.send_json(404, {"error": "not found"})
+            with lock:
+                stats["tokens_issued"] += 1
+                token = f"replay-token-{stats['tokens_issued']}"
+            self.send_json(200, {"access_token": token, "token_type": "Bearer", "expires_in": 3600})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if not self.headers.get("Authorization", "").startswith("Bearer replay-token-"):
+                return self.send_json(401, {"error": "invalid token"})
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            fixture = by_request.get((query.get("datetime"), query.get("coordinates")))
+            with lock:
+                stats["requests"] += 1
+                if fixture is None:
+                    stats["misses"] += 1
+            if fixture is None:
+                return self.send_json(404, {"error": "no recorded response for this request"})
+            if url.path.endswith("/birth-details"):
+                return self.send_json(200, {"status": "ok", "data": fixture["birth_details"]})
+            if url.path.endswith("/planet-position"):
+                return self.send_json(200, {"status": "ok", "data": fixture["planet_position"]})
+            return self.send_json(404, {"error": "not found"})
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), ReplayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Accuracy regression harness vs recorded Prokerala charts")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    check = sub.add_parser("check", help="Compare the calculator against fixtures")
+    check.add_argument("fixtures")
+    check.add_argument("--workers", type=int, default=None)
+    check.add_argument("--degree-tolerance", type=float, default=DEGREE_TOLERANCE)
+    check.add_argument("--boundary-tolerance", type=float, default=BOUNDARY_TOLERANCE)
+    check.add_argument("--max-mismatch-rate", type=float, default=0.0,
+                       help="Fail if more than this fraction of charts have mismatches")
+    check.add_argument("--report", help="Write per-chart results as JSON to this path")
+
+    record = sub.add_parser("record", help="Record fixtures from the live API")
+    record.add_argument("births", help="JSONL of {datetime, latitude, longitude[, id]}")
+    record.add_argument("output")
+
+    replay = sub.add_parser("replay", help="Serve recorded responses locally")
+    replay.add_argument("fixtures")
+    replay.add_argument("--port", type=int, default=8790)
+
+    args = parser.parse_args()
+
+    if args.command == "check":
+        fixtures = load_fixtures(args.fixtures)
+        start = time.perf_counter()
+        results = run_harness(fixtures, args.workers, args.degree_tolerance, args.boundary_tolerance)
+        elapsed = time.perf_counter() - start
+        summary = summarize(results)
+        print(format_summary(summary, results))
+        print(f"\nCompared {len(fixtures)} charts in {elapsed:.2f}s")
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump({"summary": summary, "results": results}, f, indent=2)
+        rate = summary["charts_with_mismatches"] / summary["charts"] if summary["charts"] else 0.0
+        sys.exit(1 if rate > args.max_mismatch_rate or summary["errors"] else 0)
+
+    elif args.command == "record":
+        with open(args.births) as f:
+            births = [json.loads(line) for line in f if line.strip()]
+        count = record_fixtures(births, args.output)
+        print(f"Recorded {count} fixtures to {args.output}")
+
+    elif args.command == "replay":
+        server, stats = start_replay_server(load_fixtures(args.fixtures), args.port)
+        print(f"Replaying {args.fixtures} on http://127.0.0.1:{server.server_address[1]}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n{stats}")
+            server.shutdown()
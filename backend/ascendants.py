@@ -0,0 +1,235 @@
+"""
+Bulk Ascendant (Lagna) Calculation
+Vectorized ascendants from precomputed daily sidereal time, obliquity and ayanamsa tables
+
+calculate_ascendant runs swe.houses (all twelve Placidus cusps) plus separate sidereal
+time and ayanamsa work per chart. The ascendant itself only needs the local sidereal
+time (RAMC), the latitude and the obliquity of the ecliptic:
+
+    tan(asc) = cos(RAMC) / -(sin(RAMC) cos(eps) + tan(lat) sin(eps))
+
+so for many charts we look up Greenwich sidereal time, true obliquity and Lahiri ayanamsa
+in day tables (cached in DAY_BLOCK-day blocks), interpolate to the birth time, and
+evaluate that formula for every chart in one numpy pass.
+
+Error bound: interpolating the day tables keeps the ascendant within TABLE_ERROR_BOUND
+degrees of swe.houses (measured under 1e-5 degrees over 1900-2100 for |latitude| <= 60;
+see the example below). Charts are recomputed exactly with swe.houses when:
+  - the latitude is beyond POLAR_LATITUDE, where the ascendant swings so fast with
+    sidereal time that the same table error grows tenfold
+  - the ascendant is within BOUNDARY_MARGIN of a pada (so also nakshatra or sign) boundary
+  - the ascendant is within ROUNDING_MARGIN of a 0.005 degree rounding edge
+  - the birth day is not smooth: sidereal time at midday disagrees with the
+    interpolation, as on 2049-12-31 where Swiss Ephemeris switches delta-T models
+So bulk_ascendants returns exactly what calculate_ascendant does, rounding included.
+
+Usage:
+    longitudes, exact = bulk_ascendant_longitudes(jds, latitudes, longitudes)
+    ascendants = bulk_ascendants(birth_dts, latitudes, longitudes)   # calculate_ascendant dicts
+"""
+
+from functools import lru_cache
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from vedic_calculator import (
+    calculate_ascendant,
+    datetime_to_jd,
+    get_ayanamsa,
+    get_nakshatra_from_longitude,
+    get_sign_from_longitude,
+)
+
+# Days per cached table block (one block is ~7 ms to build and ~25 KB)
+DAY_BLOCK = 1024
+
+# Measured worst case of the interpolated path against swe.houses, in degrees
+TABLE_ERROR_BOUND = 2e-5
+
+# Distances (degrees) from a pada boundary and from a 2-decimal rounding edge that send
+# a chart to the exact path; both are well above TABLE_ERROR_BOUND
+BOUNDARY_MARGIN = 1e-3
+ROUNDING_MARGIN = 5e-5
+
+# Largest midday sidereal time interpolation error (degrees) for a day to count as smooth
+SMOOTH_DAY_TOLERANCE = 1e-5
+
+# Above this latitude the table error is amplified too much; use swe.houses
+POLAR_LATITUDE = 60.0
+
+PADA_SPAN = 360 / 108
+
+
+# ============================================
+# DAY TABLES
+# ============================================
+
+def sidereal_step(table: np.ndarray, i) -> np.ndarray:
+    """Sidereal time gained from day i to day i + 1 (~360.9856 degrees), unwrapped"""
+    return (table[i + 1] - table[i]) % 360 + 360
+
+
+@lru_cache(maxsize=256)
+def day_block(block: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Greenwich apparent sidereal time, true obliquity and ayanamsa (degrees) at 0h UT
+
+    Covers Julian days block * DAY_BLOCK + 0.5 onward, DAY_BLOCK + 1 entries so every day
+    in the block has its successor for interpolation. The fourth array marks smooth days
+    (midday sidereal time matches the interpolation).
+    """
+    days = block * DAY_BLOCK + np.arange(DAY_BLOCK + 1) + 0.5
+    sidereal = np.empty(len(days))
+    obliquity = np.empty(len(days))
+    ayanamsa = np.empty(len(days))
+    for i, jd in enumerate(days.tolist()):
+        sidereal[i] = swe.sidtime(jd) * 15
+        obliquity[i] = swe.calc_ut(jd, swe.ECL_NUT)[0][0]
+        ayanamsa[i] = get_ayanamsa(jd)
+
+    i = np.arange(DAY_BLOCK)
+    midday = np.array([swe.sidtime(jd + 0.5) * 15 for jd in days[:-1].tolist()])
+    error = np.abs((sidereal[i] + sidereal_step(sidereal, i) / 2 - midday + 180) % 360 - 180)
+    smooth = np.append(error < SMOOTH_DAY_TOLERANCE, False)
+    return sidereal, obliquity, ayanamsa, smooth
+
+
+def interpolated_tables(jds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sidereal time, obliquity and ayanamsa at each Julian day (UT) from the day tables,
+    and whether each falls on a smooth day"""
+    day = np.floor(jds - 0.5).astype(np.int64)
+    frac = jds - 0.5 - day
+    blocks = day // DAY_BLOCK
+
+    sidereal = np.empty(len(jds))
+    obliquity = np.empty(len(jds))
+    ayanamsa = np.empty(len(jds))
+    smooth = np.empty(len(jds), dtype=bool)
+    for block in np.unique(blocks).tolist():
+        rows = np.flatnonzero(blocks == block)
+        i = day[rows] - block * DAY_BLOCK
+        f = frac[rows]
+        table_sidereal, table_obliquity, table_ayanamsa, table_smooth = day_block(block)
+        sidereal[rows] = table_sidereal[i] + f * sidereal_step(table_sidereal, i)
+        obliquity[rows] = table_obliquity[i] + f * (table_obliquity[i + 1] - table_obliquity[i])
+        ayanamsa[rows] = table_ayanamsa[i] + f * (table_ayanamsa[i + 1] - table_ayanamsa[i])
+        smooth[rows] = table_smooth[i]
+    return sidereal, obliquity, ayanamsa, smooth
+
+
+# ============================================
+# ASCENDANTS
+# ============================================
+
+def ascendant_formula(ramc, latitude, obliquity) -> np.ndarray:
+    """Tropical ascendant (degrees) from RAMC, latitude and obliquity (degrees), vectorized"""
+    ramc, phi, eps = np.radians(ramc), np.radians(latitude), np.radians(obliquity)
+    asc = np.arctan2(np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(phi) * np.sin(eps)))
+    return np.mod(np.degrees(asc), 360.0)
+
+
+def exact_ascendant_longitude(jd: float, latitude: float, longitude: float) -> float:
+    """Sidereal ascendant via swe.houses, as calculate_ascendant computes it
+
+    Porphyry rather than Placidus: the ascendant is the same, and Porphyry also
+    works inside the polar circles where Placidus cusps do not exist.
+    """
+    _, ascmc = swe.houses(jd, latitude, longitude, b'O')
+    return (ascmc[0] - get_ayanamsa(jd)) % 360
+
+
+def bulk_ascendant_longitudes(
+    jds: Sequence[float],
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sidereal ascendant longitudes for many charts, and a mask of those computed exactly"""
+    jds = np.asarray(jds, dtype=np.float64)
+    lats = np.asarray(latitudes, dtype=np.float64)
+    lons = np.asarray(longitudes, dtype=np.float64)
+
+    sidereal, obliquity, ayanamsa, smooth = interpolated_tables(jds)
+    result = np.mod(ascendant_formula(sidereal + lons, lats, obliquity) - ayanamsa, 360.0)
+
+    to_boundary = np.abs((result + PADA_SPAN / 2) % PADA_SPAN - PADA_SPAN / 2)
+    to_rounding_edge = np.abs(result % 0.01 - 0.005)
+    exact = (
+        (to_boundary < BOUNDARY_MARGIN)
+        | (to_rounding_edge < ROUNDING_MARGIN)
+        | (np.abs(lats) > POLAR_LATITUDE)
+        | ~smooth
+    )
+    for i in np.flatnonzero(exact).tolist():
+        result[i] = exact_ascendant_longitude(jds[i], lats[i], lons[i])
+    return result, exact
+
+
+def bulk_ascendants(
+    birth_dts: Sequence[datetime],
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+) -> List[Dict]:
+    """calculate_ascendant output for many charts (naive UTC or tz-aware datetimes)"""
+    jds = [datetime_to_jd(dt) for dt in birth_dts]
+    result, _ = bulk_ascendant_longitudes(jds, latitudes, longitudes)
+    ascendants = []
+    for lon in result.tolist():
+        ascendants.append({
+            "longitude": round(lon, 2),
+            "sign": get_sign_from_longitude(lon),
+            "nakshatra": get_nakshatra_from_longitude(lon),
+        })
+    return ascendants
+
+
+# ============================================
+# EXAMPLE: Error bound and speed against swe.houses
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    from datetime import timedelta
+
+    rng = np.random.default_rng(45)
+    n = 100_000
+    jds = datetime_to_jd(datetime(1900, 1, 1)) + rng.uniform(0, 200 * 365.25, n)
+    lats = rng.uniform(-POLAR_LATITUDE, POLAR_LATITUDE, n)
+    lats[:1000] = rng.uniform(POLAR_LATITUDE, 70, 1000)  # exact fallback above POLAR_LATITUDE
+    lons = rng.uniform(-180, 180, n)
+
+    start = time.perf_counter()
+    exact = np.array([exact_ascendant_longitude(jd, la, lo) for jd, la, lo in zip(jds.tolist(), lats.tolist(), lons.tolist())])
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast, fallback = bulk_ascendant_longitudes(jds, lats, lons)
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk_ascendant_longitudes(jds, lats, lons)
+    warm_time = time.perf_counter() - start
+
+    sidereal, obliquity, ayanamsa, smooth = interpolated_tables(jds)
+    table_only = np.mod(ascendant_formula(sidereal + lons, lats, obliquity) - ayanamsa, 360.0)
+    table_error = np.abs((table_only - exact + 180) % 360 - 180)[(np.abs(lats) <= POLAR_LATITUDE) & smooth].max()
+    same_pada = ((fast // PADA_SPAN) == (exact // PADA_SPAN)).mean()
+
+    print(f"{n:,} charts, 1900-2100")
+    print(f"  table error vs swe.houses: {table_error:.2e} deg (bound {TABLE_ERROR_BOUND:.0e})")
+    print(f"  exact fallbacks (edges, rough days and 1,000 charts above {POLAR_LATITUDE}): {fallback.sum():,}")
+    print(f"  same pada as swe.houses: {same_pada:.2%}")
+    print(f"  swe.houses loop: {exact_time * 1000:7.0f} ms")
+    print(f"  bulk (cold tables): {cold_time * 1000:4.0f} ms, warm: {warm_time * 1000:.0f} ms")
+
+    birth = datetime(1986, 12, 27, 7, 50)
+    reference = calculate_ascendant(birth, 33.7879, -117.8531)
+    assert bulk_ascendants([birth], [33.7879], [-117.8531])[0] == reference
+    # calculate_ascendant (Placidus) fails inside the polar circles, so compare below 60
+    births = [datetime(1960, 1, 1) + timedelta(minutes=int(m)) for m in rng.integers(0, 60 * 24 * 365 * 50, 2000)]
+    sample_lats, sample_lons = lats[1000:3000], lons[1000:3000]
+    births[0] = datetime(2049, 12, 31, 18, 0)  # delta-T seam
+    assert bulk_ascendants(births, sample_lats, sample_lons) == [
+        calculate_ascendant(b, la, lo) for b, la, lo in zip(births, sample_lats.tolist(), sample_lons.tolist())
+    ]
@@ -0,0 +1,237 @@
+"""
+Ashtakavarga
+Bhinnashtakavarga (per-planet) and Sarvashtakavarga bindu tables, vectorized over charts
+
+Each of the seven grahas gets a bindu in a sign when that sign is one of the houses, counted
+from each of the eight contributors (seven grahas and the Lagna), that the classical rules
+(Brihat Parashara Hora Shastra) list for it. The rules are one static boolean array,
+RULES[planet, contributor, house - 1], so for any number of charts
+
+    bindus[n, planet, sign] = sum over contributors of RULES[planet, contributor, (sign - contributor_sign[n]) % 12]
+
+is one product of the charts' one-hot contributor signs with RULES laid out per sign
+(SIGN_RULES). Per-planet totals are fixed by the rules (Sun 48, Moon 49,
+Mars 39, Mercury 54, Jupiter 56, Venus 52, Saturn 39; Sarvashtakavarga 337).
+
+In transit, a planet moving through a sign where it has STRONG_BINDUS or more in the natal
+chart gives good results; WEAK_BINDUS or fewer, poor ones.
+
+Usage:
+    tables = chart_ashtakavarga(get_full_birth_chart(birth_dt, lat, lon))   # {"bhinna": ..., "sarva": ...}
+    bav = bhinnashtakavarga(sign_indices)      # (charts, 8) -> (charts, 7, 12)
+    sav = sarvashtakavarga(bav)                # (charts, 12)
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from vedic_calculator import SIGNS
+
+ASHTAKAVARGA_PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+CONTRIBUTORS = ASHTAKAVARGA_PLANETS + ["Lagna"]
+
+# Houses (counted from each contributor) where a planet receives a bindu
+BINDU_HOUSES = {
+    "Sun": {
+        "Sun": [1, 2, 4, 7, 8, 9, 10, 11],
+        "Moon": [3, 6, 10, 11],
+        "Mars": [1, 2, 4, 7, 8, 9, 10, 11],
+        "Mercury": [3, 5, 6, 9, 10, 11, 12],
+        "Jupiter": [5, 6, 9, 11],
+        "Venus": [6, 7, 12],
+        "Saturn": [1, 2, 4, 7, 8, 9, 10, 11],
+        "Lagna": [3, 4, 6, 10, 11, 12],
+    },
+    "Moon": {
+        "Sun": [3, 6, 7, 8, 10, 11],
+        "Moon": [1, 3, 6, 7, 10, 11],
+        "Mars": [2, 3, 5, 6, 9, 10, 11],
+        "Mercury": [1, 3, 4, 5, 7, 8, 10, 11],
+        "Jupiter": [1, 4, 7, 8, 10, 11, 12],
+        "Venus": [3, 4, 5, 7, 9, 10, 11],
+        "Saturn": [3, 5, 6, 11],
+        "Lagna": [3, 6, 10, 11],
+    },
+    "Mars": {
+        "Sun": [3, 5, 6, 10, 11],
+        "Moon": [3, 6, 11],
+        "Mars": [1, 2, 4, 7, 8, 10, 11],
+        "Mercury": [3, 5, 6, 11],
+        "Jupiter": [6, 10, 11, 12],
+        "Venus": [6, 8, 11, 12],
+        "Saturn": [1, 4, 7, 8, 9, 10, 11],
+        "Lagna": [1, 3, 6, 10, 11],
+    },
+    "Mercury": {
+        "Sun": [5, 6, 9, 11, 12],
+        "Moon": [2, 4, 6, 8, 10, 11],
+        "Mars": [1, 2, 4, 7, 8, 9, 10, 11],
+        "Mercury": [1, 3, 5, 6, 9, 10, 11, 12],
+        "Jupiter": [6, 8, 11, 12],
+        "Venus": [1, 2, 3, 4, 5, 8, 9, 11],
+        "Saturn": [1, 2, 4, 7, 8, 9, 10, 11],
+        "Lagna": [1, 2, 4, 6, 8, 10, 11],
+    },
+    "Jupiter": {
+        "Sun": [1, 2, 3, 4, 7, 8, 9, 10, 11],
+        "Moon": [2, 5, 7, 9, 11],
+        "Mars": [1, 2, 4, 7, 8, 10, 11],
+        "Mercury": [1, 2, 4, 5, 6, 9, 10, 11],
+        "Jupiter": [1, 2, 3, 4, 7, 8, 10, 11],
+        "Venus": [2, 5, 6, 9, 10, 11],
+        "Saturn": [3, 5, 6, 12],
+        "Lagna": [1, 2, 4, 5, 6, 7, 9, 10, 11],
+    },
+    "Venus": {
+        "Sun": [8, 11, 12],
+        "Moon": [1, 2, 3, 4, 5, 8, 9, 11, 12],
+        "Mars": [3, 5, 6, 9, 11, 12],
+        "Mercury": [3, 5, 6, 9, 11],
+        "Jupiter": [5, 8, 9, 10, 11],
+        "Venus": [1, 2, 3, 4, 5, 8, 9, 10, 11],
+        "Saturn": [3, 4, 5, 8, 9, 10, 11],
+        "Lagna": [1, 2, 3, 4, 5, 8, 9, 11],
+    },
+    "Saturn": {
+        "Sun": [1, 2, 4, 7, 8, 10, 11],
+        "Moon": [3, 6, 11],
+        "Mars": [3, 5, 6, 10, 11, 12],
+        "Mercury": [6, 8, 9, 10, 11, 12],
+        "Jupiter": [5, 6, 11, 12],
+        "Venus": [6, 11, 12],
+        "Saturn": [3, 5, 6, 11],
+        "Lagna": [1, 3, 4, 6, 10, 11],
+    },
+}
+
+
+def build_rules() -> np.ndarray:
+    """BINDU_HOUSES as a boolean array [planet, contributor, house - 1]"""
+    rules = np.zeros((len(ASHTAKAVARGA_PLANETS), len(CONTRIBUTORS), 12), dtype=bool)
+    for p, planet in enumerate(ASHTAKAVARGA_PLANETS):
+        for c, contributor in enumerate(CONTRIBUTORS):
+            rules[p, c, np.array(BINDU_HOUSES[planet][contributor]) - 1] = True
+    return rules
+
+
+def build_sign_rules(rules: np.ndarray) -> np.ndarray:
+    """RULES laid out for a matrix product: [(contributor, its sign), (planet, sign)]
+
+    Entry is 1 where a contributor in that sign gives the planet a bindu in that sign.
+    """
+    table = np.zeros((len(CONTRIBUTORS), 12, len(ASHTAKAVARGA_PLANETS), 12), dtype=np.float32)
+    for sign in range(12):
+        table[:, sign] = np.roll(rules, sign, axis=2).transpose(1, 0, 2)
+    return table.reshape(len(CONTRIBUTORS) * 12, len(ASHTAKAVARGA_PLANETS) * 12)
+
+
+RULES = build_rules()
+SIGN_RULES = build_sign_rules(RULES)
+
+# Transit through a sign with at least / at most this many of the planet's 8 bindus
+STRONG_BINDUS = 5
+WEAK_BINDUS = 3
+
+# Sarvashtakavarga above average (337 / 12) marks a sign that supports transits
+STRONG_SARVA = 28
+
+
+# ============================================
+# TABLES
+# ============================================
+
+def bhinnashtakavarga(sign_indices) -> np.ndarray:
+    """Bindus per planet and sign from contributor sign indices (ordered as CONTRIBUTORS)
+
+    sign_indices has shape (8,) for one chart or (charts, 8); the result is (7, 12) or
+    (charts, 7, 12), uint8.
+    """
+    signs = np.asarray(sign_indices, dtype=np.int64)
+    one_hot = (signs[..., :, None] == np.arange(12)).astype(np.float32)
+    bindus = one_hot.reshape(-1, SIGN_RULES.shape[0]) @ SIGN_RULES
+    return bindus.astype(np.uint8).reshape(signs.shape[:-1] + (len(ASHTAKAVARGA_PLANETS), 12))
+
+
+def sarvashtakavarga(bhinna: np.ndarray) -> np.ndarray:
+    """Total bindus per sign across the seven planets: (..., 7, 12) -> (..., 12)"""
+    return bhinna.sum(axis=-2, dtype=np.uint16)
+
+
+def chart_sign_indices(chart: Dict) -> List[int]:
+    """Contributor sign indices from a get_full_birth_chart output"""
+    return [chart["planets"][planet]["sign"]["index"] for planet in ASHTAKAVARGA_PLANETS] + [
+        chart["ascendant"]["sign"]["index"]
+    ]
+
+
+def chart_ashtakavarga(chart: Dict) -> Dict:
+    """Bhinnashtakavarga and Sarvashtakavarga for one chart, as lists by sign index"""
+    bhinna = bhinnashtakavarga(chart_sign_indices(chart))
+    return {
+        "bhinna": {planet: bhinna[p].tolist() for p, planet in enumerate(ASHTAKAVARGA_PLANETS)},
+        "sarva": sarvashtakavarga(bhinna).tolist(),
+    }
+
+
+def transit_bindus(bhinna: np.ndarray, transit_signs: Sequence[int]) -> np.ndarray:
+    """Each planet's natal bindus in the sign it is transiting
+
+    bhinna is (..., 7, 12) and transit_signs the seven planets' current sign indices;
+    returns (..., 7).
+    """
+    signs = np.asarray(transit_signs, dtype=np.int64)
+    return np.take_along_axis(bhinna, np.broadcast_to(signs[:, None], bhinna.shape[:-1] + (1,)), axis=-1)[..., 0]
+
+
+def bindu_strength(bindus: int) -> str:
+    """"strong", "average" or "weak" transit through a sign with this many bindus"""
+    if bindus >= STRONG_BINDUS:
+        return "strong"
+    if bindus <= WEAK_BINDUS:
+        return "weak"
+    return "average"
+
+
+# ============================================
+# EXAMPLE: One chart's tables, then a batch of charts
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    from datetime import datetime
+
+    from vedic_calculator import get_full_birth_chart
+
+    chart = get_full_birth_chart(datetime(1986, 12, 27, 7, 50), 33.7879, -117.8531)
+    tables = chart_ashtakavarga(chart)
+
+    print(f"{'':<8} " + " ".join(f"{s['vedic'][:4]:>4}" for s in SIGNS) + "  total")
+    for planet, bindus in tables["bhinna"].items():
+        print(f"{planet:<8} " + " ".join(f"{b:>4}" for b in bindus) + f"  {sum(bindus):>5}")
+    print(f"{'Sarva':<8} " + " ".join(f"{b:>4}" for b in tables["sarva"]) + f"  {sum(tables['sarva']):>5}")
+
+    # Direct rule loop for comparison
+    def loop_bhinna(signs):
+        table = np.zeros((7, 12), dtype=np.uint8)
+        for p, planet in enumerate(ASHTAKAVARGA_PLANETS):
+            for c, contributor in enumerate(CONTRIBUTORS):
+                for house in BINDU_HOUSES[planet][contributor]:
+                    table[p, (signs[c] + house - 1) % 12] += 1
+        return table
+
+    rng = np.random.default_rng(49)
+    batch = rng.integers(0, 12, (100_000, 8))
+
+    start = time.perf_counter()
+    bhinna = bhinnashtakavarga(batch)
+    sarva = sarvashtakavarga(bhinna)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = [loop_bhinna(signs) for signs in batch[:2_000].tolist()]
+    loop_time = (time.perf_counter() - start) / 2_000 * len(batch)
+
+    assert (np.array(looped) == bhinna[:2_000]).all()
+    assert (bhinna.sum(axis=-1) == [48, 49, 39, 54, 56, 52, 39]).all() and (sarva.sum(axis=-1) == 337).all()
+    print(f"\n{len(batch):,} charts: {vectorized * 1000:.0f} ms vectorized, ~{loop_time * 1000:.0f} ms as a loop")
@@ -0,0 +1,247 @@
+"""
+Calculator and Analyzer Benchmarks
+Reproducible benchmarks (fixed seeds and dates) for the hot paths in the backend
+Reports calls/sec and Swiss Ephemeris calls per operation, and fails on regressions vs a stored baseline
+
+Run with:            python benchmarks.py
+Save a new baseline: python benchmarks.py --update-baseline
+
+Timings are machine-specific: record the baseline on the machine that runs the check.
+Ephemeris call counts are exact and machine-independent.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import swisseph as swe
+
+from vedic_calculator import (
+    get_all_planetary_positions,
+    calculate_ascendant,
+    calculate_dasha,
+    get_full_birth_chart,
+)
+from weekly_transit_analyzer import generate_weekly_analysis
+from weekly_horoscope_generator import generate_all_prompts
+from shadbala import shadbala_for_birth
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Fixed inputs
+SEED = 20260119
+WEEK_START = datetime(2026, 1, 19)
+TARGET_DT = datetime(2026, 1, 19, 12)
+SAMPLE_CONTENT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weekly_horoscope_2026-01-19.json")
+
+# Allowed slowdown in calls/sec before a benchmark counts as regressed
+DEFAULT_THRESHOLD = 0.25
+
+# Timing: best of ROUNDS, each running for at least MIN_ROUND_SECONDS
+ROUNDS = 5
+MIN_ROUND_SECONDS = 0.2
+
+# Swiss Ephemeris functions counted per operation
+COUNTED_SWE_FUNCTIONS = ["calc_ut", "houses", "get_ayanamsa", "julday", "set_sid_mode"]
+
+
+class SweCallCounter:
+    """Counts calls to selected swisseph functions while active"""
+
+    def __init__(self, names: List[str] = COUNTED_SWE_FUNCTIONS):
+        self.names = names
+        self.counts = {name: 0 for name in names}
+        self.originals = {}
+
+    def __enter__(self):
+        for name in self.names:
+            original = getattr(swe, name)
+            self.originals[name] = original
+
+            def wrapper(*args, _name=name, _original=original, **kwargs):
+                self.counts[_name] += 1
+                return _original(*args, **kwargs)
+
+            setattr(swe, name, wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self.originals.items():
+            setattr(swe, name, original)
+
+
+def make_birth_inputs(count: int) -> List[Dict]:
+    """Seeded birth datetimes and locations"""
+    rng = random.Random(SEED)
+    base = datetime(1950, 1, 1)
+    return [
+        {
+            "dt": base + timedelta(minutes=rng.randrange(60 * 24 * 365 * 60)),
+            "lat": rng.uniform(-50, 60),
+            "lon": rng.uniform(-180, 180),
+            "moon": rng.uniform(0, 360),
+        }
+        for _ in range(count)
+    ]
+
+
+def build_benchmarks() -> Dict[str, Callable[[int], None]]:
+    """Each benchmark takes an iteration index and runs one operation"""
+    from weekly_horoscope_api import assemble_personalized_horoscope
+
+    births = make_birth_inputs(256)
+    weekly_data = generate_weekly_analysis(WEEK_START)
+    with open(SAMPLE_CONTENT) as f:
+        content = json.load(f)
+
+    rng = random.Random(SEED)
+    horoscope_keys = [
+        (rng.choice(list(content["moon_signs"])),
+         rng.choice(list(content["nakshatras"])),
+         rng.choice(list(content["dasha_contexts"])))
+        for _ in range(256)
+    ]
+
+    def pick(i: int) -> Dict:
+        return births[i % len(births)]
+
+    return {
+        "get_all_planetary_positions": lambda i: get_all_planetary_positions(pick(i)["dt"]),
+        "calculate_ascendant": lambda i: calculate_ascendant(pick(i)["dt"], pick(i)["lat"], pick(i)["lon"]),
+        "calculate_dasha": lambda i: calculate_dasha(pick(i)["moon"], pick(i)["dt"], TARGET_DT),
+        "get_full_birth_chart": lambda i: get_full_birth_chart(pick(i)["dt"], pick(i)["lat"], pick(i)["lon"], TARGET_DT),
+        "shadbala_for_birth": lambda i: shadbala_for_birth(pick(i)["dt"], pick(i)["lat"], pick(i)["lon"]),
+        "generate_weekly_analysis": lambda i: generate_weekly_analysis(WEEK_START + timedelta(weeks=i % 8)),
+        "generate_all_prompts": lambda i: generate_all_prompts(weekly_data),
+        "assemble_personalized_horoscope": lambda i: assemble_personalized_horoscope(
+            content, *horoscope_keys[i % len(horoscope_keys)]
+        ),
+    }
+
+
+def run_benchmark(fn: Callable[[int], None]) -> Dict:
+    """Time one benchmark (best round) and count its ephemeris calls per operation"""
+    # Calibrate iterations per round
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(iterations):
+            fn(i)
+        if time.perf_counter() - start >= MIN_ROUND_SECONDS or iterations >= 1 << 20:
+            break
+        iterations *= 2
+
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for i in range(iterations):
+            fn(i)
+        best = min(best, time.perf_counter() - start)
+
+    sample = min(iterations, 32)
+    with SweCallCounter() as counter:
+        for i in range(sample):
+            fn(i)
+
+    return {
+        "calls_per_sec": round(iterations / best, 1),
+        "us_per_call": round(best / iterations * 1e6, 2),
+        "swe_calls_per_op": {
+            name: round(count / sample, 2) for name, count in counter.counts.items() if count
+        },
+    }
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return regression messages (empty if everything is within threshold)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            continue
+
+        floor = base["calls_per_sec"] * (1 - threshold)
+        if result["calls_per_sec"] < floor:
+            regressions.append(
+                f"{name}: {result['calls_per_sec']:,.0f} calls/sec < {floor:,.0f} "
+                f"(baseline {base['calls_per_sec']:,.0f}, threshold {threshold:.0%})"
+            )
+
+        for fn_name, per_op in result["swe_calls_per_op"].items():
+            base_per_op = base.get("swe_calls_per_op", {}).get(fn_name, 0)
+            if per_op > base_per_op:
+                regressions.append(f"{name}: swe.{fn_name} calls/op rose from {base_per_op} to {per_op}")
+
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict, path: str = BASELINE_FILE) -> None:
+    with open(path, "w") as f:
+        json.dump({
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "benchmarks": results,
+        }, f, indent=2)
+        f.write("\n")
+    print(f"Saved baseline to {path}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run backend benchmarks")
+    parser.add_argument("--only", nargs="*", help="Run only these benchmarks")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed calls/sec slowdown vs baseline (default 0.25)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON path")
+    parser.add_argument("--update-baseline", action="store_true", help="Save results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    benchmarks = build_benchmarks()
+    names = args.only or list(benchmarks)
+    baseline = load_baseline(args.baseline)
+
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(benchmarks[name])
+        if not args.json:
+            result = results[name]
+            base = (baseline or {}).get("benchmarks", {}).get(name)
+            change = f"{result['calls_per_sec'] / base['calls_per_sec'] - 1:+.0%}" if base else "n/a"
+            swe_calls = ", ".join(f"{k}={v}" for k, v in result["swe_calls_per_op"].items()) or "-"
+            print(f"{name:<34} {result['calls_per_sec']:>12,.1f}/s  {result['us_per_call']:>10,.1f} us  "
+                  f"vs baseline {change:>5}  swe/op: {swe_calls}")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        sys.exit(0)
+
+    if baseline is None:
+        print("\nNo baseline found; run with --update-baseline to record one")
+        sys.exit(0)
+
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
+
+    print("\nNo regressions")
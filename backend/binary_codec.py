@@ -0,0 +1,328 @@
+"""
+Compact Binary Codec
+Binary encoding for charts, weekly analyses and weekly content (JSON-compatible data)
+
+Repeated strings are stored once in a string table and referenced by index, and dicts
+with the same keys share a schema, so the sign/nakshatra dicts repeated throughout
+get_full_birth_chart and generate_weekly_analysis output cost a few bytes each.
+Floats with at most two decimals (the calculator's rounding) are stored as varints.
+
+Layout:  MAGIC | flags | zlib?( string table | schema table | root value )
+
+Usage:
+    data = encode(chart)                 # bytes
+    chart = decode(data)
+    save(weekly_data, "week.cbc")        # binary by extension; any other extension writes JSON
+    weekly_data = load("week.cbc")       # detects binary vs JSON from the file contents
+"""
+
+import os
+import json
+import zlib
+import struct
+import threading
+from typing import Any, Dict, List, Tuple
+
+MAGIC = b"CB"
+VERSION = 1
+BINARY_EXTENSION = ".cbc"
+CONTENT_TYPE = "application/vnd.cosmicbrief.cbc"
+
+FLAG_ZLIB = 0x01
+
+# Value tags (0x80-0xFF encode small non-negative ints 0-127 directly)
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3        # zigzag varint
+TAG_FLOAT = 4      # float64
+TAG_STR = 5        # varint index into the string table
+TAG_LIST = 6       # varint length, then items
+TAG_DICT = 7       # varint schema index, then one value per key
+TAG_CENTS = 8      # zigzag varint of value * 100 (floats with at most two decimals)
+TAG_SMALL_INT = 0x80
+
+FLOAT64 = struct.Struct("<d")
+
+
+class CodecError(ValueError):
+    """Raised for data that cannot be encoded or bytes that are not valid codec output"""
+
+
+def write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def zigzag(n: int) -> int:
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def unzigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+# ============================================
+# ENCODING
+# ============================================
+
+class Encoder:
+    """Single-pass encoder: values are written while the string and schema tables grow"""
+
+    def __init__(self):
+        self.out = bytearray()
+        self.strings: Dict[str, int] = {}
+        self.schemas: Dict[Tuple[str, ...], int] = {}
+
+    def string_index(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def value(self, v: Any) -> None:
+        out = self.out
+        t = type(v)
+
+        if t is str:
+            out.append(TAG_STR)
+            write_varint(out, self.string_index(v))
+        elif t is dict:
+            keys = tuple(v)
+            schema = self.schemas.get(keys)
+            if schema is None:
+                for key in keys:
+                    if type(key) is not str:
+                        raise CodecError(f"dict keys must be strings, got {type(key).__name__}")
+                    self.string_index(key)
+                schema = self.schemas[keys] = len(self.schemas)
+            out.append(TAG_DICT)
+            write_varint(out, schema)
+            for item in v.values():
+                self.value(item)
+        elif t is float:
+            cents = round(v * 100) if -1e15 < v < 1e15 else None
+            if cents is not None and cents / 100 == v:
+                out.append(TAG_CENTS)
+                write_varint(out, zigzag(cents))
+            else:
+                out.append(TAG_FLOAT)
+                out += FLOAT64.pack(v)
+        elif t is int:
+            if 0 <= v < 0x80:
+                out.append(TAG_SMALL_INT | v)
+            else:
+                out.append(TAG_INT)
+                write_varint(out, zigzag(v))
+        elif t is list or t is tuple:
+            out.append(TAG_LIST)
+            write_varint(out, len(v))
+            for item in v:
+                self.value(item)
+        elif v is None:
+            out.append(TAG_NONE)
+        elif v is True:
+            out.append(TAG_TRUE)
+        elif v is False:
+            out.append(TAG_FALSE)
+        else:
+            raise CodecError(f"cannot encode {t.__name__}")
+
+    def tables(self) -> bytearray:
+        out = bytearray()
+        write_varint(out, len(self.strings))
+        for s in self.strings:
+            raw = s.encode("utf-8")
+            write_varint(out, len(raw))
+            out += raw
+        write_varint(out, len(self.schemas))
+        for keys in self.schemas:
+            write_varint(out, len(keys))
+            for key in keys:
+                write_varint(out, self.strings[key])
+        return out
+
+
+def encode(obj: Any, compress: bool = False) -> bytes:
+    """Encode JSON-compatible data (dicts with string keys, lists, str, int, float, bool, None)
+
+    compress=True additionally zlib-compresses the body, which pays off for
+    prose-heavy data such as generated weekly content.
+    """
+    encoder = Encoder()
+    encoder.value(obj)
+    body = encoder.tables() + encoder.out
+    flags = 0
+    if compress:
+        body = zlib.compress(bytes(body), 6)
+        flags |= FLAG_ZLIB
+    return MAGIC + bytes([VERSION, flags]) + bytes(body)
+
+
+# ============================================
+# DECODING
+# ============================================
+
+def decode(data: bytes) -> Any:
+    """Decode bytes produced by encode()"""
+    if data[:2] != MAGIC or len(data) < 4:
+        raise CodecError("not CosmicBrief binary data")
+    if data[2] != VERSION:
+        raise CodecError(f"unsupported codec version {data[2]}")
+    try:
+        body = zlib.decompress(data[4:]) if data[3] & FLAG_ZLIB else bytes(data[4:])
+    except zlib.error as e:
+        raise CodecError(f"corrupt compressed data: {e}") from e
+
+    pos = 0
+
+    def varint() -> int:
+        nonlocal pos
+        b = body[pos]
+        pos += 1
+        if b < 0x80:
+            return b
+        shift, result = 7, b & 0x7F
+        while True:
+            b = body[pos]
+            pos += 1
+            result |= (b & 0x7F) << shift
+            if b < 0x80:
+                return result
+            shift += 7
+
+    try:
+        strings: List[str] = []
+        for _ in range(varint()):
+            length = varint()
+            strings.append(body[pos:pos + length].decode("utf-8"))
+            pos += length
+
+        schemas: List[Tuple[str, ...]] = []
+        for _ in range(varint()):
+            schemas.append(tuple(strings[varint()] for _ in range(varint())))
+
+        def value() -> Any:
+            nonlocal pos
+            tag = body[pos]
+            pos += 1
+            if tag >= TAG_SMALL_INT:
+                return tag - TAG_SMALL_INT
+            if tag == TAG_STR:
+                return strings[varint()]
+            if tag == TAG_DICT:
+                keys = schemas[varint()]
+                return {key: value() for key in keys}
+            if tag == TAG_CENTS:
+                return unzigzag(varint()) / 100
+            if tag == TAG_LIST:
+                return [value() for _ in range(varint())]
+            if tag == TAG_INT:
+                return unzigzag(varint())
+            if tag == TAG_FLOAT:
+                result = FLOAT64.unpack_from(body, pos)[0]
+                pos += 8
+                return result
+            if tag == TAG_NONE:
+                return None
+            if tag == TAG_TRUE:
+                return True
+            if tag == TAG_FALSE:
+                return False
+            raise CodecError(f"unknown tag {tag} at offset {pos - 1}")
+
+        result = value()
+    except (IndexError, UnicodeDecodeError, struct.error) as e:
+        raise CodecError(f"truncated or corrupt data: {e}") from e
+
+    if pos != len(body):
+        raise CodecError(f"{len(body) - pos} trailing bytes")
+    return result
+
+
+# ============================================
+# FILES
+# ============================================
+
+def is_binary(data: bytes) -> bool:
+    return data[:2] == MAGIC
+
+
+def save(obj: Any, path: str, compress: bool = False) -> str:
+    """Write obj as binary if path ends with .cbc, otherwise as indented JSON
+
+    The file is written under a temporary name and renamed into place, so readers
+    (including other processes filling the same cache) never see a partial file.
+    """
+    if path.endswith(BINARY_EXTENSION):
+        data = encode(obj, compress)
+    else:
+        data = json.dumps(obj, indent=2).encode("utf-8")
+    # Unique per process and thread, since pool workers may fill the same cache file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return path
+
+
+def load(path: str) -> Any:
+    """Read a file written by save(), detecting binary vs JSON from its contents"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return decode(data) if is_binary(data) else json.loads(data)
+
+
+# ============================================
+# EXAMPLE: Size and speed vs JSON
+# ============================================
+
+if __name__ == "__main__":
+    import os
+    import pickle
+    import time
+    from datetime import datetime, timedelta
+
+    from vedic_calculator import get_full_birth_chart
+    from weekly_transit_analyzer import generate_weekly_analysis
+
+    def timed(fn, repeat: int = 200) -> float:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1e6
+
+    charts = [
+        get_full_birth_chart(datetime(1950, 1, 1) + timedelta(days=37 * i, hours=i % 24), 10 + i % 40, -120 + i % 200,
+                             datetime(2026, 1, 19))
+        for i in range(100)
+    ]
+    samples = {
+        "1 birth chart": charts[0],
+        "100 birth charts": charts,
+        "weekly analysis": generate_weekly_analysis(datetime(2026, 1, 19)),
+    }
+    content_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weekly_horoscope_2026-01-19.json")
+    with open(content_path) as f:
+        samples["weekly content"] = json.load(f)
+
+    print(f"{'Data':<18} {'JSON':>8} {'JSON idt':>9} {'pickle':>8} {'binary':>8} {'bin+zlib':>9}   "
+          f"{'enc us':>8} {'dec us':>8} {'json enc':>9} {'json dec':>9}")
+    for name, obj in samples.items():
+        compact = json.dumps(obj, separators=(",", ":"))
+        binary = encode(obj)
+        assert decode(binary) == obj and decode(encode(obj, compress=True)) == obj
+        repeat = 20 if name == "100 birth charts" else 200
+        print(
+            f"{name:<18} {len(compact):>8,} {len(json.dumps(obj, indent=2)):>9,} "
+            f"{len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)):>8,} {len(binary):>8,} "
+            f"{len(encode(obj, compress=True)):>9,}   "
+            f"{timed(lambda: encode(obj), repeat):>8.1f} {timed(lambda: decode(binary), repeat):>8.1f} "
+            f"{timed(lambda: json.dumps(obj), repeat):>9.1f} {timed(lambda: json.loads(compact), repeat):>9.1f}"
+        )
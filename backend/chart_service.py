@@ -0,0 +1,410 @@
+"""
+Chart and Transit HTTP Service
+Long-running JSON service for birth charts, dashas and weekly transits
+Warm worker processes keep Swiss Ephemeris loaded; responses are cached and requests can be batched
+
+Run with: python chart_service.py --port 8787 --workers 4
+Load test: python chart_service.py --load-test --requests 2000 --concurrency 16
+
+Endpoints (POST, JSON body):
+  /chart            {"birth_utc": "1986-12-27T07:50:00", "latitude": 33.79, "longitude": -117.85, "target": optional}
+                    (or "birth_local": "1986-12-26T23:50:00", "timezone": "America/Los_Angeles" instead of birth_utc)
+  /dasha            {"moon_longitude": 198.46, "birth_utc": "...", "target": optional}
+  /weekly-transits  {"start_date": "2026-01-19" (optional, default next Monday)}
+  /batch            {"requests": [{"op": "chart" | "dasha" | "weekly-transits", "params": {...}}, ...]}
+GET /stats reports cache hit rate and p50/p99 latency per endpoint; GET /health returns ok.
+Send "Accept: application/vnd.cosmicbrief.cbc" to get compact binary responses (see binary_codec.py).
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Worker and cache sizing
+DEFAULT_WORKERS = 2
+CACHE_SIZE = 10_000
+MAX_BATCH_SIZE = 500
+
+# Latency samples kept per endpoint for percentiles
+LATENCY_WINDOW = 10_000
+
+OPERATIONS = ["chart", "dasha", "weekly-transits"]
+
+
+# ============================================
+# WORKER PROCESS
+# ============================================
+
+def worker_init() -> None:
+    """Load the calculator and touch the ephemeris once so the first request is warm"""
+    from vedic_calculator import get_all_planetary_positions
+    get_all_planetary_positions(datetime(2000, 1, 1, 12))
+
+
+def parse_target(params: Dict) -> Optional[datetime]:
+    target = params.get("target")
+    return datetime.fromisoformat(target) if target else None
+
+
+def run_operation(op: str, params: Dict) -> Dict:
+    """Run one calculation inside a worker process"""
+    from vedic_calculator import get_full_birth_chart, calculate_dasha
+    from weekly_transit_analyzer import generate_weekly_analysis
+
+    if op == "chart":
+        return get_full_birth_chart(
+            datetime.fromisoformat(params["birth_utc"]),
+            float(params["latitude"]),
+            float(params["longitude"]),
+            parse_target(params),
+        )
+    if op == "dasha":
+        return calculate_dasha(
+            float(params["moon_longitude"]),
+            datetime.fromisoformat(params["birth_utc"]),
+            parse_target(params),
+        )
+    if op == "weekly-transits":
+        start = params.get("start_date")
+        return generate_weekly_analysis(datetime.fromisoformat(start) if start else None)
+
+    raise ValueError(f"Unknown operation: {op}")
+
+
+def run_batch(items: List[Tuple[str, Dict]]) -> List[Dict]:
+    """Run several calculations in one worker round trip; errors are returned per item
+
+    Any exception is caught, including swisseph.Error for dates outside the
+    ephemeris range, so one failing item never fails the rest of the batch.
+    """
+    results = []
+    for op, params in items:
+        try:
+            results.append({"result": run_operation(op, params)})
+        except Exception as e:
+            results.append({"error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+# ============================================
+# SERVICE STATE (cache + latency stats)
+# ============================================
+
+def normalize_params(op: str, params: Dict) -> Dict:
+    """Fill in time-dependent defaults so equal requests share a cache entry
+
+    Requests without a target are resolved to the start of today, so "current
+    dasha" answers are cached (and computed) for at most a day. Local birth
+    times (birth_local + timezone) are converted to birth_utc.
+    """
+    params = dict(params)
+    if params.get("birth_local") and params.get("timezone"):
+        from timezones import parse_local_datetime
+        params["birth_utc"] = parse_local_datetime(params.pop("birth_local"), params.pop("timezone")).isoformat()
+    elif params.get("birth_utc"):
+        from timezones import parse_local_datetime
+        # Accept birth_utc with an explicit offset ("...+05:30") by converting it
+        params["birth_utc"] = parse_local_datetime(params["birth_utc"]).isoformat()
+    if op in ("chart", "dasha") and not params.get("target"):
+        params["target"] = datetime.now().strftime("%Y-%m-%dT00:00:00")
+    if op == "weekly-transits" and not params.get("start_date"):
+        from weekly_transit_analyzer import get_week_dates
+        params["start_date"] = get_week_dates()[0].strftime("%Y-%m-%d")
+    return params
+
+
+def cache_key(op: str, params: Dict) -> str:
+    """Canonical cache key for normalized request params"""
+    return op + ":" + json.dumps(params, sort_keys=True)
+
+
+class ServiceState:
+    """Worker pool, LRU response cache and latency samples shared by handler threads"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, cache_size: int = CACHE_SIZE):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=worker_init)
+        self.workers = workers
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, deque] = {}
+        self.counts = {"requests": 0, "cache_hits": 0, "cache_misses": 0, "errors": 0}
+
+        # Start every worker now rather than on first request
+        list(self.pool.map(time.sleep, [0] * workers))
+
+    def cache_get(self, key: str) -> Optional[Dict]:
+        with self.lock:
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache.move_to_end(key)
+                self.counts["cache_hits"] += 1
+            else:
+                self.counts["cache_misses"] += 1
+            return value
+
+    def cache_put(self, key: str, value: Dict) -> None:
+        with self.lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def resolve(self, items: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Answer items from cache, sending only misses to a worker as one batch"""
+        results: List[Optional[Dict]] = [None] * len(items)
+        normalized, keys = list(items), [None] * len(items)
+        for i, (op, params) in enumerate(items):
+            # Bad dates or unknown timezones are per-item errors, like failures in run_batch
+            try:
+                normalized[i] = (op, normalize_params(op, params))
+            except (KeyError, TypeError, ValueError) as e:
+                results[i] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+            keys[i] = cache_key(*normalized[i])
+            results[i] = self.cache_get(keys[i])
+        items = normalized
+        misses = [i for i, r in enumerate(results) if r is None]
+
+        if misses:
+            computed = self.pool.submit(run_batch, [items[i] for i in misses]).result()
+            for i, outcome in zip(misses, computed):
+                results[i] = outcome
+                if "result" in outcome:
+                    self.cache_put(keys[i], outcome)
+
+        return results
+
+    def record(self, endpoint: str, seconds: float, error: bool = False) -> None:
+        with self.lock:
+            self.latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+            self.counts["requests"] += 1
+            if error:
+                self.counts["errors"] += 1
+
+    def stats(self) -> Dict:
+        with self.lock:
+            endpoints = {
+                name: latency_summary(list(samples))
+                for name, samples in self.latencies.items()
+            }
+            lookups = self.counts["cache_hits"] + self.counts["cache_misses"]
+            return {
+                **self.counts,
+                "workers": self.workers,
+                "cache_entries": len(self.cache),
+                "cache_hit_rate": round(self.counts["cache_hits"] / lookups, 4) if lookups else 0.0,
+                "endpoints": endpoints,
+            }
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(samples: List[float]) -> Dict:
+    """Count, p50, p99 and max latency in milliseconds"""
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+    }
+
+
+# ============================================
+# HTTP HANDLER
+# ============================================
+
+class ChartServiceHandler(BaseHTTPRequestHandler):
+    """JSON request handler; the ServiceState is attached to the server"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; avoid Nagle + delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, payload: Dict) -> None:
+        """Send payload as JSON, or in the binary codec if the client accepts it"""
+        from binary_codec import CONTENT_TYPE, encode
+
+        if CONTENT_TYPE in self.headers.get("Accept", ""):
+            body, content_type = encode(payload), CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self.send_json(200, {"status": "ok"})
+        if self.path == "/stats":
+            return self.send_json(200, self.server.state.stats())
+        return self.send_json(404, {"error": f"no route for {self.path}"})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        endpoint = self.path.strip("/")
+        state = self.server.state
+        status, payload = 500, {"error": "internal error"}
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            if not isinstance(body, dict):
+                status, payload = 400, {"error": "JSON body must be an object"}
+            elif endpoint == "batch":
+                requests = body.get("requests", [])
+                if not isinstance(requests, list) or not all(
+                    isinstance(r, dict) and isinstance(r.get("params", {}), dict) for r in requests
+                ):
+                    status, payload = 400, {"error": "requests must be a list of objects with dict params"}
+                elif len(requests) > MAX_BATCH_SIZE:
+                    status, payload = 400, {"error": f"batch larger than {MAX_BATCH_SIZE}"}
+                elif any(r.get("op") not in OPERATIONS for r in requests):
+                    status, payload = 400, {"error": f"op must be one of {OPERATIONS}"}
+                else:
+                    items = [(r["op"], r.get("params", {})) for r in requests]
+                    status, payload = 200, {"results": state.resolve(items)}
+            elif endpoint in OPERATIONS:
+                outcome = state.resolve([(endpoint, body)])[0]
+                status, payload = (200, outcome["result"]) if "result" in outcome else (400, outcome)
+            else:
+                status, payload = 404, {"error": f"no route for {self.path}"}
+        except json.JSONDecodeError:
+            status, payload = 400, {"error": "invalid JSON body"}
+        finally:
+            self.send_json(status, payload)
+            state.record(endpoint, time.perf_counter() - start, error=status >= 400)
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8787, workers: int = DEFAULT_WORKERS,
+                  cache_size: int = CACHE_SIZE) -> ThreadingHTTPServer:
+    """Create the HTTP server with a warm worker pool attached as server.state"""
+    server = ThreadingHTTPServer((host, port), ChartServiceHandler)
+    server.daemon_threads = True
+    server.state = ServiceState(workers, cache_size)
+    return server
+
+
+# ============================================
+# LOAD TEST
+# ============================================
+
+def load_test(base_url: str, total: int = 1000, concurrency: int = 8,
+              unique_charts: int = 500, seed: int = 42) -> Dict:
+    """Send chart requests from concurrent keep-alive clients and measure client-side latency
+
+    unique_charts controls the mix of cache hits and misses.
+    """
+    import http.client
+    import random
+    from datetime import timedelta
+    from urllib.parse import urlparse
+
+    rng = random.Random(seed)
+    base = datetime(1960, 1, 1)
+    bodies = [
+        json.dumps({
+            "birth_utc": (base + timedelta(minutes=rng.randrange(60 * 24 * 365 * 50))).isoformat(),
+            "latitude": round(rng.uniform(-50, 60), 4),
+            "longitude": round(rng.uniform(-180, 180), 4),
+            "target": "2026-01-19T12:00:00",
+        })
+        for _ in range(unique_charts)
+    ]
+    url = urlparse(base_url)
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client(count: int) -> None:
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+        local = []
+        for _ in range(count):
+            body = rng.choice(bodies)
+            start = time.perf_counter()
+            conn.request("POST", "/chart", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+            if response.status != 200:
+                with lock:
+                    errors[0] += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    per_client = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    threads = [threading.Thread(target=client, args=(n,)) for n in per_client]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors[0],
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        **latency_summary(latencies),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Chart and transit HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--load-test", action="store_true", help="Start on a free port, run a load test and exit")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--unique-charts", type=int, default=500)
+    args = parser.parse_args()
+
+    port = 0 if args.load_test else args.port
+    server = create_server(args.host, port, args.workers, args.cache_size)
+    host, port = server.server_address[:2]
+    print(f"Chart service on http://{host}:{port} with {args.workers} warm workers")
+
+    if args.load_test:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        result = load_test(f"http://{host}:{port}", args.requests, args.concurrency, args.unique_charts)
+        print("\nLOAD TEST (client side)")
+        print(json.dumps(result, indent=2))
+        print("\nSERVICE STATS (server side)")
+        print(json.dumps(server.state.stats(), indent=2))
+        server.shutdown()
+        server.state.shutdown()
+    else:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.state.shutdown()
@@ -8,41 +8,99 @@ Set environment variables first:
 """
 
 import os
+import time
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from vedic_calculator import get_full_birth_chart
+from timezones import resolve_zone, to_utc
 
-# Prokerala API endpoints
-TOKEN_URL = "https://api.prokerala.com/token"
-BIRTH_DETAILS_URL = "https://api.prokerala.com/v2/astrology/birth-details"
-PLANET_POSITION_URL = "https://api.prokerala.com/v2/astrology/planet-position"
+# Prokerala API endpoints (PROKERALA_BASE_URL can point at a local replay server)
+BASE_URL = os.environ.get("PROKERALA_BASE_URL", "https://api.prokerala.com").rstrip("/")
+TOKEN_URL = f"{BASE_URL}/token"
+BIRTH_DETAILS_URL = f"{BASE_URL}/v2/astrology/birth-details"
+PLANET_POSITION_URL = f"{BASE_URL}/v2/astrology/planet-position"
 
+# Refresh the cached token this many seconds before it expires
+TOKEN_EXPIRY_MARGIN = 60
+
+# Cached OAuth2 token, reused until it nears expiry
+_token_cache = {"token": None, "expires_at": 0.0}
+
+# Shared keep-alive session for all Prokerala requests
+_session = requests.Session()
+
+
+# Vedic to Western sign mapping
+VEDIC_TO_WESTERN = {
+    "mesha": "aries", "vrishabha": "taurus", "mithuna": "gemini",
+    "karka": "cancer", "simha": "leo", "kanya": "virgo",
+    "tula": "libra", "vrischika": "scorpio", "vrishchika": "scorpio",
+    "dhanu": "sagittarius", "makara": "capricorn",
+    "kumbha": "aquarius", "meena": "pisces"
+}
+
+# Planet lord name mapping (Vedic to standard)
+LORD_NAME_MAP = {
+    "guru": "jupiter", "shani": "saturn", "budha": "mercury",
+    "shukra": "venus", "mangal": "mars", "surya": "sun",
+    "chandra": "moon"
+}
+
+
+def normalize_sign(name):
+    """Convert Vedic sign name to Western equivalent"""
+    return VEDIC_TO_WESTERN.get(name.lower(), name.lower())
+
+
+def normalize_lord(name):
+    """Normalize planet lord name"""
+    return LORD_NAME_MAP.get(name.lower(), name.lower())
+
+
+def normalize_nakshatra(name):
+    """Normalize nakshatra name for comparison (case and spacing)"""
+    return name.lower().replace(" ", "")
+
+
+def get_prokerala_token(force_refresh: bool = False):
+    """Get OAuth2 access token from Prokerala (cached until shortly before expiry)"""
+    if not force_refresh and _token_cache["token"] and time.time() < _token_cache["expires_at"]:
+        return _token_cache["token"]
 
-def get_prokerala_token():
-    """Get OAuth2 access token from Prokerala"""
     client_id = os.environ.get("PROKERALA_CLIENT_ID")
     client_secret = os.environ.get("PROKERALA_CLIENT_SECRET")
 
     if not client_id or not client_secret:
         raise ValueError("Set PROKERALA_CLIENT_ID and PROKERALA_CLIENT_SECRET environment variables")
 
-    response = requests.post(TOKEN_URL, data={
+    response = _session.post(TOKEN_URL, data={
         "grant_type": "client_credentials",
         "client_id": client_id,
         "client_secret": client_secret,
-    })
+    }, timeout=30)
 
     if not response.ok:
         raise Exception(f"Failed to get token: {response.text}")
 
-    return response.json()["access_token"]
+    data = response.json()
+    _token_cache["token"] = data["access_token"]
+    _token_cache["expires_at"] = time.time() + data.get("expires_in", 3600) - TOKEN_EXPIRY_MARGIN
+    return _token_cache["token"]
+
+
+def prokerala_get(url: str, params: dict):
+    """GET a Prokerala endpoint with the cached token, refreshing it once on 401"""
+    response = None
+    for force_refresh in (False, True):
+        token = get_prokerala_token(force_refresh)
+        response = _session.get(url, params=params, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+        if response.status_code != 401:
+            break
+    return response
 
 
 def get_prokerala_data(datetime_str: str, lat: float, lon: float):
     """Call Prokerala API for birth details and planet positions"""
-    token = get_prokerala_token()
-    headers = {"Authorization": f"Bearer {token}"}
-
     params = {
         "datetime": datetime_str,
         "coordinates": f"{lat},{lon}",
@@ -51,13 +109,13 @@ def get_prokerala_data(datetime_str: str, lat: float, lon: float):
     }
 
     # Get birth details
-    birth_resp = requests.get(BIRTH_DETAILS_URL, params=params, headers=headers)
+    birth_resp = prokerala_get(BIRTH_DETAILS_URL, params)
     if not birth_resp.ok:
         raise Exception(f"Birth details error: {birth_resp.text}")
     birth_data = birth_resp.json()["data"]
 
     # Get planet positions
-    planet_resp = requests.get(PLANET_POSITION_URL, params=params, headers=headers)
+    planet_resp = prokerala_get(PLANET_POSITION_URL, params)
     if not planet_resp.ok:
         raise Exception(f"Planet position error: {planet_resp.text}")
     planet_data = planet_resp.json()["data"]
@@ -68,38 +126,31 @@ def get_prokerala_data(datetime_str: str, lat: float, lon: float):
 def compare_calculations(
     birth_date: str,
     birth_time: str,
-    timezone_offset: float,
+    timezone_offset,
     lat: float,
     lon: float,
     location_name: str = ""
 ):
-    """Compare internal calculations vs Prokerala"""
+    """Compare internal calculations vs Prokerala
+
+    timezone_offset is either hours from UTC (e.g. 5.5) or an IANA zone name
+    (e.g. "America/Los_Angeles"), which also accounts for historical DST.
+    """
 
     print("=" * 70)
     print(f"COMPARISON: Internal Calculator vs Prokerala API")
     print(f"Birth: {birth_date} {birth_time} ({location_name})")
     print("=" * 70)
 
-    # Parse birth datetime
-    local_dt = datetime.strptime(f"{birth_date} {birth_time}", "%Y-%m-%d %H:%M")
+    # Parse birth datetime in its timezone
+    if isinstance(timezone_offset, str):
+        zone = resolve_zone(timezone_offset)
+    else:
+        zone = timezone(timedelta(hours=timezone_offset))
+    local_dt = datetime.strptime(f"{birth_date} {birth_time}", "%Y-%m-%d %H:%M").replace(tzinfo=zone)
 
     # Convert to UTC for internal calculations
-    utc_hour = local_dt.hour - int(timezone_offset)
-    utc_minute = local_dt.minute - int((timezone_offset % 1) * 60)
-    if utc_minute < 0:
-        utc_minute += 60
-        utc_hour -= 1
-    utc_day = local_dt.day
-    utc_month = local_dt.month
-    utc_year = local_dt.year
-    if utc_hour < 0:
-        utc_hour += 24
-        utc_day -= 1
-    elif utc_hour >= 24:
-        utc_hour -= 24
-        utc_day += 1
-
-    birth_utc = datetime(utc_year, utc_month, utc_day, utc_hour, utc_minute, 0)
+    birth_utc = to_utc(local_dt)
 
     # Run internal calculation
     print("\n[1] Running internal Swiss Ephemeris calculation...")
@@ -107,11 +158,8 @@ def compare_calculations(
 
     # Get Prokerala data
     print("[2] Calling Prokerala API...")
-    # Prokerala expects ISO format with timezone
-    tz_sign = "+" if timezone_offset >= 0 else "-"
-    tz_hours = int(abs(timezone_offset))
-    tz_mins = int((abs(timezone_offset) % 1) * 60)
-    datetime_str = f"{birth_date}T{birth_time}:00{tz_sign}{tz_hours:02d}:{tz_mins:02d}"
+    # Prokerala expects ISO format with the UTC offset in effect at birth
+    datetime_str = local_dt.isoformat()
 
     try:
         birth_data, planet_data = get_prokerala_data(datetime_str, lat, lon)
@@ -121,30 +169,6 @@ def compare_calculations(
         print_internal_results(internal)
         return
 
-    # Vedic to Western sign mapping
-    vedic_to_western = {
-        "mesha": "aries", "vrishabha": "taurus", "mithuna": "gemini",
-        "karka": "cancer", "simha": "leo", "kanya": "virgo",
-        "tula": "libra", "vrischika": "scorpio", "vrishchika": "scorpio",
-        "dhanu": "sagittarius", "makara": "capricorn",
-        "kumbha": "aquarius", "meena": "pisces"
-    }
-
-    # Planet lord name mapping (Vedic to standard)
-    lord_name_map = {
-        "guru": "jupiter", "shani": "saturn", "budha": "mercury",
-        "shukra": "venus", "mangal": "mars", "surya": "sun",
-        "chandra": "moon"
-    }
-
-    def normalize_sign(name):
-        """Convert Vedic sign name to Western equivalent"""
-        return vedic_to_western.get(name.lower(), name.lower())
-
-    def normalize_lord(name):
-        """Normalize planet lord name"""
-        return lord_name_map.get(name.lower(), name.lower())
-
     # Compare results
     print("\n" + "=" * 70)
     print("COMPARISON RESULTS")
@@ -275,7 +299,7 @@ if __name__ == "__main__":
     compare_calculations(
         birth_date="1986-12-26",
         birth_time="23:50",
-        timezone_offset=-8,  # PST
+        timezone_offset="America/Los_Angeles",  # PST
         lat=33.7879,
         lon=-117.8531,
         location_name="Orange, California"
@@ -0,0 +1,316 @@
+"""
+Ashtakoota Compatibility (Guna Milan)
+The eight kootas from the Moon sign and Moon nakshatra of two charts, 36 points in total
+
+Four kootas depend only on the two Moon signs (Varna, Vashya, Graha Maitri, Bhakoot) and
+four only on the two nakshatras (Tara, Yoni, Gana, Nadi), so every koota is precomputed as
+a 12x12 or 27x27 table. Scoring any number of pairs is two array lookups and an add.
+
+Tables are indexed [boy, girl]: Varna, Vashya and Gana are not symmetric.
+Dosha cancellations (Nadi/Bhakoot exceptions) are not applied.
+
+Usage:
+    result = match_pair(boy_chart, girl_chart)          # per-koota breakdown and total
+    totals = match_one_to_many(chart, candidates)       # float array, one score per candidate
+    matrix = match_matrix(boy_charts, girl_charts)      # (n_boys, n_girls) totals
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from vedic_calculator import SIGNS, NAKSHATRAS
+
+MAX_SCORE = 36
+
+# ============================================
+# SIGN ATTRIBUTES
+# ============================================
+
+# Varna by element: water Brahmin (4), fire Kshatriya (3), earth Vaishya (2), air Shudra (1)
+VARNA_RANK = [3, 2, 1, 4] * 3
+
+# Vashya groups by sign. Sagittarius and Capricorn are split by half in the classics;
+# with whole signs they take their first half (Manava, Chatushpada)
+CHATUSHPADA, MANAVA, JALACHARA, VANACHARA, KEETA = range(5)
+VASHYA_GROUP = [
+    CHATUSHPADA, CHATUSHPADA, MANAVA, JALACHARA, VANACHARA, MANAVA,
+    MANAVA, KEETA, MANAVA, CHATUSHPADA, MANAVA, JALACHARA,
+]
+VASHYA_POINTS = [
+    # Chat Manava Jala Vana Keeta
+    [2.0, 1.0, 1.0, 0.5, 1.0],  # Chatushpada
+    [1.0, 2.0, 0.5, 0.0, 1.0],  # Manava
+    [1.0, 0.5, 2.0, 1.0, 1.0],  # Jalachara
+    [0.5, 0.0, 1.0, 2.0, 0.0],  # Vanachara
+    [1.0, 1.0, 1.0, 0.0, 2.0],  # Keeta
+]
+
+# Natural friendships between sign lords (anything not listed is neutral)
+FRIENDS = {
+    "Sun": {"Moon", "Mars", "Jupiter"},
+    "Moon": {"Sun", "Mercury"},
+    "Mars": {"Sun", "Moon", "Jupiter"},
+    "Mercury": {"Sun", "Venus"},
+    "Jupiter": {"Sun", "Moon", "Mars"},
+    "Venus": {"Mercury", "Saturn"},
+    "Saturn": {"Mercury", "Venus"},
+}
+ENEMIES = {
+    "Sun": {"Venus", "Saturn"},
+    "Moon": set(),
+    "Mars": {"Mercury"},
+    "Mercury": {"Moon"},
+    "Jupiter": {"Mercury", "Venus"},
+    "Venus": {"Sun", "Moon"},
+    "Saturn": {"Sun", "Moon", "Mars"},
+}
+
+# Graha Maitri points by the two attitudes [boy's lord to girl's, girl's lord to boy's]
+# (enemy 0, neutral 1, friend 2): friend/enemy scores 1, unlike neutral/neutral's 3
+MAITRI_POINTS = [
+    # Enemy Neutral Friend
+    [0.0, 0.5, 1.0],  # Enemy
+    [0.5, 3.0, 4.0],  # Neutral
+    [1.0, 4.0, 5.0],  # Friend
+]
+
+# Bhakoot: sign distances (counted from either partner) that score zero: 2/12, 5/9, 6/8
+BHAKOOT_BAD_DISTANCES = {2, 5, 6, 8, 9, 12}
+
+# ============================================
+# NAKSHATRA ATTRIBUTES
+# ============================================
+
+# Yoni animals, and the nakshatra -> animal index in NAKSHATRAS order
+YONI_ANIMALS = [
+    "Horse", "Elephant", "Sheep", "Serpent", "Dog", "Cat", "Rat",
+    "Cow", "Buffalo", "Tiger", "Deer", "Monkey", "Mongoose", "Lion",
+]
+NAKSHATRA_YONI = [
+    0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9,
+    8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1,
+]
+YONI_POINTS = [
+    # Hr El Sh Se Do Ca Ra Co Bu Ti De Mo Mg Li
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],  # Horse
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],  # Elephant
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],  # Sheep
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],  # Serpent
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],  # Dog
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],  # Cat
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],  # Rat
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],  # Cow
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],  # Buffalo
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],  # Tiger
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],  # Deer
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],  # Monkey
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],  # Mongoose
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],  # Lion
+]
+
+# Gana: Deva 0, Manushya 1, Rakshasa 2
+NAKSHATRA_GANA = [
+    0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2,
+    0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0,
+]
+GANA_POINTS = [
+    # Deva Manushya Rakshasa (girl)
+    [6.0, 6.0, 1.0],  # Deva (boy)
+    [5.0, 6.0, 0.0],  # Manushya
+    [1.0, 0.0, 6.0],  # Rakshasa
+]
+
+# Nadi: Adi, Madhya, Antya repeat 0 1 2 2 1 0 ... through the nakshatras
+NAKSHATRA_NADI = [[0, 1, 2, 2, 1, 0][i % 6] for i in range(27)]
+
+# Tara: counts (mod 9) that fall on Vipat, Pratyak and Naidhana
+TARA_BAD = {3, 5, 7}
+
+
+# ============================================
+# TABLES
+# ============================================
+
+def relation(lord: str, other: str) -> int:
+    """2 friend, 1 neutral, 0 enemy (a lord is its own friend)"""
+    if lord == other or other in FRIENDS[lord]:
+        return 2
+    return 0 if other in ENEMIES[lord] else 1
+
+
+def tara_points(boy: int, girl: int) -> float:
+    """1.5 points for each direction whose count avoids Vipat, Pratyak and Naidhana"""
+    points = 0.0
+    for start, end in ((girl, boy), (boy, girl)):
+        tara = ((end - start) % 27 + 1) % 9 or 9
+        if tara not in TARA_BAD:
+            points += 1.5
+    return points
+
+
+def build_tables() -> Dict[str, Tuple[np.ndarray, str, float]]:
+    """Every koota as (table indexed [boy, girl], "sign" or "nakshatra", maximum points)"""
+    lords = [sign["lord"] for sign in SIGNS]
+
+    def table(n, points):
+        return np.array([[points(b, g) for g in range(n)] for b in range(n)], dtype=np.float32)
+
+    return {
+        "varna": (table(12, lambda b, g: 1.0 if VARNA_RANK[b] >= VARNA_RANK[g] else 0.0), "sign", 1),
+        "vashya": (table(12, lambda b, g: VASHYA_POINTS[VASHYA_GROUP[b]][VASHYA_GROUP[g]]), "sign", 2),
+        "tara": (table(27, tara_points), "nakshatra", 3),
+        "yoni": (table(27, lambda b, g: YONI_POINTS[NAKSHATRA_YONI[b]][NAKSHATRA_YONI[g]]), "nakshatra", 4),
+        "graha_maitri": (table(12, lambda b, g: MAITRI_POINTS[relation(lords[b], lords[g])]
+                                                            [relation(lords[g], lords[b])]), "sign", 5),
+        "gana": (table(27, lambda b, g: GANA_POINTS[NAKSHATRA_GANA[b]][NAKSHATRA_GANA[g]]), "nakshatra", 6),
+        "bhakoot": (table(12, lambda b, g: 0.0 if (g - b) % 12 + 1 in BHAKOOT_BAD_DISTANCES else 7.0),
+                    "sign", 7),
+        "nadi": (table(27, lambda b, g: 0.0 if NAKSHATRA_NADI[b] == NAKSHATRA_NADI[g] else 8.0),
+                 "nakshatra", 8),
+    }
+
+
+KOOTA_TABLES = build_tables()
+
+# All sign kootas and all nakshatra kootas summed: total = SIGN_SCORES + NAKSHATRA_SCORES
+SIGN_SCORES = sum(t for t, kind, _ in KOOTA_TABLES.values() if kind == "sign")
+NAKSHATRA_SCORES = sum(t for t, kind, _ in KOOTA_TABLES.values() if kind == "nakshatra")
+
+
+# ============================================
+# SCORING
+# ============================================
+
+def moon_indices(charts: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Moon sign and nakshatra index arrays from get_full_birth_chart outputs"""
+    signs = np.array([chart["moon_sign"]["index"] for chart in charts], dtype=np.intp)
+    naks = np.array([chart["moon_nakshatra"]["index"] for chart in charts], dtype=np.intp)
+    return signs, naks
+
+
+def total_scores(boy_sign, boy_nakshatra, girl_sign, girl_nakshatra) -> np.ndarray:
+    """Guna milan totals for index arrays (numpy broadcasting applies)"""
+    return SIGN_SCORES[boy_sign, girl_sign] + NAKSHATRA_SCORES[boy_nakshatra, girl_nakshatra]
+
+
+def koota_scores(boy_sign, boy_nakshatra, girl_sign, girl_nakshatra) -> Dict[str, np.ndarray]:
+    """Points per koota (and "total") for index arrays"""
+    scores = {}
+    for name, (table, kind, _) in KOOTA_TABLES.items():
+        scores[name] = table[boy_sign, girl_sign] if kind == "sign" else table[boy_nakshatra, girl_nakshatra]
+    scores["total"] = total_scores(boy_sign, boy_nakshatra, girl_sign, girl_nakshatra)
+    return scores
+
+
+def verdict(total: float) -> str:
+    if total >= 33:
+        return "Excellent"
+    if total >= 25:
+        return "Very good"
+    if total >= 18:
+        return "Average"
+    return "Not recommended"
+
+
+def match_pair(boy_chart: Dict, girl_chart: Dict) -> Dict:
+    """Per-koota points, total out of 36 and a verdict for one pair of charts"""
+    (boy_sign,), (boy_nak,) = moon_indices([boy_chart])
+    (girl_sign,), (girl_nak,) = moon_indices([girl_chart])
+    scores = koota_scores(boy_sign, boy_nak, girl_sign, girl_nak)
+    total = float(scores.pop("total"))
+    return {
+        "kootas": {
+            name: {"points": float(points), "max": KOOTA_TABLES[name][2]}
+            for name, points in scores.items()
+        },
+        "total": total,
+        "max": MAX_SCORE,
+        "verdict": verdict(total),
+        "boy": {"moon_sign": SIGNS[boy_sign]["vedic"], "nakshatra": NAKSHATRAS[boy_nak]["name"]},
+        "girl": {"moon_sign": SIGNS[girl_sign]["vedic"], "nakshatra": NAKSHATRAS[girl_nak]["name"]},
+    }
+
+
+def match_one_to_many(chart: Dict, candidates: List[Dict], chart_is_boy: bool = True) -> np.ndarray:
+    """Totals for chart against every candidate (chart_is_boy sets which side chart takes)"""
+    (sign,), (nak,) = moon_indices([chart])
+    signs, naks = moon_indices(candidates)
+    if chart_is_boy:
+        return total_scores(sign, nak, signs, naks)
+    return total_scores(signs, naks, sign, nak)
+
+
+def match_matrix(boy_charts: List[Dict], girl_charts: List[Dict]) -> np.ndarray:
+    """(len(boy_charts), len(girl_charts)) matrix of totals"""
+    boy_signs, boy_naks = moon_indices(boy_charts)
+    girl_signs, girl_naks = moon_indices(girl_charts)
+    return total_scores(boy_signs[:, None], boy_naks[:, None], girl_signs[None, :], girl_naks[None, :])
+
+
+# ============================================
+# EXAMPLE: One pair, and bulk scoring throughput
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    from datetime import datetime
+
+    from vedic_calculator import get_full_birth_chart
+
+    boy = get_full_birth_chart(datetime(1986, 12, 27, 7, 50), 33.7879, -117.8531)
+    girl = get_full_birth_chart(datetime(1988, 6, 14, 15, 20), 40.7128, -74.0060)
+    result = match_pair(boy, girl)
+    print(f"Boy:  Moon in {result['boy']['moon_sign']}, {result['boy']['nakshatra']}")
+    print(f"Girl: Moon in {result['girl']['moon_sign']}, {result['girl']['nakshatra']}")
+    for name, koota in result["kootas"].items():
+        print(f"  {name:<13} {koota['points']:>4} / {koota['max']}")
+    print(f"  {'total':<13} {result['total']:>4} / {result['max']}  ({result['verdict']})")
+
+    # Graha Maitri from the friendship lists, by the classical table of attitude pairs
+    maitri_by_attitudes = {
+        ("friend", "friend"): 5, ("friend", "neutral"): 4, ("neutral", "neutral"): 3,
+        ("enemy", "friend"): 1, ("enemy", "neutral"): 0.5, ("enemy", "enemy"): 0,
+    }
+
+    def attitude(lord, other):
+        if lord == other or other in FRIENDS[lord]:
+            return "friend"
+        return "enemy" if other in ENEMIES[lord] else "neutral"
+
+    def maitri(b_sign, g_sign):
+        b_lord, g_lord = SIGNS[b_sign]["lord"], SIGNS[g_sign]["lord"]
+        return maitri_by_attitudes[tuple(sorted((attitude(b_lord, g_lord), attitude(g_lord, b_lord))))]
+
+    # Moon (Karka) and Mercury (Mithuna): friend one way, enemy the other
+    assert maitri(3, 2) == maitri(2, 3) == KOOTA_TABLES["graha_maitri"][0][3, 2] == 1.0
+
+    # Scalar reference for the tables: recompute every koota from the attribute lists
+    for b_sign in range(12):
+        for b_nak in range(27):
+            for g_sign in range(12):
+                for g_nak in range(27):
+                    expected = (
+                        (VARNA_RANK[b_sign] >= VARNA_RANK[g_sign])
+                        + VASHYA_POINTS[VASHYA_GROUP[b_sign]][VASHYA_GROUP[g_sign]]
+                        + tara_points(b_nak, g_nak)
+                        + YONI_POINTS[NAKSHATRA_YONI[b_nak]][NAKSHATRA_YONI[g_nak]]
+                        + maitri(b_sign, g_sign)
+                        + GANA_POINTS[NAKSHATRA_GANA[b_nak]][NAKSHATRA_GANA[g_nak]]
+                        + (0 if (g_sign - b_sign) % 12 + 1 in BHAKOOT_BAD_DISTANCES else 7)
+                        + (0 if NAKSHATRA_NADI[b_nak] == NAKSHATRA_NADI[g_nak] else 8)
+                    )
+                    assert total_scores(b_sign, b_nak, g_sign, g_nak) == expected
+    assert (np.array(YONI_POINTS) == np.array(YONI_POINTS).T).all()
+    assert sum(max_points for _, _, max_points in KOOTA_TABLES.values()) == MAX_SCORE
+
+    rng = np.random.default_rng(42)
+    n = 2_000
+    signs, naks = rng.integers(0, 12, n), rng.integers(0, 27, n)
+
+    start = time.perf_counter()
+    matrix = total_scores(signs[:, None], naks[:, None], signs[None, :], naks[None, :])
+    elapsed = time.perf_counter() - start
+    print(f"\nAll pairs of {n:,} people: {matrix.size:,} scores in {elapsed * 1000:.1f} ms "
+          f"({matrix.size / elapsed / 1e6:.0f} million pairs/s)")
+    print(f"Mean {matrix.mean():.1f}, >= 18 points: {(matrix >= 18).mean():.0%}")
@@ -0,0 +1,146 @@
+"""
+Weekly Content Log
+Append-only JSONL log of generated horoscope content, written as each call completes
+The final weekly_horoscope_<date>.json is built from the log, and a rerun resumes from it
+"""
+
+import os
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Sections in the order they appear in the final content JSON
+CONTENT_SECTIONS = ["master_overview", "moon_signs", "nakshatras"]
+
+# Placeholder prefix returned by call_claude on failure - never treated as done
+ERROR_TEXT_PREFIX = "[Error generating content"
+
+
+def log_filename_for(week_start: str) -> str:
+    """Default log path for a week's content"""
+    return f"weekly_horoscope_{week_start}.jsonl"
+
+
+def scan_content_log(path: str) -> Tuple[List[Dict], int]:
+    """Complete events from a log and the byte length they occupy
+
+    Reading stops at a torn final line from a crash (no newline, or invalid JSON).
+    """
+    events = []
+    valid_bytes = 0
+    if not os.path.exists(path):
+        return events, valid_bytes
+
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                break
+            valid_bytes += len(line)
+
+    return events, valid_bytes
+
+
+def read_content_log(path: str) -> List[Dict]:
+    """Read all complete events from a log (a torn final line from a crash is ignored)"""
+    return scan_content_log(path)[0]
+
+
+def build_content_from_events(events: List[Dict]) -> Dict:
+    """Replay log events into the weekly content structure (later entries win)"""
+    content: Dict = {}
+
+    for event in events:
+        if event["type"] == "meta":
+            for field in ("week_start", "week_end", "generated_at"):
+                content.setdefault(field, event[field])
+        elif event["type"] == "item":
+            if event["key"] is None:
+                content[event["section"]] = event["text"]
+            else:
+                content.setdefault(event["section"], {})[event["key"]] = event["text"]
+
+    return content
+
+
+class ContentLog:
+    """Append-only writer for one week's content log
+
+    Each event is flushed and fsynced as it is written, so a crash loses at
+    most the call in flight. Reopening an existing log for the same week
+    resumes it: items already logged are available through get().
+    """
+
+    def __init__(self, path: str, week_start: str, week_end: str):
+        self.path = path
+        self.events, valid_bytes = scan_content_log(path)
+        self.content = build_content_from_events(self.events)
+
+        if self.content and self.content.get("week_start") != week_start:
+            raise ValueError(
+                f"{path} holds content for week {self.content.get('week_start')}, not {week_start}"
+            )
+
+        # Cut off a torn trailing line so appends start on a clean line; complete
+        # events are never rewritten
+        if os.path.exists(path) and os.path.getsize(path) > valid_bytes:
+            with open(path, "r+b") as f:
+                f.truncate(valid_bytes)
+                os.fsync(f.fileno())
+
+        self.file = open(path, "a")
+        if not self.events:
+            self._write({
+                "type": "meta",
+                "week_start": week_start,
+                "week_end": week_end,
+                "generated_at": datetime.now().isoformat(),
+            })
+
+    def _write(self, event: Dict) -> None:
+        self.file.write(json.dumps(event) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.events.append(event)
+
+    def get(self, section: str, key: Optional[str] = None) -> Optional[str]:
+        """Return already-logged text for an item, or None if it still needs generating"""
+        value = self.content.get(section)
+        if key is not None:
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is None or value.startswith(ERROR_TEXT_PREFIX):
+            return None
+        return value
+
+    def append(self, section: str, key: Optional[str], text: str) -> None:
+        """Log one generated item (key is None for single-value sections)"""
+        self._write({"type": "item", "section": section, "key": key, "text": text})
+        if key is None:
+            self.content[section] = text
+        else:
+            self.content.setdefault(section, {})[key] = text
+
+    def complete_section(self, section: str) -> None:
+        """Mark a section as fully generated"""
+        self._write({"type": "section_complete", "section": section})
+
+    def complete(self) -> None:
+        """Mark the whole week as generated"""
+        self._write({"type": "complete"})
+
+    def build_content(self) -> Dict:
+        """Build the content dict from everything logged so far"""
+        return build_content_from_events(self.events)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
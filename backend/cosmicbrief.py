@@ -0,0 +1,425 @@
+"""
+CosmicBrief Command Line
+One entry point for the backend: charts, transits, prompts, content generation, upload and email send
+
+Each subcommand imports only what it needs, so short invocations (cron jobs, edge workers,
+horoscope lookups) never load the Anthropic SDK or requests.
+
+Run with:
+  python cosmicbrief.py chart 1986-12-26T23:50 --tz America/Los_Angeles --lat 33.7879 --lon -117.8531
+  python cosmicbrief.py transits --start 2026-01-19
+  python cosmicbrief.py year-ahead 1986-12-26T23:50 --tz America/Los_Angeles --lat 33.7879 --lon -117.8531 --year 2026
+  python cosmicbrief.py build-positions --workers 8
+  python cosmicbrief.py prompts --start 2026-01-19 --out prompts.json
+  python cosmicbrief.py generate --nakshatra-batching lord --upload
+  python cosmicbrief.py backfill --from 2025-01-06 --to 2026-03-30 --nakshatra-batching lord --out-dir archive --upload
+  python cosmicbrief.py upload weekly_horoscope_2026-01-19.json --components
+  python cosmicbrief.py send --test-email you@example.com
+  python cosmicbrief.py horoscope weekly_horoscope_2026-01-19.json Kumbha "Purva Bhadrapada" Mercury
+  python cosmicbrief.py startup-time
+
+Add --timing (before the subcommand) to print startup and command time to stderr.
+"""
+
+import time
+
+PROCESS_START = time.perf_counter()
+
+import os
+import sys
+import json
+import argparse
+from typing import Dict, List
+
+# Modules each subcommand loads (used by startup-time)
+COMMAND_MODULES = {
+    "chart": ["vedic_calculator", "timezones"],
+    "transits": ["weekly_transit_analyzer"],
+    "year-ahead": ["year_ahead"],
+    "build-positions": ["position_dataset"],
+    "prompts": ["weekly_transit_analyzer", "weekly_horoscope_generator"],
+    "generate": ["weekly_horoscope_api", "weekly_transit_analyzer", "weekly_horoscope_generator", "anthropic"],
+    "backfill": ["weekly_backfill", "weekly_transit_analyzer", "weekly_horoscope_generator", "anthropic"],
+    "upload": ["weekly_horoscope_api", "supabase_client"],
+    "send": ["weekly_horoscope_api", "supabase_client"],
+    "horoscope": ["weekly_horoscope_api"],
+}
+
+# Fresh processes started per command when measuring startup
+STARTUP_RUNS = 5
+
+
+def parse_date(value: str):
+    from datetime import datetime
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def load_data(path: str) -> Dict:
+    """Load a JSON or binary (.cbc) file"""
+    from binary_codec import load
+    return load(path)
+
+
+def save_data(obj: Dict, path: str) -> None:
+    """Save as binary if path ends in .cbc, otherwise as JSON"""
+    from binary_codec import save
+    save(obj, path)
+
+
+# ============================================
+# SUBCOMMANDS
+# ============================================
+
+def cmd_chart(args) -> int:
+    from datetime import datetime
+    from vedic_calculator import get_full_birth_chart
+
+    birth_dt = datetime.fromisoformat(args.birth)
+    target_dt = datetime.fromisoformat(args.target) if args.target else None
+    chart = get_full_birth_chart(birth_dt, args.lat, args.lon, target_dt, tz=args.tz)
+    if args.vargas:
+        from vargas import varga_chart
+        chart["vargas"] = varga_chart(chart)
+
+    if args.json:
+        print(json.dumps(chart, indent=2))
+        return 0
+
+    print(f"Birth Time: {chart['birth_time']} UTC")
+    print(f"Ascendant:  {chart['ascendant']['sign']['vedic']} ({chart['ascendant']['sign']['western']}) "
+          f"{chart['ascendant']['sign']['degree']}°")
+    print(f"Moon:       {chart['moon_sign']['vedic']} ({chart['moon_sign']['western']}), "
+          f"{chart['moon_nakshatra']['name']} pada {chart['moon_nakshatra']['pada']}")
+    print(f"Sun:        {chart['sun_sign']['vedic']} ({chart['sun_sign']['western']})")
+    dasha = chart["current_dasha"]
+    if "error" in dasha:
+        print(f"Dasha:      {dasha['error']}")
+    else:
+        bhukti = f" / {dasha['bhukti']['lord']}" if dasha["bhukti"] else ""
+        print(f"Dasha:      {dasha['mahadasha']['lord']}{bhukti}")
+
+    if args.vargas:
+        print(f"\n{'':<8} " + " ".join(f"{name:>5}" for name in chart["vargas"]))
+        for body in chart["vargas"]["D9"]:
+            print(f"{body:<8} " + " ".join(
+                f"{placements[body]['western'][:3]:>5}" for placements in chart["vargas"].values()
+            ))
+    return 0
+
+
+def cmd_transits(args) -> int:
+    from weekly_transit_analyzer import generate_weekly_analysis, format_weekly_summary
+
+    weekly_data = generate_weekly_analysis(parse_date(args.start) if args.start else None)
+    if args.out:
+        save_data(weekly_data, args.out)
+        print(f"Saved weekly analysis to {args.out}")
+    else:
+        print(format_weekly_summary(weekly_data))
+    return 0
+
+
+def cmd_year_ahead(args) -> int:
+    from datetime import datetime
+    from year_ahead import year_ahead_for_birth
+
+    report = year_ahead_for_birth(datetime.fromisoformat(args.birth), args.lat, args.lon, args.year,
+                                  tz=args.tz, cache_dir=args.cache_dir)
+    if args.out:
+        save_data(report, args.out)
+        print(f"Saved {len(report['events'])} events to {args.out}")
+        return 0
+
+    print(f"Year ahead {args.year}: Moon in {report['moon_sign']}, {report['ascendant']} Lagna")
+    for entry in report["events"]:
+        if entry["type"] in ("mahadasha", "bhukti"):
+            print(f"{entry['time']}  {entry['type']:<10} {entry['mahadasha']}/{entry['bhukti']} until {entry['end']}")
+        else:
+            what = entry["direction"] or "enters"
+            print(f"{entry['time']}  {entry['planet']:<10} {what} {entry['sign']} "
+                  f"(house {entry['house_from_moon']} from Moon, {entry['house_from_lagna']} from Lagna)")
+    return 0
+
+
+def cmd_build_positions(args) -> int:
+    from position_dataset import POSITION_DATASET_DIR, build_table
+
+    for table in args.tables:
+        start = time.perf_counter()
+        path = build_table(table, args.dir or POSITION_DATASET_DIR, args.start_year, args.end_year, args.workers)
+        print(f"Built {path} ({args.start_year}-{args.end_year}) in {time.perf_counter() - start:.0f} s")
+    return 0
+
+
+def weekly_data_from_args(args) -> Dict:
+    """Weekly analysis from --weekly-data if given, otherwise computed for --start"""
+    if getattr(args, "weekly_data", None):
+        return load_data(args.weekly_data)
+    from weekly_transit_analyzer import generate_weekly_analysis
+    return generate_weekly_analysis(parse_date(args.start) if args.start else None)
+
+
+def cmd_prompts(args) -> int:
+    from weekly_horoscope_generator import generate_all_prompts
+
+    prompts = generate_all_prompts(weekly_data_from_args(args), args.nakshatra_batching)
+    if args.out:
+        save_data(prompts, args.out)
+        print(f"Saved prompts to {args.out}")
+    else:
+        print(prompts["master_overview"])
+    return 0
+
+
+def cmd_generate(args) -> int:
+    if not os.environ.get("ANTHROPIC_API_KEY"):
+        print("ANTHROPIC_API_KEY not found in environment", file=sys.stderr)
+        return 2
+
+    from weekly_horoscope_api import (
+        MODEL,
+        generate_weekly_content,
+        save_content_to_file,
+        upload_to_supabase,
+    )
+    from generation_metrics import RunMetrics, save_run_report, write_prometheus_textfile
+
+    weekly_data = weekly_data_from_args(args) if (args.weekly_data or args.start) else None
+    metrics = RunMetrics(MODEL)
+    content = generate_weekly_content(
+        weekly_data,
+        metrics=metrics,
+        nakshatra_grouping=args.nakshatra_batching,
+        log_path=args.log,
+    )
+
+    filename = save_content_to_file(content, args.out)
+    save_run_report(metrics, filename)
+    if args.metrics_textfile:
+        write_prometheus_textfile(metrics, args.metrics_textfile)
+
+    if args.upload and not upload_to_supabase(content, components=args.upload_components):
+        return 1
+    return 0
+
+
+def cmd_backfill(args) -> int:
+    from weekly_backfill import QUEUE_CONCURRENCY, REQUESTS_PER_MINUTE, plan_backfill, run_backfill, week_starts
+
+    rpm = args.rpm or REQUESTS_PER_MINUTE
+    starts = week_starts(parse_date(args.start), parse_date(args.end))
+    if not starts:
+        print("--from is after --to", file=sys.stderr)
+        return 2
+
+    if args.dry_run:
+        plan = plan_backfill(starts, args.nakshatra_batching, args.workers, rpm)
+        print(f"{len(starts)} weeks, {plan['weeks'][0]} to {plan['weeks'][-1]}: analyzed in {plan['analysis_seconds']} s")
+        print(f"{plan['calls']} LLM calls, at least {plan['minimum_minutes']} min at {rpm:g} requests/min")
+        return 0
+
+    if not os.environ.get("ANTHROPIC_API_KEY"):
+        print("ANTHROPIC_API_KEY not found in environment", file=sys.stderr)
+        return 2
+
+    from generation_metrics import write_prometheus_textfile
+
+    results, metrics = run_backfill(
+        starts,
+        nakshatra_grouping=args.nakshatra_batching,
+        out_dir=args.out_dir,
+        upload=args.upload,
+        upload_components=args.upload_components,
+        workers=args.workers,
+        concurrency=args.concurrency or QUEUE_CONCURRENCY,
+        requests_per_minute=rpm,
+    )
+    print(f"\nBackfilled {len(results)} weeks in {metrics.elapsed:.1f} seconds")
+    print(metrics.format_summary())
+    if args.metrics_textfile:
+        write_prometheus_textfile(metrics, args.metrics_textfile)
+
+    failed = [r["week_start"] for r in results if r["errors"] or r["uploaded"] is False]
+    if failed:
+        print(f"Weeks with errors or failed uploads: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_upload(args) -> int:
+    from weekly_horoscope_api import upload_to_supabase
+
+    return 0 if upload_to_supabase(load_data(args.content), components=args.components) else 1
+
+
+def cmd_send(args) -> int:
+    from weekly_horoscope_api import trigger_email_send
+
+    return 0 if trigger_email_send(test_mode=bool(args.test_email), test_email=args.test_email) else 1
+
+
+def cmd_horoscope(args) -> int:
+    from weekly_horoscope_api import assemble_personalized_horoscope
+
+    try:
+        print(assemble_personalized_horoscope(load_data(args.content), args.moon_sign, args.nakshatra, args.mahadasha))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def load_command(name: str) -> None:
+    """Import everything a subcommand needs (the work startup-time measures)"""
+    import importlib
+    for module in COMMAND_MODULES[name]:
+        importlib.import_module(module)
+
+
+def measure_startup(commands: List[str], runs: int = STARTUP_RUNS) -> Dict[str, float]:
+    """Median wall time (ms) of a fresh interpreter that loads each command's modules"""
+    import statistics
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    scripts = {"python (baseline)": "pass", "cosmicbrief": "import cosmicbrief"}
+    scripts.update({
+        name: f"import cosmicbrief; cosmicbrief.load_command({name!r})" for name in commands
+    })
+
+    results = {}
+    for label, script in scripts.items():
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", script], cwd=here, check=True)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[label] = statistics.median(samples)
+    return results
+
+
+def cmd_startup_time(args) -> int:
+    unknown = [name for name in args.commands if name not in COMMAND_MODULES]
+    if unknown:
+        print(f"Unknown commands: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    results = measure_startup(args.commands or list(COMMAND_MODULES), args.runs)
+    for label, ms in results.items():
+        print(f"{label:<20} {ms:8.1f} ms")
+    return 0
+
+
+# ============================================
+# ARGUMENT PARSING
+# ============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cosmicbrief", description="CosmicBrief backend commands")
+    parser.add_argument("--timing", action="store_true", help="Print startup and command time to stderr")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    chart = sub.add_parser("chart", help="Compute a birth chart")
+    chart.add_argument("birth", help="Birth time, ISO format (local with --tz, or with an offset, or UTC)")
+    chart.add_argument("--tz", help="IANA zone of a naive birth time, e.g. America/Los_Angeles")
+    chart.add_argument("--lat", type=float, required=True)
+    chart.add_argument("--lon", type=float, required=True)
+    chart.add_argument("--target", help="Date for the current dasha (default now)")
+    chart.add_argument("--vargas", action="store_true", help="Include D2-D60 divisional chart placements")
+    chart.add_argument("--json", action="store_true", help="Print the full chart as JSON")
+    chart.set_defaults(func=cmd_chart)
+
+    transits = sub.add_parser("transits", help="Weekly transit analysis")
+    transits.add_argument("--start", help="Week start YYYY-MM-DD (default next Monday)")
+    transits.add_argument("--out", help="Write the analysis here (.cbc for binary, else JSON) instead of a summary")
+    transits.set_defaults(func=cmd_transits)
+
+    year = sub.add_parser("year-ahead", help="Transits, stations and dasha changes for a year")
+    year.add_argument("birth", help="Birth time, ISO format (local with --tz, or with an offset, or UTC)")
+    year.add_argument("--tz", help="IANA zone of a naive birth time, e.g. America/Los_Angeles")
+    year.add_argument("--lat", type=float, required=True)
+    year.add_argument("--lon", type=float, required=True)
+    year.add_argument("--year", type=int, required=True)
+    year.add_argument("--cache-dir", help="Keep the year's global events here between runs")
+    year.add_argument("--out", help="Write the timeline (.cbc for binary, else JSON) instead of printing it")
+    year.set_defaults(func=cmd_year_ahead)
+
+    positions = sub.add_parser("build-positions", help="Precompute the memory-mapped daily/hourly position dataset")
+    positions.add_argument("--tables", nargs="+", choices=["daily", "moon_hourly"], default=["daily", "moon_hourly"])
+    positions.add_argument("--start-year", type=int, default=1900)
+    positions.add_argument("--end-year", type=int, default=2100)
+    positions.add_argument("--dir", help="Dataset directory (default cache/positions)")
+    positions.add_argument("--workers", type=int, help="Processes computing years in parallel (default CPU count)")
+    positions.set_defaults(func=cmd_build_positions)
+
+    prompts = sub.add_parser("prompts", help="Build LLM prompts for a week")
+    prompts.add_argument("--start", help="Week start YYYY-MM-DD (default next Monday)")
+    prompts.add_argument("--weekly-data", help="Use a saved weekly analysis (JSON or .cbc) instead of computing one")
+    prompts.add_argument("--nakshatra-batching", choices=["lord", "all"])
+    prompts.add_argument("--out", help="Write all prompts (.cbc for binary, else JSON)")
+    prompts.set_defaults(func=cmd_prompts)
+
+    generate = sub.add_parser("generate", help="Generate weekly content with Claude")
+    generate.add_argument("--start", help="Week start YYYY-MM-DD (default next Monday)")
+    generate.add_argument("--weekly-data", help="Use a saved weekly analysis (JSON or .cbc)")
+    generate.add_argument("--nakshatra-batching", choices=["lord", "all"])
+    generate.add_argument("--log", help="Content log path (default weekly_horoscope_<week>.jsonl)")
+    generate.add_argument("--out", help="Content path, .cbc for binary (default weekly_horoscope_<week>.json)")
+    generate.add_argument("--metrics-textfile", help="Also write Prometheus textfile metrics here")
+    generate.add_argument("--upload", action="store_true", help="Upload to Supabase after generating")
+    generate.add_argument("--upload-components", action="store_true",
+                          help="Also upload one row per component")
+    generate.set_defaults(func=cmd_generate)
+
+    backfill = sub.add_parser("backfill", help="Generate content for a range of past or future weeks")
+    backfill.add_argument("--from", dest="start", required=True, help="First week (YYYY-MM-DD, any day of it)")
+    backfill.add_argument("--to", dest="end", required=True, help="Last week (YYYY-MM-DD, any day of it)")
+    backfill.add_argument("--nakshatra-batching", choices=["lord", "all"])
+    backfill.add_argument("--out-dir", default=".", help="Directory for content, logs and run reports")
+    backfill.add_argument("--workers", type=int, help="Transit analysis processes (default CPU count)")
+    backfill.add_argument("--concurrency", type=int, help="LLM calls in flight (default 8)")
+    backfill.add_argument("--rpm", type=float, help="LLM requests per minute across all weeks (default 300)")
+    backfill.add_argument("--dry-run", action="store_true", help="Analyze weeks and count calls without the API")
+    backfill.add_argument("--metrics-textfile", help="Also write Prometheus textfile metrics here")
+    backfill.add_argument("--upload", action="store_true", help="Upload each week to Supabase as it completes")
+    backfill.add_argument("--upload-components", action="store_true",
+                          help="Also upload one row per component")
+    backfill.set_defaults(func=cmd_backfill)
+
+    upload = sub.add_parser("upload", help="Upload a content JSON to Supabase")
+    upload.add_argument("content")
+    upload.add_argument("--components", action="store_true", help="Also upload one row per component")
+    upload.set_defaults(func=cmd_upload)
+
+    send = sub.add_parser("send", help="Trigger the weekly email send")
+    send.add_argument("--test-email", help="Send a test email to this address only")
+    send.set_defaults(func=cmd_send)
+
+    horoscope = sub.add_parser("horoscope", help="Assemble one personalized horoscope from content")
+    horoscope.add_argument("content")
+    horoscope.add_argument("moon_sign")
+    horoscope.add_argument("nakshatra")
+    horoscope.add_argument("mahadasha")
+    horoscope.set_defaults(func=cmd_horoscope)
+
+    startup = sub.add_parser("startup-time", help="Measure cold start per subcommand")
+    startup.add_argument("commands", nargs="*", metavar="command",
+                         help=f"Commands to measure (default all: {', '.join(COMMAND_MODULES)})")
+    startup.add_argument("--runs", type=int, default=STARTUP_RUNS)
+    startup.set_defaults(func=cmd_startup_time)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    command_start = time.perf_counter()
+    status = args.func(args)
+    if args.timing:
+        end = time.perf_counter()
+        print(f"[timing] startup {(command_start - PROCESS_START) * 1000:.1f} ms, "
+              f"{args.command} {(end - command_start) * 1000:.1f} ms", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
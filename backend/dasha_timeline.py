@@ -0,0 +1,258 @@
+"""
+Vimshottari Dasha Timeline
+Mahadasha, bhukti (antardasha) and pratyantardasha periods from birth as arrays,
+for range queries and the full 120-year life arc
+
+calculate_dasha answers "which period is running on one date"; DashaTimeline answers the same
+question for any date with a binary search, and lists every period change inside a date range.
+Period lengths follow calculate_dasha exactly (years of 365.25 days from the birth moment).
+
+Each level is four flat arrays (lord index, parent index, start and end in days since birth);
+level 3 (810 pratyantardashas) is built on first use. Dates become strings only in life_arc().
+
+Usage:
+    timeline = DashaTimeline(moon_longitude, birth_dt)
+    timeline.at(datetime(2026, 1, 19))              # same shape as calculate_dasha()
+    timeline.changes_between(datetime(2026, 1, 1), datetime(2027, 1, 1))
+    timeline.life_arc()                             # nested mahadasha/antardasha/pratyantardasha dicts
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from vedic_calculator import (
+    DASHA_SEQUENCE,
+    DASHA_YEARS,
+    get_nakshatra_from_longitude,
+)
+from timezones import to_utc
+
+DAYS_PER_YEAR = 365.25
+CYCLE_YEARS = 120
+
+# Mahadashas covered from birth: the partial first one plus nine full ones (as calculate_dasha)
+MAHADASHA_COUNT = 10
+
+# Level names (1 = mahadasha); bhukti and antardasha are the same level
+LEVEL_NAMES = ["mahadasha", "antardasha", "pratyantardasha"]
+MAX_DEPTH = len(LEVEL_NAMES)
+
+LORD_YEARS = np.array([DASHA_YEARS[lord] for lord in DASHA_SEQUENCE], dtype=np.float64)
+
+
+class DashaLevel(NamedTuple):
+    """One level of the dasha tree as parallel arrays (children of a parent are contiguous)"""
+    lord_index: np.ndarray   # int8 index into DASHA_SEQUENCE
+    parent: np.ndarray       # index into the level above (-1 for mahadashas)
+    start: np.ndarray        # float64 days since birth
+    end: np.ndarray
+
+
+def subdivide(level: DashaLevel) -> DashaLevel:
+    """Split every period into its 9 sub-periods, starting with the period's own lord
+
+    Each sub-period lasts lord years / 120 of its parent, as calculate_dasha does for bhuktis.
+    """
+    lords = (level.lord_index[:, None].astype(np.int64) + np.arange(9)[None, :]) % 9
+    days = LORD_YEARS[lords] / CYCLE_YEARS * (level.end - level.start)[:, None]
+    end = level.start[:, None] + np.cumsum(days, axis=1)
+    return DashaLevel(
+        lords.ravel().astype(np.int8),
+        np.repeat(np.arange(len(level.start)), 9),
+        (end - days).ravel(),
+        end.ravel(),
+    )
+
+
+class DashaTimeline:
+    """Dasha period boundaries as day offsets from birth
+
+    maha_lords / maha_start / maha_end hold the 10 mahadashas; bhukti_* hold
+    their 90 bhuktis (bhukti_parent is the mahadasha index). Offsets are
+    float64 days since birth_dt. levels holds the same data per depth,
+    with pratyantardashas added by level(3).
+    """
+
+    def __init__(self, moon_longitude: float, birth_dt: datetime):
+        self.birth_dt = to_utc(birth_dt)
+        self.moon_longitude = moon_longitude
+        nakshatra = get_nakshatra_from_longitude(moon_longitude)
+        self.birth_nakshatra = nakshatra["name"]
+
+        start_index = DASHA_SEQUENCE.index(nakshatra["lord"])
+        nakshatra_span = 360 / 27
+        progress = (moon_longitude % nakshatra_span) / nakshatra_span
+
+        lord_indices = [(start_index + i) % 9 for i in range(MAHADASHA_COUNT)]
+        years = LORD_YEARS[lord_indices]
+        years[0] *= 1 - progress
+        maha_end = np.cumsum(years * DAYS_PER_YEAR)
+        maha = DashaLevel(
+            np.array(lord_indices, dtype=np.int8),
+            np.full(MAHADASHA_COUNT, -1),
+            np.concatenate(([0.0], maha_end[:-1])),
+            maha_end,
+        )
+        self.levels = [maha, subdivide(maha)]
+
+        self.maha_years = years
+        self.maha_lord_index, _, self.maha_start, self.maha_end = maha
+        (self.bhukti_lord_index, self.bhukti_parent,
+         self.bhukti_start, self.bhukti_end) = self.levels[1]
+
+    def level(self, depth: int) -> DashaLevel:
+        """Periods of one level (1 = mahadasha, 2 = antardasha, 3 = pratyantardasha), built on demand"""
+        if not 1 <= depth <= MAX_DEPTH:
+            raise ValueError(f"depth must be 1-{MAX_DEPTH}, got {depth}")
+        while len(self.levels) < depth:
+            self.levels.append(subdivide(self.levels[-1]))
+        return self.levels[depth - 1]
+
+    # ---- conversions ----
+
+    def to_days(self, dt: datetime) -> float:
+        return (to_utc(dt) - self.birth_dt).total_seconds() / 86400
+
+    def to_datetime(self, days: float) -> datetime:
+        return self.birth_dt + timedelta(days=float(days))
+
+    def date_string(self, days: float) -> str:
+        return self.to_datetime(days).strftime("%Y-%m-%d")
+
+    def date_strings(self, days: np.ndarray) -> List[str]:
+        """date_string for a whole array at once"""
+        micros = np.round(np.asarray(days) * 86_400_000_000).astype("timedelta64[us]")
+        dates = (np.datetime64(self.birth_dt, "us") + micros).astype("datetime64[D]")
+        return dates.astype(str).tolist()
+
+    @property
+    def maha_lords(self) -> List[str]:
+        return [DASHA_SEQUENCE[i] for i in self.maha_lord_index]
+
+    # ---- queries ----
+
+    def index_at(self, dt: datetime) -> Optional[tuple]:
+        """(mahadasha index, bhukti index) running at dt, or None outside the timeline"""
+        days = self.to_days(dt)
+        if days < 0 or days >= self.maha_end[-1]:
+            return None
+        maha = int(np.searchsorted(self.maha_end, days, side="right"))
+        bhukti = int(np.searchsorted(self.bhukti_end, days, side="right"))
+        return maha, min(bhukti, len(self.bhukti_end) - 1)
+
+    def at(self, target_dt: Optional[datetime] = None) -> Dict:
+        """Running mahadasha and bhukti, in calculate_dasha's output format"""
+        if target_dt is None:
+            target_dt = datetime.now()
+        index = self.index_at(target_dt)
+        if index is None:
+            return {"error": "Target date outside calculated range"}
+        maha, bhukti = index
+        return {
+            "mahadasha": {
+                "lord": DASHA_SEQUENCE[self.maha_lord_index[maha]],
+                "start": self.date_string(self.maha_start[maha]),
+                "end": self.date_string(self.maha_end[maha]),
+            },
+            "bhukti": {
+                "lord": DASHA_SEQUENCE[self.bhukti_lord_index[bhukti]],
+                "start": self.date_string(self.bhukti_start[bhukti]),
+                "end": self.date_string(self.bhukti_end[bhukti]),
+            },
+            "birth_nakshatra": self.birth_nakshatra,
+        }
+
+    def changes_between(self, start_dt: datetime, end_dt: datetime) -> List[Dict]:
+        """Mahadasha and bhukti periods that begin in [start_dt, end_dt), in date order"""
+        lo, hi = self.to_days(start_dt), self.to_days(end_dt)
+        changes = []
+
+        for i in np.flatnonzero((self.bhukti_start >= lo) & (self.bhukti_start < hi)):
+            maha = int(self.bhukti_parent[i])
+            starts_mahadasha = i % 9 == 0
+            changes.append({
+                "datetime": self.to_datetime(self.bhukti_start[i]),
+                "level": "mahadasha" if starts_mahadasha else "bhukti",
+                "mahadasha": DASHA_SEQUENCE[self.maha_lord_index[maha]],
+                "bhukti": DASHA_SEQUENCE[self.bhukti_lord_index[i]],
+                "end": self.date_string(self.bhukti_end[i]),
+            })
+
+        return changes
+
+    def life_arc(self, depth: int = MAX_DEPTH) -> List[Dict]:
+        """The whole timeline as nested dicts with YYYY-MM-DD dates
+
+        Each mahadasha is {"lord", "start", "end", "antardashas": [...]}, each antardasha
+        holds its "pratyantardashas" (down to depth levels).
+        """
+        levels = [self.level(d) for d in range(1, depth + 1)]
+        rendered = []
+        for level_depth, level in enumerate(levels, start=1):
+            starts, ends = self.date_strings(level.start), self.date_strings(level.end)
+            periods = [
+                {"lord": DASHA_SEQUENCE[lord], "start": start, "end": end}
+                for lord, start, end in zip(level.lord_index.tolist(), starts, ends)
+            ]
+            if level_depth > 1:
+                key = LEVEL_NAMES[level_depth - 1] + "s"
+                for parent in rendered[-1]:
+                    parent[key] = []
+                for period, parent in zip(periods, level.parent.tolist()):
+                    rendered[-1][parent][key].append(period)
+            rendered.append(periods)
+        return rendered[0]
+
+
+# ============================================
+# EXAMPLE: Check against calculate_dasha
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from vedic_calculator import calculate_dasha
+
+    rng = random.Random(40)
+    checks = mismatches = 0
+    for _ in range(500):
+        moon = rng.uniform(0, 360)
+        birth = datetime(1940, 1, 1) + timedelta(minutes=rng.randrange(60 * 24 * 365 * 70))
+        timeline = DashaTimeline(moon, birth)
+        for _ in range(10):
+            target = birth + timedelta(days=rng.uniform(0, 119 * DAYS_PER_YEAR))
+            checks += 1
+            if timeline.at(target) != calculate_dasha(moon, birth, target):
+                mismatches += 1
+    print(f"{checks} random dates checked against calculate_dasha: {mismatches} mismatches")
+
+    for _ in range(100):
+        timeline = DashaTimeline(rng.uniform(0, 360), datetime(1940, 1, 1) + timedelta(days=rng.uniform(0, 25_000)))
+        level = timeline.level(3)
+        assert timeline.date_strings(level.end) == [timeline.date_string(d) for d in level.end]
+        assert np.allclose(level.end[8::9], timeline.bhukti_end)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        DashaTimeline(198.46, datetime(1986, 12, 27, 7, 50))
+    print(f"Build timeline: {(time.perf_counter() - start) * 1000:.1f} us each")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        timeline = DashaTimeline(198.46, datetime(1986, 12, 27, 7, 50))
+        timeline.level(3)
+    periods = sum(len(level.start) for level in timeline.levels)
+    print(f"Build 3-level tree ({periods} periods): {(time.perf_counter() - start) * 1000:.1f} us each")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        DashaTimeline(198.46, datetime(1986, 12, 27, 7, 50)).life_arc()
+    print(f"Build and render life arc: {(time.perf_counter() - start) * 10:.2f} ms each")
+
+    timeline = DashaTimeline(198.46, datetime(1986, 12, 27, 7, 50))
+    print("Dasha changes 2026-2030 for the sample chart:")
+    for change in timeline.changes_between(datetime(2026, 1, 1), datetime(2031, 1, 1)):
+        print(f"  {change['datetime']:%Y-%m-%d}  {change['level']:<9}  {change['mahadasha']}/{change['bhukti']}")
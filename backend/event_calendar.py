@@ -0,0 +1,282 @@
+"""
+Eclipse and Lunation Calendar
+Solar and lunar eclipses (with their Rahu/Ketu axis) plus new and full moons, per year
+
+Eclipse search is the expensive part of Swiss Ephemeris, so each year is computed once and
+kept on disk (event_calendar_<year>.cbc in EVENT_CACHE_DIR) and in memory. Queries go
+through an interval index, so "what happens this week" is a binary search, not a search
+of the sky.
+
+Usage:
+    events = events_between(datetime(2026, 2, 16), datetime(2026, 2, 23))
+    index = year_index(2026)                  # EventIndex for repeated queries
+    index.overlapping(start_jd, end_jd)
+"""
+
+import os
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+import swisseph as swe
+
+from vedic_calculator import (
+    datetime_to_jd,
+    get_nakshatra_from_longitude,
+    get_sidereal_position,
+)
+from timezones import EPOCH, to_utc
+
+EVENT_CACHE_DIR = os.environ.get(
+    "COSMICBRIEF_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"),
+)
+EVENT_CACHE_FILE = "event_calendar_{year}.cbc"
+
+# Julian day (UT) of EPOCH, 1970-01-01 00:00
+EPOCH_JD = 2440587.5
+
+# Lunations are refined by bisection down to this many days (one minute)
+REFINE_TOLERANCE_DAYS = 1 / 1440
+
+SOLAR_KINDS = [
+    (swe.ECL_ANNULAR_TOTAL, "hybrid"),
+    (swe.ECL_TOTAL, "total"),
+    (swe.ECL_ANNULAR, "annular"),
+    (swe.ECL_PARTIAL, "partial"),
+]
+LUNAR_KINDS = [
+    (swe.ECL_TOTAL, "total"),
+    (swe.ECL_PARTIAL, "partial"),
+    (swe.ECL_PENUMBRAL, "penumbral"),
+]
+
+
+# ============================================
+# EVENT SEARCH (once per year)
+# ============================================
+
+def jd_to_iso(jd: float) -> str:
+    """Julian day (UT) as YYYY-MM-DDTHH:MM, rounded to the minute"""
+    year, month, day, hours = swe.revjul(jd)
+    dt = datetime(year, month, day) + timedelta(minutes=round(hours * 60))
+    return dt.strftime("%Y-%m-%dT%H:%M")
+
+
+def eclipse_kind(flags: int, kinds) -> str:
+    return next(name for bit, name in kinds if flags & bit)
+
+
+def make_event(kind: str, subtype: Optional[str], jd: float, start_jd: float, end_jd: float,
+               body: int) -> Dict:
+    """Event at jd, placed by the eclipsed/lunating body (Sun for solar events, Moon for lunar)
+
+    Eclipses also get their node: the one the luminary is conjunct and its distance in degrees.
+    """
+    longitude = get_sidereal_position(jd, body)
+    rahu = get_sidereal_position(jd, swe.MEAN_NODE)
+    node = node_distance = None
+    if kind.endswith("eclipse"):
+        to_rahu = abs((longitude - rahu + 180) % 360 - 180)
+        node, node_distance = ("Rahu", to_rahu) if to_rahu <= 90 else ("Ketu", 180 - to_rahu)
+        node_distance = round(node_distance, 2)
+
+    return {
+        "time": jd_to_iso(jd),
+        "start": jd_to_iso(start_jd),
+        "end": jd_to_iso(end_jd),
+        "type": kind,
+        "kind": subtype,
+        "sign_index": int(longitude // 30),
+        "nakshatra_index": get_nakshatra_from_longitude(longitude)["index"],
+        "degree": round(longitude % 30, 2),
+        "node": node,
+        "node_distance": node_distance,
+        "rahu_sign_index": int(rahu // 30),
+        "ketu_sign_index": int((rahu + 180) % 360 // 30),
+        "jd": jd,
+        "start_jd": start_jd,
+        "end_jd": end_jd,
+    }
+
+
+def find_eclipses(start_jd: float, end_jd: float) -> List[Dict]:
+    """Solar and lunar eclipses with maximum in [start_jd, end_jd)"""
+    events = []
+
+    jd = start_jd
+    while True:
+        flags, tret = swe.sol_eclipse_when_glob(jd)
+        if tret[0] >= end_jd:
+            break
+        events.append(make_event("solar_eclipse", eclipse_kind(flags, SOLAR_KINDS),
+                                 tret[0], tret[2], tret[3], swe.SUN))
+        jd = tret[0] + 1
+
+    jd = start_jd
+    while True:
+        flags, tret = swe.lun_eclipse_when(jd)
+        if tret[0] >= end_jd:
+            break
+        # Penumbral contacts bound every lunar eclipse, whatever its type
+        events.append(make_event("lunar_eclipse", eclipse_kind(flags, LUNAR_KINDS),
+                                 tret[0], tret[6], tret[7], swe.MOON))
+        jd = tret[0] + 1
+
+    return events
+
+
+def elongation(jd: float) -> float:
+    """Moon minus Sun in degrees, 0-360 (zodiac-independent)"""
+    return (swe.calc_ut(jd, swe.MOON)[0][0] - swe.calc_ut(jd, swe.SUN)[0][0]) % 360
+
+
+def find_lunations(start_jd: float, end_jd: float) -> List[Dict]:
+    """New and full moons in [start_jd, end_jd), from daily elongation samples refined to the minute"""
+    jds = np.arange(start_jd, end_jd + 1)
+    phases = np.array([elongation(jd) for jd in jds.tolist()]) // 180  # 0 waxing, 1 waning
+    events = []
+
+    for i in np.flatnonzero(phases[1:] != phases[:-1]).tolist():
+        is_full = phases[i] == 0
+        lo, hi = float(jds[i]), float(jds[i + 1])
+        while hi - lo > REFINE_TOLERANCE_DAYS:
+            mid = (lo + hi) / 2
+            if (elongation(mid) // 180 == 1) == is_full:
+                hi = mid
+            else:
+                lo = mid
+        if start_jd <= hi < end_jd:
+            events.append(make_event("full_moon" if is_full else "new_moon", None, hi, hi, hi, swe.MOON))
+
+    return events
+
+
+def compute_year_events(year: int) -> List[Dict]:
+    """All eclipses and lunations whose exact time falls in the calendar year (UTC), in time order"""
+    start_jd = datetime_to_jd(datetime(year, 1, 1))
+    end_jd = datetime_to_jd(datetime(year + 1, 1, 1))
+    events = find_eclipses(start_jd, end_jd) + find_lunations(start_jd, end_jd)
+    events.sort(key=lambda e: e["jd"])
+    return events
+
+
+# ============================================
+# INTERVAL INDEX AND CACHE
+# ============================================
+
+class EventIndex:
+    """Events sorted by start, queried for overlap with a time range
+
+    Every event lasts at most max_duration days, so the candidates for a query are the
+    events starting in [start - max_duration, end): one bisect, then an end-time filter.
+    """
+
+    def __init__(self, events: List[Dict]):
+        self.events = sorted(events, key=lambda e: e["start_jd"])
+        self.starts = [e["start_jd"] for e in self.events]
+        self.max_duration = max((e["end_jd"] - e["start_jd"] for e in self.events), default=0.0)
+
+    def overlapping(self, start_jd: float, end_jd: float) -> List[Dict]:
+        """Events whose [start, end] interval overlaps [start_jd, end_jd), ordered by exact time"""
+        first = bisect_left(self.starts, start_jd - self.max_duration)
+        last = bisect_left(self.starts, end_jd, lo=first)
+        found = [e for e in self.events[first:last] if e["end_jd"] >= start_jd]
+        return sorted(found, key=lambda e: e["jd"])
+
+
+def load_year_events(year: int, cache_dir: Optional[str] = EVENT_CACHE_DIR) -> List[Dict]:
+    """The year's events from the disk cache, computing and saving them on a miss"""
+    from binary_codec import load, save
+
+    if not cache_dir:
+        return compute_year_events(year)
+    path = os.path.join(cache_dir, EVENT_CACHE_FILE.format(year=year))
+    if os.path.exists(path):
+        try:
+            return load(path)
+        except ValueError as e:  # CodecError or JSON error: a corrupt file is a miss
+            print(f"Ignoring corrupt event cache {path}: {e}")
+    events = compute_year_events(year)
+    os.makedirs(cache_dir, exist_ok=True)
+    save(events, path)
+    return events
+
+
+@lru_cache(maxsize=None)
+def year_index(year: int, cache_dir: Optional[str] = EVENT_CACHE_DIR) -> EventIndex:
+    """EventIndex for one calendar year, loaded once per process"""
+    return EventIndex(load_year_events(year, cache_dir))
+
+
+def utc_jd(dt: datetime) -> float:
+    """Julian day (UT) of a datetime by date arithmetic, without a Swiss Ephemeris call"""
+    return EPOCH_JD + (to_utc(dt) - EPOCH).total_seconds() / 86400
+
+
+def events_between(start: datetime, end: datetime, cache_dir: Optional[str] = EVENT_CACHE_DIR) -> List[Dict]:
+    """Eclipses and lunations overlapping [start, end) (naive UTC or tz-aware datetimes)
+
+    Treat the returned dicts as read-only: they are shared through the cache.
+    """
+    start_jd, end_jd = utc_jd(start), utc_jd(end)
+    found = []
+    seen = set()
+    # Eclipses can straddle New Year, so also look in the year before start. The end is
+    # exclusive, so an end of Jan 1 00:00 skips the new year (no eclipse begins before a
+    # New Year and peaks after it between 1800 and 2214).
+    for year in range(to_utc(start).year - 1, to_utc(end - timedelta(microseconds=1)).year + 1):
+        for event in year_index(year, cache_dir).overlapping(start_jd, end_jd):
+            if event["time"] not in seen:
+                seen.add(event["time"])
+                found.append(event)
+    return found
+
+
+def describe(event: Dict) -> str:
+    """One-line description, e.g. "Annular solar eclipse in Kumbha (Dhanishta), conjunct Rahu" """
+    from vedic_calculator import NAKSHATRAS, SIGNS
+
+    name = event["type"].replace("_", " ")
+    if event["kind"]:
+        name = f"{event['kind']} {name}"
+    text = (f"{name[0].upper()}{name[1:]} in {SIGNS[event['sign_index']]['vedic']} "
+            f"({NAKSHATRAS[event['nakshatra_index']]['name']})")
+    if event["node"]:
+        text += f", conjunct {event['node']}"
+    return text
+
+
+# ============================================
+# EXAMPLE: 2026 calendar and query cost
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        events = load_year_events(2026, cache_dir)
+        compute_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_year_events(2026, cache_dir)
+        load_time = time.perf_counter() - start
+
+        index = year_index(2026, cache_dir)
+        week_start = datetime_to_jd(datetime(2026, 2, 16))
+        start = time.perf_counter()
+        for _ in range(10_000):
+            index.overlapping(week_start, week_start + 7)
+        query_time = (time.perf_counter() - start) / 10_000
+
+    print("Eclipses 2026:")
+    for event in events:
+        if event["node"]:
+            print(f"  {event['time']}  {describe(event)} ({event['node_distance']}° from the node)")
+    print(f"New and full moons: {sum(1 for e in events if not e['node'])}")
+    print(f"\nSearch {compute_time * 1000:.0f} ms, cached load {load_time * 1000:.2f} ms, "
+          f"week query {query_time * 1e6:.1f} us")
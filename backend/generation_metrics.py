@@ -0,0 +1,196 @@
+"""
+Generation Run Metrics
+Per-call latency, token and cost tracking for the weekly horoscope pipeline
+Produces a JSON run report and an optional Prometheus textfile export
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# USD per million tokens (input, output)
+MODEL_PRICING = {
+    "claude-haiku-4-5-20251001": {"input": 1.00, "output": 5.00},
+    "claude-sonnet-4-5-20250929": {"input": 3.00, "output": 15.00},
+}
+
+# Prefix for exported Prometheus metric names
+PROMETHEUS_PREFIX = "cosmicbrief_generation"
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimate the USD cost of a call from its token counts (0.0 for unknown models)"""
+    pricing = MODEL_PRICING.get(model)
+    if not pricing:
+        return 0.0
+    return (input_tokens * pricing["input"] + output_tokens * pricing["output"]) / 1_000_000
+
+
+def component_group(component: str) -> str:
+    """Collapse a component name like 'moon_sign:Kumbha' to its group ('moon_sign')"""
+    return component.split(":", 1)[0]
+
+
+class RunMetrics:
+    """Collects one record per LLM call made during a generation run"""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.started_at = datetime.now().isoformat()
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.calls: List[Dict] = []
+
+    def record(
+        self,
+        component: str,
+        latency: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        stop_reason: Optional[str] = None,
+        retries: int = 0,
+        max_tokens: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> Dict:
+        """Record a single API call and return the stored record"""
+        call = {
+            "component": component,
+            "group": component_group(component),
+            "latency_seconds": round(latency, 3),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "stop_reason": stop_reason,
+            "truncated": stop_reason == "max_tokens",
+            "retries": retries,
+            "max_tokens": max_tokens,
+            "cost_usd": round(estimate_cost(self.model, input_tokens, output_tokens), 6),
+            "error": error,
+        }
+        self.calls.append(call)
+        return call
+
+    def finish(self) -> None:
+        """Mark the run as complete"""
+        self.end_time = time.time()
+
+    @property
+    def elapsed(self) -> float:
+        end = self.end_time if self.end_time is not None else time.time()
+        return end - self.start_time
+
+    def summarize(self, calls: List[Dict]) -> Dict:
+        """Aggregate a list of call records"""
+        latencies = sorted(c["latency_seconds"] for c in calls)
+        return {
+            "calls": len(calls),
+            "errors": sum(1 for c in calls if c["error"]),
+            "truncated": sum(1 for c in calls if c["truncated"]),
+            "retries": sum(c["retries"] for c in calls),
+            "input_tokens": sum(c["input_tokens"] for c in calls),
+            "output_tokens": sum(c["output_tokens"] for c in calls),
+            "cost_usd": round(sum(c["cost_usd"] for c in calls), 6),
+            "latency_seconds_total": round(sum(latencies), 3),
+            "latency_seconds_max": latencies[-1] if latencies else 0.0,
+            "latency_seconds_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+        }
+
+    def to_report(self) -> Dict:
+        """Build the full run report (totals, per-group breakdown and raw calls)"""
+        groups: Dict[str, List[Dict]] = {}
+        for call in self.calls:
+            groups.setdefault(call["group"], []).append(call)
+
+        return {
+            "model": self.model,
+            "started_at": self.started_at,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "totals": self.summarize(self.calls),
+            "by_group": {name: self.summarize(calls) for name, calls in groups.items()},
+            "truncated_components": [c["component"] for c in self.calls if c["truncated"]],
+            "calls": self.calls,
+        }
+
+    def to_prometheus(self) -> str:
+        """Render the run's per-group aggregates in Prometheus text exposition format"""
+        report = self.to_report()
+        p = PROMETHEUS_PREFIX
+        series = [
+            ("calls_total", "counter", "LLM calls made", "calls"),
+            ("errors_total", "counter", "LLM calls that failed after retries", "errors"),
+            ("truncated_total", "counter", "LLM responses stopped by max_tokens", "truncated"),
+            ("retries_total", "counter", "LLM call retries", "retries"),
+            ("input_tokens_total", "counter", "Input tokens sent", "input_tokens"),
+            ("output_tokens_total", "counter", "Output tokens received", "output_tokens"),
+            ("cost_usd_total", "counter", "Estimated cost in USD", "cost_usd"),
+            ("latency_seconds_total", "counter", "Summed call latency in seconds", "latency_seconds_total"),
+            ("latency_seconds_max", "gauge", "Slowest call latency in seconds", "latency_seconds_max"),
+        ]
+
+        lines = []
+        for name, metric_type, help_text, key in series:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {metric_type}")
+            for group, summary in report["by_group"].items():
+                lines.append(f'{p}_{name}{{model="{self.model}",component="{group}"}} {summary[key]}')
+
+        lines.append(f"# HELP {p}_run_duration_seconds Wall-clock duration of the generation run")
+        lines.append(f"# TYPE {p}_run_duration_seconds gauge")
+        lines.append(f'{p}_run_duration_seconds{{model="{self.model}"}} {report["elapsed_seconds"]}')
+        lines.append(f"# HELP {p}_last_run_timestamp_seconds Unix time the run finished")
+        lines.append(f"# TYPE {p}_last_run_timestamp_seconds gauge")
+        lines.append(f'{p}_last_run_timestamp_seconds{{model="{self.model}"}} {int(self.end_time or time.time())}')
+
+        return "\n".join(lines) + "\n"
+
+    def format_summary(self) -> str:
+        """Format a short human-readable summary for console output"""
+        report = self.to_report()
+        totals = report["totals"]
+        breakdown = ", ".join(f"{s['calls']} {g}" for g, s in report["by_group"].items())
+        output = [
+            f"Total API calls: {totals['calls']} ({breakdown})",
+            f"Tokens: {totals['input_tokens']} in / {totals['output_tokens']} out",
+            f"Estimated cost: ${totals['cost_usd']:.4f}",
+        ]
+        for group, summary in report["by_group"].items():
+            output.append(
+                f"  {group:<16} {summary['latency_seconds_total']:>7.1f}s total, "
+                f"max {summary['latency_seconds_max']:.2f}s, ${summary['cost_usd']:.4f}"
+            )
+        if totals["retries"] or totals["errors"]:
+            output.append(f"Retries: {totals['retries']}, errors: {totals['errors']}")
+        if report["truncated_components"]:
+            output.append(
+                f"WARNING: {len(report['truncated_components'])} responses hit max_tokens: "
+                f"{', '.join(report['truncated_components'])}"
+            )
+        return "\n".join(output)
+
+
+def report_filename_for(content_filename: str) -> str:
+    """Derive the run report path from the content JSON path"""
+    base, _ = os.path.splitext(content_filename)
+    return f"{base}.metrics.json"
+
+
+def save_run_report(metrics: RunMetrics, content_filename: str) -> str:
+    """Save the run report next to the generated content file"""
+    filename = report_filename_for(content_filename)
+    with open(filename, 'w') as f:
+        json.dump(metrics.to_report(), f, indent=2)
+
+    print(f"Saved run report to {filename}")
+    return filename
+
+
+def write_prometheus_textfile(metrics: RunMetrics, path: str) -> str:
+    """Write metrics for the node_exporter textfile collector (atomic rename)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(metrics.to_prometheus())
+    os.replace(tmp_path, path)
+
+    print(f"Wrote Prometheus metrics to {path}")
+    return path
@@ -0,0 +1,187 @@
+"""
+Bulk Personalized Horoscope Renderer
+Precompiles the personalized horoscope template against one week's content
+Shared and per-key sections are rendered once, so each subscriber is a 4-piece join
+"""
+
+import os
+import json
+import itertools
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Template sections - together these match assemble_personalized_horoscope exactly
+HEADER_TEMPLATE = "YOUR WEEK: {week_start} to {week_end}\n\n{master_overview}\n\n---\n\n"
+MOON_SIGN_TEMPLATE = "FOR {name} MOON\n\n{text}\n\n---\n\n"
+NAKSHATRA_TEMPLATE = "YOUR NAKSHATRA: {name}\n\n{text}\n\n---\n\n"
+DASHA_TEMPLATE = "YOUR CURRENT CYCLE\n\n{text}\n\n---\n\n"
+FOOTER = "Want deeper insights? Get your personalized 2026 Cosmic Brief\n"
+
+# (moon_sign, nakshatra, mahadasha)
+HoroscopeKey = Tuple[str, str, str]
+
+
+def render_blocks(template: str, texts: Dict[str, str], suffix: str = "") -> Dict[str, str]:
+    """Pre-render one block per key of a content section"""
+    return {
+        key: template.format(name=key.upper(), text=text) + suffix
+        for key, text in texts.items()
+    }
+
+
+def key_filename(key: HoroscopeKey) -> str:
+    """File name for a rendered combination, e.g. Kumbha__Purva-Bhadrapada__Mercury.txt"""
+    return "__".join(part.replace(" ", "-") for part in key) + ".txt"
+
+
+class HoroscopeRenderer:
+    """Renders personalized horoscopes for one week's generated content
+
+    Build once per week, then call render() per subscriber. The overview
+    header and all 12 + 27 + 9 section blocks are formatted up front.
+    """
+
+    def __init__(self, content: Dict):
+        self.week_start = content["week_start"]
+        self.week_end = content["week_end"]
+        self.header = HEADER_TEMPLATE.format(
+            week_start=content["week_start"],
+            week_end=content["week_end"],
+            master_overview=content["master_overview"],
+        )
+        self.moon_sign_blocks = render_blocks(MOON_SIGN_TEMPLATE, content["moon_signs"])
+        self.nakshatra_blocks = render_blocks(NAKSHATRA_TEMPLATE, content["nakshatras"])
+        # The footer is folded into the dasha block to save a join
+        self.dasha_blocks = render_blocks(DASHA_TEMPLATE, content["dasha_contexts"], FOOTER)
+        self.cache: Dict[HoroscopeKey, str] = {}
+
+    def render(self, moon_sign: str, nakshatra: str, mahadasha: str) -> str:
+        """Render one personalized horoscope (same output as assemble_personalized_horoscope)"""
+        try:
+            return "".join((
+                self.header,
+                self.moon_sign_blocks[moon_sign],
+                self.nakshatra_blocks[nakshatra],
+                self.dasha_blocks[mahadasha],
+            ))
+        except KeyError:
+            if moon_sign not in self.moon_sign_blocks:
+                raise ValueError(f"Unknown Moon sign: {moon_sign}")
+            if nakshatra not in self.nakshatra_blocks:
+                raise ValueError(f"Unknown nakshatra: {nakshatra}")
+            raise ValueError(f"Unknown mahadasha: {mahadasha}")
+
+    def render_cached(self, key: HoroscopeKey) -> str:
+        """Render a combination, reusing the text if it was already rendered"""
+        text = self.cache.get(key)
+        if text is None:
+            text = self.cache[key] = self.render(*key)
+        return text
+
+    def all_keys(self) -> Iterator[HoroscopeKey]:
+        """All moon sign x nakshatra x mahadasha combinations (12 x 27 x 9 = 2,916)"""
+        return itertools.product(self.moon_sign_blocks, self.nakshatra_blocks, self.dasha_blocks)
+
+    def render_all(self) -> Iterator[Tuple[HoroscopeKey, str]]:
+        """Stream every combination"""
+        for key in self.all_keys():
+            yield key, self.render(*key)
+
+    def build_index(self) -> Dict[HoroscopeKey, str]:
+        """Render every combination into an in-memory index keyed by (sign, nakshatra, dasha)"""
+        self.cache = dict(self.render_all())
+        return self.cache
+
+    def render_subscribers(self, subscribers: Iterable[Dict]) -> Iterator[Tuple[Dict, str]]:
+        """Stream (subscriber, horoscope) for dicts with moon_sign, nakshatra and mahadasha
+
+        Subscribers sharing a combination share one rendered string.
+        """
+        for subscriber in subscribers:
+            key = (subscriber["moon_sign"], subscriber["nakshatra"], subscriber["mahadasha"])
+            yield subscriber, self.render_cached(key)
+
+    def write_all(self, directory: str, keys: Optional[Iterable[HoroscopeKey]] = None) -> int:
+        """Write one text file per combination (all 2,916 by default); returns files written"""
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        for key in (keys if keys is not None else self.all_keys()):
+            with open(os.path.join(directory, key_filename(key)), "w") as f:
+                f.write(self.render_cached(key))
+            count += 1
+        return count
+
+    def write_subscribers_jsonl(self, subscribers: Iterable[Dict], path: str, id_field: str = "id") -> int:
+        """Stream subscribers' horoscopes to a JSONL file ({id_field, horoscope} per line)"""
+        count = 0
+        with open(path, "w") as f:
+            for subscriber, text in self.render_subscribers(subscribers):
+                f.write(json.dumps({id_field: subscriber.get(id_field), "horoscope": text}) + "\n")
+                count += 1
+        return count
+
+
+# ============================================
+# BENCHMARK: Bulk rendering throughput
+# ============================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import random
+
+    content_file = sys.argv[1] if len(sys.argv) > 1 else "weekly_horoscope_2026-01-19.json"
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 300_000
+
+    with open(content_file) as f:
+        content = json.load(f)
+
+    print("=" * 60)
+    print("PERSONALIZED HOROSCOPE RENDER BENCHMARK")
+    print(f"Content: {content_file}, subscribers: {total:,}")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    renderer = HoroscopeRenderer(content)
+    print(f"\nPrecompile: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    rng = random.Random(42)
+    signs: List[str] = list(content["moon_signs"])
+    nakshatras: List[str] = list(content["nakshatras"])
+    dashas: List[str] = list(content["dasha_contexts"])
+    subscribers = [
+        {"id": i, "moon_sign": rng.choice(signs), "nakshatra": rng.choice(nakshatras),
+         "mahadasha": rng.choice(dashas)}
+        for i in range(total)
+    ]
+
+    # Baseline: per-subscriber assembly
+    from weekly_horoscope_api import assemble_personalized_horoscope
+    sample = subscribers[:min(total, 50_000)]
+    start = time.perf_counter()
+    for s in sample:
+        assemble_personalized_horoscope(content, s["moon_sign"], s["nakshatra"], s["mahadasha"])
+    baseline = len(sample) / (time.perf_counter() - start)
+    print(f"assemble_personalized_horoscope: {baseline:,.0f} renders/sec")
+
+    start = time.perf_counter()
+    for s in subscribers:
+        renderer.render(s["moon_sign"], s["nakshatra"], s["mahadasha"])
+    rate = total / (time.perf_counter() - start)
+    print(f"HoroscopeRenderer.render:        {rate:,.0f} renders/sec ({rate / baseline:.1f}x)")
+
+    renderer.cache = {}
+    start = time.perf_counter()
+    for _ in renderer.render_subscribers(subscribers):
+        pass
+    rate = total / (time.perf_counter() - start)
+    print(f"render_subscribers (memoized):   {rate:,.0f} renders/sec ({rate / baseline:.1f}x)")
+
+    start = time.perf_counter()
+    index = renderer.build_index()
+    print(f"build_index: {len(index):,} combinations in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Output must match the original assembly exactly
+    for s in sample[:1000]:
+        expected = assemble_personalized_horoscope(content, s["moon_sign"], s["nakshatra"], s["mahadasha"])
+        assert renderer.render(s["moon_sign"], s["nakshatra"], s["mahadasha"]) == expected
+    print("\nOutput matches assemble_personalized_horoscope")
@@ -0,0 +1,322 @@
+"""
+Columnar Daily Position Dataset
+Sidereal positions of all nine grahas, precomputed for 1900-2100 and read by memory map
+
+A build step samples every graha at 00:00 UTC each day (table "daily") and the Moon every
+hour (table "moon_hourly"), and writes one .npy file per column:
+
+    <POSITION_DATASET_DIR>/<table>/longitude.npy   float64 (rows, bodies)  sidereal, Lahiri
+                                   speed.npy       float32 (rows, bodies)  degrees per day
+                                   sign.npy        int8    (rows, bodies)  0 = Mesha
+                                   nakshatra.npy   int8    (rows, bodies)  0 = Ashwini
+                                   pada.npy        int8    (rows, bodies)  1-4
+                                   meta.json       start, step, bodies
+
+Row i is start + i * step, so a date range is a plain slice of each column and nothing
+is read from disk until it is touched. Longitudes are computed as get_sidereal_position
+does, so a row matches get_all_planetary_positions at that instant.
+
+Usage:
+    python cosmicbrief.py build-positions                      # ~2 CPU-minutes, ~35 MB
+    daily = PositionDataset("daily")
+    columns = daily.slice(datetime(2026, 3, 1), datetime(2026, 4, 1))
+    days = days_in_sign(daily, "Jupiter", "Meena", datetime(2026, 3, 1), datetime(2026, 4, 1))
+"""
+
+import os
+import json
+import shutil
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import swisseph as swe
+
+from vedic_calculator import (
+    PLANETS,
+    SIGNS,
+    datetime_to_jd,
+    get_ayanamsa,
+    get_nakshatra_from_longitude,
+    get_sign_from_longitude,
+)
+from timezones import to_utc
+
+POSITION_DATASET_DIR = os.path.join(
+    os.environ.get(
+        "COSMICBRIEF_CACHE_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"),
+    ),
+    "positions",
+)
+
+# Bumped whenever the column layout or the way positions are computed changes
+DATASET_VERSION = 1
+
+DATASET_START = datetime(1900, 1, 1)
+DATASET_END = datetime(2101, 1, 1)  # exclusive
+
+BODIES = list(PLANETS) + ["Ketu"]
+
+# Sample spacing per table, and which bodies it holds
+TABLES = {
+    "daily": {"step_hours": 24, "bodies": BODIES},
+    "moon_hourly": {"step_hours": 1, "bodies": ["Moon"]},
+}
+
+COLUMNS = ["longitude", "speed", "sign", "nakshatra", "pada"]
+
+NAKSHATRA_SPAN = 360 / 27
+PADA_SPAN = NAKSHATRA_SPAN / 4
+
+
+# ============================================
+# BUILD
+# ============================================
+
+def compute_rows(start: datetime, rows: int, step_hours: int, bodies: List[str]) -> Dict[str, np.ndarray]:
+    """Columns for rows samples from start, step_hours apart"""
+    jds = datetime_to_jd(start) + np.arange(rows) * (step_hours / 24)
+    computed = [body for body in bodies if body != "Ketu"]
+
+    longitude = np.empty((rows, len(bodies)))
+    speed = np.empty((rows, len(bodies)))
+    for i, jd in enumerate(jds.tolist()):
+        ayanamsa = get_ayanamsa(jd)
+        for j, body in enumerate(computed):
+            result = swe.calc_ut(jd, PLANETS[body])
+            longitude[i, j] = result[0][0] - ayanamsa
+            speed[i, j] = result[0][3]
+    longitude = np.mod(longitude, 360.0)
+
+    if "Ketu" in bodies:
+        ketu, rahu = bodies.index("Ketu"), bodies.index("Rahu")
+        longitude[:, ketu] = (longitude[:, rahu] + 180) % 360
+        speed[:, ketu] = speed[:, rahu]
+
+    return {
+        "longitude": longitude,
+        "speed": speed.astype(np.float32),
+        "sign": (longitude // 30).astype(np.int8),
+        "nakshatra": (longitude // NAKSHATRA_SPAN).astype(np.int8),
+        "pada": ((longitude % NAKSHATRA_SPAN) // PADA_SPAN + 1).astype(np.int8),
+    }
+
+
+def compute_year(args) -> Dict[str, np.ndarray]:
+    """One calendar year of a table (pool worker)"""
+    table, year = args
+    spec = TABLES[table]
+    hours = (datetime(year + 1, 1, 1) - datetime(year, 1, 1)).days * 24
+    return compute_rows(datetime(year, 1, 1), hours // spec["step_hours"], spec["step_hours"], spec["bodies"])
+
+
+def build_table(
+    table: str,
+    directory: str = POSITION_DATASET_DIR,
+    start_year: int = DATASET_START.year,
+    end_year: int = DATASET_END.year - 1,
+    workers: Optional[int] = None,
+) -> str:
+    """Compute and write one table for start_year through end_year; returns its directory
+
+    Years are computed in a process pool and the table is written to a temporary
+    directory first, so readers never see a half-written dataset.
+    """
+    spec = TABLES[table]
+    years = [(table, year) for year in range(start_year, end_year + 1)]
+    if workers == 1:
+        chunks = [compute_year(args) for args in years]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(compute_year, years))
+
+    path = os.path.join(directory, table)
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for column in COLUMNS:
+        np.save(os.path.join(tmp, f"{column}.npy"), np.concatenate([chunk[column] for chunk in chunks]))
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({
+            "version": DATASET_VERSION,
+            "start": datetime(start_year, 1, 1).isoformat(),
+            "end": datetime(end_year + 1, 1, 1).isoformat(),
+            "step_hours": spec["step_hours"],
+            "bodies": spec["bodies"],
+        }, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+def build_dataset(directory: str = POSITION_DATASET_DIR, workers: Optional[int] = None, **years) -> List[str]:
+    """Build every table in TABLES"""
+    return [build_table(table, directory, workers=workers, **years) for table in TABLES]
+
+
+# ============================================
+# MEMORY-MAPPED ACCESS
+# ============================================
+
+class PositionDataset:
+    """Read-only, memory-mapped view of one table
+
+    Columns are mapped on first use; slicing returns views into the mapped files, so
+    a range query costs only the pages it touches.
+    """
+
+    def __init__(self, table: str = "daily", directory: str = POSITION_DATASET_DIR):
+        self.path = os.path.join(directory, table)
+        meta_path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"No position dataset at {self.path}; run: python cosmicbrief.py build-positions")
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["version"] != DATASET_VERSION:
+            raise ValueError(f"{self.path} is dataset version {meta['version']}, expected {DATASET_VERSION}; rebuild it")
+
+        self.table = table
+        self.start = datetime.fromisoformat(meta["start"])
+        self.end = datetime.fromisoformat(meta["end"])
+        self.step = timedelta(hours=meta["step_hours"])
+        self.bodies = meta["bodies"]
+        self.columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return int((self.end - self.start) / self.step)
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self.columns:
+            self.columns[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return self.columns[name]
+
+    def row(self, dt: datetime) -> int:
+        """Index of the last sample at or before dt (naive UTC or tz-aware)"""
+        i = int((to_utc(dt) - self.start) // self.step)
+        if not 0 <= i < len(self):
+            raise ValueError(f"{dt} is outside the dataset ({self.start:%Y-%m-%d} to {self.end:%Y-%m-%d})")
+        return i
+
+    def rows(self, start: datetime, end: datetime) -> slice:
+        """Rows for samples in [start, end)"""
+        first = max(0, -(-(to_utc(start) - self.start) // self.step))
+        last = min(len(self), -(-(to_utc(end) - self.start) // self.step))
+        return slice(first, max(first, last))
+
+    def times(self, rows: slice) -> np.ndarray:
+        """Sample times (datetime64[m], UTC) for a row slice"""
+        start = np.datetime64(self.start, "m")
+        step = np.timedelta64(int(self.step.total_seconds() // 60), "m")
+        return start + np.arange(rows.start, rows.stop) * step
+
+    def slice(self, start: datetime, end: datetime, body: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Every column for samples in [start, end), plus "time"; one body's columns if body is given"""
+        rows = self.rows(start, end)
+        result = {"time": self.times(rows)}
+        for name in COLUMNS:
+            values = self.column(name)[rows]
+            result[name] = values[:, self.bodies.index(body)] if body else values
+        return result
+
+    def positions(self, dt: datetime) -> Dict:
+        """Positions at the sample at or before dt, shaped like get_all_planetary_positions"""
+        i = self.row(dt)
+        longitudes = self.column("longitude")[i].tolist()
+        speeds = self.column("speed")[i].tolist()
+        positions = {}
+        for j, body in enumerate(self.bodies):
+            longitude = longitudes[j]
+            if body == "Ketu" and "Rahu" in self.bodies:
+                # get_all_planetary_positions places Ketu opposite the rounded Rahu
+                longitude = (round(longitudes[self.bodies.index("Rahu")], 2) + 180) % 360
+            positions[body] = {
+                "longitude": round(longitude, 2),
+                "sign": get_sign_from_longitude(longitude),
+                "nakshatra": get_nakshatra_from_longitude(longitude),
+                "retrograde": is_retrograde(body, speeds[j]),
+            }
+        return positions
+
+
+def is_retrograde(body: str, speed: float) -> bool:
+    """Retrograde flag as get_all_planetary_positions sets it (nodes always, luminaries never)"""
+    if body in ("Rahu", "Ketu"):
+        return True
+    if body in ("Sun", "Moon"):
+        return False
+    return speed < 0
+
+
+# ============================================
+# ANALYTICS
+# ============================================
+
+def sign_index(sign: str) -> int:
+    """Index of a sign by Vedic or Western name"""
+    for i, s in enumerate(SIGNS):
+        if sign in (s["vedic"], s["western"]):
+            return i
+    raise ValueError(f"Unknown sign: {sign}")
+
+
+def days_in_sign(dataset: PositionDataset, body: str, sign: str, start: datetime, end: datetime) -> float:
+    """Days in [start, end) that body spends in sign, counted by sample"""
+    signs = dataset.slice(start, end, body)["sign"]
+    return int(np.count_nonzero(signs == sign_index(sign))) * dataset.step / timedelta(days=1)
+
+
+def sign_occupancy(dataset: PositionDataset, body: str, start: datetime, end: datetime) -> Dict[str, float]:
+    """Fraction of samples in [start, end) that body spends in each sign"""
+    signs = dataset.slice(start, end, body)["sign"]
+    counts = np.bincount(signs, minlength=12) / max(len(signs), 1)
+    return {SIGNS[i]["vedic"]: round(float(c), 4) for i, c in enumerate(counts)}
+
+
+# ============================================
+# EXAMPLE: Build (if missing), check against the ephemeris, query
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    import random
+
+    from vedic_calculator import get_all_planetary_positions
+
+    if not os.path.exists(os.path.join(POSITION_DATASET_DIR, "moon_hourly", "meta.json")):
+        start = time.perf_counter()
+        build_dataset()
+        print(f"Built {POSITION_DATASET_DIR} in {time.perf_counter() - start:.0f} s")
+
+    daily, hourly = PositionDataset("daily"), PositionDataset("moon_hourly")
+    print(f"daily: {len(daily):,} rows x {len(daily.bodies)} bodies, moon_hourly: {len(hourly):,} rows")
+
+    rng = random.Random(48)
+    for _ in range(200):
+        dt = DATASET_START + timedelta(hours=rng.randrange(len(hourly)))
+        expected = get_all_planetary_positions(dt)
+        assert hourly.positions(dt)["Moon"] == expected["Moon"], dt
+        day = datetime(dt.year, dt.month, dt.day)
+        assert daily.positions(day) == get_all_planetary_positions(day), day
+    print("200 random samples match get_all_planetary_positions")
+
+    start = time.perf_counter()
+    for month in range(1, 13):
+        first = datetime(2026, month, 1)
+        days_in_sign(daily, "Jupiter", "Meena", first, (first + timedelta(days=32)).replace(day=1))
+    query_time = (time.perf_counter() - start) / 12
+
+    start = time.perf_counter()
+    for day in range(365):
+        get_all_planetary_positions(datetime(2026, 1, 1) + timedelta(days=day))
+    ephemeris_time = time.perf_counter() - start
+
+    print("\nJupiter in Meena, days per month:")
+    for year in (2022, 2023):
+        months = [datetime(year, month, 1) for month in range(1, 13)] + [datetime(year + 1, 1, 1)]
+        print(f"  {year}: " + " ".join(f"{days_in_sign(daily, 'Jupiter', 'Meena', a, b):3.0f}"
+                                       for a, b in zip(months, months[1:])))
+    print(f"Month query: {query_time * 1e6:.0f} us; a year of get_all_planetary_positions: {ephemeris_time * 1000:.0f} ms")
+    print(f"Moon occupancy, Feb 2026: {sign_occupancy(hourly, 'Moon', datetime(2026, 2, 1), datetime(2026, 3, 1))}")
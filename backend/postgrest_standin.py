@@ -0,0 +1,176 @@
+"""
+Local PostgREST Stand-in
+Minimal in-memory imitation of the Supabase REST and edge function endpoints
+Used to exercise uploads (gzip bodies, upserts, chunking, retries) without a real project
+
+Run with: python postgrest_standin.py --port 54321 --fail-every 5
+Add --reject-content-encoding to refuse compressed request bodies, as upstream PostgREST may
+Then:     SUPABASE_URL=http://localhost:54321 SUPABASE_SERVICE_ROLE_KEY=local \\
+          python weekly_horoscope_api.py --upload --upload-components
+"""
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+
+class StandinState:
+    """Tables and request log shared by all handler threads"""
+
+    def __init__(self, fail_every: int = 0, reject_encoding: bool = False):
+        self.lock = threading.Lock()
+        self.tables: Dict[str, Dict[tuple, Dict]] = {}
+        self.requests: List[Dict] = []
+        self.function_calls: List[Dict] = []
+        self.fail_every = fail_every
+        self.reject_encoding = reject_encoding
+
+    def upsert(self, table: str, rows: List[Dict], on_conflict: Optional[str]) -> None:
+        columns = on_conflict.split(",") if on_conflict else None
+        with self.lock:
+            stored = self.tables.setdefault(table, {})
+            for row in rows:
+                if columns:
+                    key = tuple(row.get(c) for c in columns)
+                else:
+                    key = (len(stored),)
+                stored[key] = {**stored.get(key, {}), **row}
+
+    def rows(self, table: str) -> List[Dict]:
+        with self.lock:
+            return list(self.tables.get(table, {}).values())
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Handles POST /rest/v1/<table> and POST /functions/v1/<name>"""
+
+    state: StandinState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, payload=None) -> None:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        encoding = self.headers.get("Content-Encoding")
+        rejected = bool(encoding) and self.state.reject_encoding
+        body = gzip.decompress(raw) if encoding == "gzip" and not rejected else raw
+
+        state = self.state
+        with state.lock:
+            state.requests.append({
+                "path": url.path,
+                "bytes": len(raw),
+                "decoded_bytes": len(body),
+                "encoding": encoding,
+                "keep_alive": self.request_version == "HTTP/1.1",
+            })
+            count = len(state.requests)
+
+        if state.fail_every and count % state.fail_every == 0:
+            return self.send_json(503, {"message": "injected failure"})
+
+        if rejected:
+            return self.send_json(415, {"message": f"Content-Encoding {encoding} not supported"})
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self.send_json(401, {"message": "missing bearer token"})
+
+        try:
+            payload = json.loads(body) if body else {}
+        except json.JSONDecodeError:
+            return self.send_json(400, {"message": "invalid JSON"})
+
+        parts = url.path.strip("/").split("/")
+        if parts[:2] == ["rest", "v1"] and len(parts) == 3:
+            rows = payload if isinstance(payload, list) else [payload]
+            on_conflict = parse_qs(url.query).get("on_conflict", [None])[0]
+            state.upsert(parts[2], rows, on_conflict)
+            return self.send_json(201)
+
+        if parts[:2] == ["functions", "v1"] and len(parts) == 3:
+            with state.lock:
+                state.function_calls.append({"name": parts[2], "payload": payload})
+            return self.send_json(200, {"sent": 0, "failed": 0})
+
+        return self.send_json(404, {"message": f"no route for {url.path}"})
+
+
+def start_standin_server(port: int = 0, fail_every: int = 0, reject_encoding: bool = False) -> tuple:
+    """Start the stand-in in a background thread; returns (server, state, base_url)"""
+    state = StandinState(fail_every, reject_encoding)
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    handler.protocol_version = "HTTP/1.1"
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ============================================
+# EXAMPLE: Upload sample content through the stand-in
+# ============================================
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Local PostgREST stand-in server")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--fail-every", type=int, default=0,
+                        help="Return 503 for every Nth request to exercise retries")
+    parser.add_argument("--reject-content-encoding", action="store_true",
+                        help="Return 415 for compressed request bodies, like an upstream without gzip support")
+    parser.add_argument("--gzip", action="store_true", help="Gzip request bodies in the demo upload")
+    parser.add_argument("--demo", action="store_true",
+                        help="Upload the sample weekly content through the stand-in and exit")
+    args = parser.parse_args()
+
+    server, state, base_url = start_standin_server(args.port, args.fail_every, args.reject_content_encoding)
+    print(f"PostgREST stand-in listening on {base_url}")
+
+    if args.demo:
+        import supabase_client
+        from supabase_client import SupabaseClient
+        from weekly_horoscope_api import upload_to_supabase, upload_personalized_forecasts
+
+        supabase_client.RETRY_BACKOFF = 0.05
+        with open("weekly_horoscope_2026-01-19.json") as f:
+            content = json.load(f)
+
+        with SupabaseClient(base_url, "local", compress=args.gzip) as client:
+            upload_to_supabase(content, client, components=True)
+            forecasts = [
+                {
+                    "kundli_id": f"00000000-0000-0000-0000-{i:012d}",
+                    "week_start": content["week_start"],
+                    "week_end": content["week_end"],
+                    "forecast_content": {"text": content["master_overview"]},
+                }
+                for i in range(2000)
+            ]
+            upload_personalized_forecasts(forecasts, client, chunk_size=500)
+
+        sent = sum(r["bytes"] for r in state.requests)
+        decoded = sum(r["decoded_bytes"] for r in state.requests)
+        print(f"{len(state.requests)} requests, {sent} bytes on the wire ({decoded} uncompressed)")
+        for table in state.tables:
+            print(f"  {table}: {len(state.rows(table))} rows")
+        server.shutdown()
+    else:
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,257 @@
+"""
+Opt-in Profiling Hooks
+Counts Swiss Ephemeris calls and times public calculator/analyzer functions
+Produces a flat report or folded stacks (flamegraph.pl / speedscope compatible)
+
+Context manager:
+    with profile() as prof:
+        generate_weekly_analysis()
+    print(prof.format_report())
+
+Environment variable (whole run, report written at exit):
+    COSMICBRIEF_PROFILE=flat python weekly_transit_analyzer.py
+    COSMICBRIEF_PROFILE=folded COSMICBRIEF_PROFILE_OUT=weekly.folded python weekly_transit_analyzer.py
+
+Nothing is patched unless profiling is enabled, so there is no overhead by default.
+"""
+
+import os
+import sys
+import time
+import atexit
+import inspect
+import functools
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+import swisseph as swe
+
+# Ephemeris functions counted as leaf frames
+EPHEMERIS_FUNCTIONS = ["calc_ut", "houses", "get_ayanamsa"]
+
+# Modules whose public functions are timed
+PROFILED_MODULES = ["vedic_calculator", "weekly_transit_analyzer"]
+
+PROFILE_ENV = "COSMICBRIEF_PROFILE"
+PROFILE_OUT_ENV = "COSMICBRIEF_PROFILE_OUT"
+
+
+class ProfileSession:
+    """Patches profiled functions with timing wrappers while active"""
+
+    def __init__(self):
+        self.active = False
+        self.patches: List[Tuple[object, str, object]] = []
+        self.wrappers: Dict[int, object] = {}
+        self.stack: List[list] = []
+        self.functions: Dict[str, Dict] = {}
+        self.folded: Dict[Tuple[str, ...], float] = {}
+        self.ephemeris_calls: Dict[str, int] = {name: 0 for name in EPHEMERIS_FUNCTIONS}
+        self.ephemeris_by_caller: Dict[str, Dict[str, int]] = {}
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    # ---- frame bookkeeping ----
+
+    def enter(self, name: str) -> None:
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self) -> None:
+        name, start, child_time = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        self_time = elapsed - child_time
+
+        stats = self.functions.setdefault(name, {"calls": 0, "total": 0.0, "self": 0.0})
+        stats["calls"] += 1
+        stats["self"] += self_time
+        # Only the outermost frame of a recursive function adds to its total
+        if not any(frame[0] == name for frame in self.stack):
+            stats["total"] += elapsed
+
+        path = tuple(frame[0] for frame in self.stack) + (name,)
+        self.folded[path] = self.folded.get(path, 0.0) + self_time
+
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def count_ephemeris(self, name: str) -> None:
+        self.ephemeris_calls[name] += 1
+        caller = self.stack[-1][0] if self.stack else "<top>"
+        by_caller = self.ephemeris_by_caller.setdefault(caller, {})
+        by_caller[name] = by_caller.get(name, 0) + 1
+
+    # ---- patching ----
+
+    def wrap(self, name: str, fn, ephemeris: bool = False):
+        """Return (and reuse) the timing wrapper for fn"""
+        if id(fn) in self.wrappers:
+            return self.wrappers[id(fn)]
+
+        session = self
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not session.active:
+                return fn(*args, **kwargs)
+            if ephemeris:
+                session.count_ephemeris(name.split(".", 1)[1])
+            session.enter(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                session.exit()
+
+        self.wrappers[id(fn)] = wrapper
+        return wrapper
+
+    def patch(self, owner, attr: str, wrapper) -> None:
+        self.patches.append((owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, wrapper)
+
+    def instrument_module(self, module: ModuleType) -> None:
+        """Wrap every public function from PROFILED_MODULES found in a module's namespace
+
+        Patching each importing module's namespace catches both internal calls
+        and names imported with "from vedic_calculator import ...".
+        """
+        sources = set(PROFILED_MODULES)
+        script = os.path.splitext(os.path.basename(getattr(module, "__file__", "") or ""))[0]
+        if module.__name__ == "__main__" and script in PROFILED_MODULES:
+            sources.add("__main__")
+
+        wrapper_ids = {id(w) for w in self.wrappers.values()}
+        for attr, value in list(vars(module).items()):
+            if attr.startswith("_") or not inspect.isfunction(value) or id(value) in wrapper_ids:
+                continue
+            if value.__module__ in sources:
+                self.patch(module, attr, self.wrap(value.__name__, value))
+
+    def backend_modules(self) -> List[ModuleType]:
+        """Loaded modules that live in this directory (the only ones importing profiled code)"""
+        here = os.path.dirname(os.path.abspath(__file__))
+        return [
+            module for module in list(sys.modules.values())
+            if module is not None
+            and getattr(module, "__file__", None)
+            and os.path.dirname(os.path.abspath(module.__file__)) == here
+        ]
+
+    def start(self) -> "ProfileSession":
+        if self.active:
+            raise RuntimeError("Profiling session already active")
+
+        for name in EPHEMERIS_FUNCTIONS:
+            self.patch(swe, name, self.wrap(f"swe.{name}", getattr(swe, name), ephemeris=True))
+        for module in self.backend_modules():
+            self.instrument_module(module)
+
+        self.active = True
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self) -> None:
+        if not self.active:
+            return
+        self.elapsed += time.perf_counter() - self.started
+        self.active = False
+        for owner, attr, original in reversed(self.patches):
+            setattr(owner, attr, original)
+        self.patches = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- reports ----
+
+    def format_report(self) -> str:
+        """Flat report: per-function calls, total/self time and direct ephemeris calls"""
+        output = []
+        output.append("=" * 78)
+        output.append(f"PROFILE ({self.elapsed * 1000:.1f} ms wall)")
+        output.append("=" * 78)
+        output.append("Ephemeris calls: " + ", ".join(
+            f"swe.{name}={count}" for name, count in self.ephemeris_calls.items()
+        ))
+
+        output.append(f"\n{'Function':<34} {'Calls':>7} {'Total ms':>10} {'Self ms':>10} {'ms/call':>9}  Ephemeris")
+        output.append("-" * 78)
+        ranked = sorted(self.functions.items(), key=lambda item: item[1]["total"], reverse=True)
+        for name, stats in ranked:
+            if name.startswith("swe."):
+                continue
+            ephemeris = self.ephemeris_by_caller.get(name, {})
+            direct = ", ".join(f"{k}={v}" for k, v in ephemeris.items()) or "-"
+            output.append(
+                f"{name:<34} {stats['calls']:>7} {stats['total'] * 1000:>10.2f} "
+                f"{stats['self'] * 1000:>10.2f} {stats['total'] * 1000 / stats['calls']:>9.3f}  {direct}"
+            )
+
+        return "\n".join(output)
+
+    def format_folded(self) -> str:
+        """Folded stacks weighted by self time in microseconds (one 'a;b;c weight' per line)"""
+        return "\n".join(
+            f"{';'.join(path)} {int(round(seconds * 1e6))}"
+            for path, seconds in sorted(self.folded.items())
+            if seconds > 0
+        ) + "\n"
+
+    def to_dict(self) -> Dict:
+        return {
+            "elapsed_seconds": round(self.elapsed, 6),
+            "ephemeris_calls": dict(self.ephemeris_calls),
+            "functions": {
+                name: {**stats, "ephemeris_calls": self.ephemeris_by_caller.get(name, {})}
+                for name, stats in self.functions.items()
+            },
+        }
+
+
+def profile() -> ProfileSession:
+    """Create a session for use as a context manager"""
+    return ProfileSession()
+
+
+# ============================================
+# ENVIRONMENT-VARIABLE MODE
+# ============================================
+
+env_session: Optional[ProfileSession] = None
+
+
+def write_env_report() -> None:
+    """Stop the environment session and write its report (registered with atexit)"""
+    if env_session is None:
+        return
+    env_session.stop()
+
+    mode = os.environ.get(PROFILE_ENV, "flat").lower()
+    report = env_session.format_folded() if mode == "folded" else env_session.format_report() + "\n"
+    path = os.environ.get(PROFILE_OUT_ENV)
+    if path:
+        with open(path, "w") as f:
+            f.write(report)
+        print(f"Profile written to {path}", file=sys.stderr)
+    else:
+        sys.stderr.write(report)
+
+
+def enable_from_env(module: Optional[ModuleType] = None) -> Optional[ProfileSession]:
+    """Start (or extend) a whole-run session if COSMICBRIEF_PROFILE is set
+
+    Profiled modules call this at import time with themselves, so modules
+    imported after the session started are instrumented too.
+    """
+    global env_session
+    if not os.environ.get(PROFILE_ENV) or os.environ.get(PROFILE_ENV) == "0":
+        return None
+
+    if env_session is None:
+        env_session = ProfileSession().start()
+        atexit.register(write_env_report)
+    if module is not None:
+        env_session.instrument_module(module)
+    return env_session
@@ -0,0 +1,452 @@
+"""
+Shadbala (Six-fold Planetary Strength)
+Sthana, Dig, Kala, Cheshta, Naisargika and Drik bala for the seven grahas, batched over charts
+
+Every ephemeris-derived input a chart needs (sidereal and heliocentric positions, speeds,
+declinations, Lagna and MC, sunrise/sunset and the year, month, day and hour lords) is
+gathered once per chart by chart_ephemeris(). The balas themselves are then numpy
+expressions over arrays of shape (charts, 7), so one chart or ten thousand cost one pass
+each. batch_shadbala() spreads the per-chart ephemeris work over a process pool.
+
+All values are in virupas (shashtiamsas, 60 to a rupa). Conventions, following BPHS:
+  - Saptavargaja dignity uses D1, D2, D3, D7, D9, D12 and D30 with compound (natural plus
+    temporary) friendship; moolatrikona counts in D1 only
+  - Abda and Masa lords are the vara lords at the Sun's sidereal ingress into Mesha and
+    into its current sign; Vara and Hora lords follow sunrise at the birth place
+  - Cheshta kendra is the angle between the planet's heliocentric longitude and the Sun
+    (true rather than mean positions); the Sun's cheshta is its ayana bala, the Moon's
+    its paksha bala
+  - Drik bala uses sputa drishti, with Mars, Jupiter and Saturn's special aspects at full
+    value across the aspected house
+  - Yuddha bala (planetary war) is not applied
+
+Usage:
+    report = shadbala_for_birth(birth_dt, lat, lon, tz="America/Los_Angeles")   # per graha, plus ranking
+    reports = batch_shadbala([{"dt": ..., "lat": ..., "lon": ...}, ...], workers=8)
+"""
+
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import swisseph as swe
+
+from vedic_calculator import (
+    PLANETS,
+    SIGNS,
+    datetime_to_jd,
+    get_ayanamsa,
+)
+from vargas import split_longitudes, varga_signs
+from sunrise import hora_at, jd_to_datetime, vedic_day
+from timezones import TimezoneLike, to_utc
+
+SHADBALA_PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+SUN, MOON, MARS, MERCURY, JUPITER, VENUS, SATURN = range(7)
+
+# Planets whose cheshta bala comes from their heliocentric position
+CHESHTA_PLANETS = [MARS, MERCURY, JUPITER, VENUS, SATURN]
+
+# Minimum total strength (rupas) for a graha to count as strong
+REQUIRED_RUPAS = np.array([6.5, 6.0, 5.0, 7.0, 6.5, 5.5, 5.0])
+
+# Single-chart report latency the benchmark below is held to (cold sunrise cache)
+SHADBALA_TARGET_MS = 10.0
+
+# Charts per process pool task
+WORKER_CHUNK_SIZE = 256
+
+# Deep exaltation points (sidereal degrees); debilitation is opposite
+EXALTATION = np.array([10.0, 33.0, 298.0, 165.0, 95.0, 357.0, 200.0])
+
+# Moolatrikona: sign index and degree range within it
+MOOLATRIKONA_SIGN = np.array([4, 1, 0, 5, 8, 6, 10])
+MOOLATRIKONA_START = np.array([0.0, 3.0, 0.0, 15.0, 0.0, 0.0, 0.0])
+MOOLATRIKONA_END = np.array([20.0, 30.0, 12.0, 20.0, 10.0, 15.0, 20.0])
+
+# Natural friendship [planet, other]: 1 friend, 0 neutral, -1 enemy
+NATURAL_FRIENDSHIP = np.array([
+    # Sun Moon Mars Merc Jup  Ven  Sat
+    [0,   1,   1,   0,   1,   -1,  -1],   # Sun
+    [1,   0,   0,   1,   0,   0,   0],    # Moon
+    [1,   1,   0,   -1,  1,   0,   0],    # Mars
+    [1,   -1,  0,   0,   0,   1,   0],    # Mercury
+    [1,   1,   1,   -1,  0,   -1,  0],    # Jupiter
+    [-1,  -1,  0,   1,   0,   0,   1],    # Venus
+    [-1,  -1,  -1,  1,   0,   1,   0],    # Saturn
+])
+
+# Saptavargaja virupas by compound relationship with the sign lord (-2 great enemy .. 2 great friend)
+COMPOUND_VIRUPAS = np.array([1.875, 3.75, 7.5, 15.0, 22.5])
+OWN_SIGN_VIRUPAS = 30.0
+MOOLATRIKONA_VIRUPAS = 45.0
+SAPTAVARGA_DIVISIONS = [2, 3, 7, 9, 12, 30]
+
+SIGN_LORDS = np.array([SHADBALA_PLANETS.index(sign["lord"]) for sign in SIGNS])
+
+# Houses from a planet whose occupants are its temporary friends
+TEMPORARY_FRIEND_HOUSES = [2, 3, 4, 10, 11, 12]
+
+# Ojhayugma: Moon and Venus are strong in even signs, the rest in odd
+EVEN_SIGN_PLANETS = np.array([False, True, False, False, False, True, False])
+
+# Drekkana bala: male, neutral and female planets in the 1st, 2nd and 3rd drekkana
+DREKKANA = np.array([0, 2, 0, 1, 0, 2, 1])
+
+# Dig bala: ecliptic point of full strength, as an offset from the Lagna (0) or MC (10th)
+DIG_FROM_MC = np.array([True, True, True, False, False, True, False])
+DIG_OFFSET = np.array([0.0, 180.0, 0.0, 0.0, 0.0, 180.0, 180.0])  # Sun/Mars MC, Moon/Venus IC, Mer/Jup Lagna, Sat 7th
+
+# Nathonnata: +1 strong by day, -1 strong by night, 0 always full (Mercury)
+DAY_STRONG = np.array([1, -1, -1, 0, 1, 1, -1])
+
+# Natural benefics for paksha bala (the rest get 60 minus the benefic value)
+PAKSHA_BENEFICS = np.array([False, True, False, True, True, True, False])
+
+# Ayana bala: +1 strong in northern declination, -1 southern, 0 either (Mercury)
+AYANA_DIRECTION = np.array([1, -1, 1, 0, 1, 1, -1])
+
+# Tribhaga lords: thirds of the day, then of the night (Jupiter always gets full)
+DAY_TRIBHAGA = [MERCURY, SUN, SATURN]
+NIGHT_TRIBHAGA = [MOON, VENUS, MARS]
+
+NAISARGIKA = np.array([60.0, 51.43, 17.14, 25.71, 34.29, 42.86, 8.57])
+
+# Special aspects at full value: aspecting planet -> angular ranges from it
+SPECIAL_ASPECTS = {MARS: [(90, 120), (210, 240)], JUPITER: [(120, 150), (240, 270)], SATURN: [(60, 90), (270, 300)]}
+
+# Drik bala: natural benefics aspect positively (the Moon only when waxing)
+DRIK_BENEFICS = np.array([False, True, False, True, True, True, False])
+
+BALAS = ["sthana", "dig", "kala", "cheshta", "naisargika", "drik"]
+
+
+def angular_distance(a, b) -> np.ndarray:
+    """Shorter arc between longitudes, 0-180 degrees"""
+    return np.abs((np.asarray(a) - b + 180) % 360 - 180)
+
+
+# ============================================
+# PER-CHART EPHEMERIS (the only Swiss Ephemeris work)
+# ============================================
+
+def lord_index(dt: datetime, latitude: float, longitude: float) -> int:
+    return SHADBALA_PLANETS.index(vedic_day(dt, latitude, longitude)["lord"])
+
+
+def preceding_ingress(jd: float, sign_start: float, window: float) -> float:
+    """Julian day of the Sun's last sidereal crossing of sign_start at or before jd
+
+    window (days) must reach back past the last crossing and stay under a year: 32 for
+    the Sun's current sign (solar months are at most 31.5 days), 365 for Mesha, searched
+    one more day back if the 365.26-day sidereal year puts the crossing just outside.
+    """
+    get_ayanamsa(jd)  # sets the sidereal mode solcross_ut uses
+    crossing = swe.solcross_ut(sign_start, jd - window, swe.FLG_SIDEREAL)
+    if crossing > jd:
+        crossing = swe.solcross_ut(sign_start, jd - window - 1, swe.FLG_SIDEREAL)
+    return crossing
+
+
+def chart_ephemeris(birth_dt: datetime, latitude: float, longitude: float, tz: TimezoneLike = None) -> Dict:
+    """Every ephemeris-derived quantity Shadbala needs for one chart, computed once"""
+    utc = to_utc(birth_dt, tz)
+    jd = datetime_to_jd(utc)
+    ayanamsa = get_ayanamsa(jd)
+    obliquity = swe.calc_ut(jd, swe.ECL_NUT)[0][0]
+
+    tropical, latitudes, speeds = [], [], []
+    for planet in SHADBALA_PLANETS:
+        result = swe.calc_ut(jd, PLANETS[planet])[0]
+        tropical.append(result[0])
+        latitudes.append(result[1])
+        speeds.append(result[3])
+    heliocentric = [swe.calc_ut(jd, PLANETS[SHADBALA_PLANETS[p]], swe.FLG_HELCTR)[0][0] for p in CHESHTA_PLANETS]
+
+    _, ascmc = swe.houses(jd, latitude, longitude, b'O')
+
+    # Day or night, and which third of it, from sunrise at the birth place
+    day = vedic_day(utc, latitude, longitude)
+    if utc < day["sunset"]:
+        third = int(3 * (utc - day["sunrise"]) / (day["sunset"] - day["sunrise"]))
+        tribhaga = DAY_TRIBHAGA[min(third, 2)]
+    else:
+        third = int(3 * (utc - day["sunset"]) / (day["next_sunrise"] - day["sunset"]))
+        tribhaga = NIGHT_TRIBHAGA[min(third, 2)]
+    midday = day["sunrise"] + (day["sunset"] - day["sunrise"]) / 2
+    hours_from_midday = abs((utc - midday).total_seconds()) / 3600
+    day_strength = max(0.0, 1 - min(hours_from_midday, 24 - hours_from_midday) / 12)
+
+    sun = (tropical[SUN] - ayanamsa) % 360
+    return {
+        "jd": jd,
+        "ayanamsa": ayanamsa,
+        "obliquity": obliquity,
+        "tropical": tropical,
+        "latitudes": latitudes,
+        "speeds": speeds,
+        "heliocentric": heliocentric,
+        "ascendant": (ascmc[0] - ayanamsa) % 360,
+        "mc": (ascmc[1] - ayanamsa) % 360,
+        "day_strength": day_strength,
+        "tribhaga_lord": tribhaga,
+        "abda_lord": lord_index(jd_to_datetime(preceding_ingress(jd, 0.0, 365.0)), latitude, longitude),
+        "masa_lord": lord_index(jd_to_datetime(preceding_ingress(jd, sun // 30 * 30, 32.0)), latitude, longitude),
+        "vara_lord": SHADBALA_PLANETS.index(day["lord"]),
+        "hora_lord": SHADBALA_PLANETS.index(hora_at(utc, latitude, longitude)["lord"]),
+    }
+
+
+# ============================================
+# BALAS (vectorized over charts)
+# ============================================
+
+def stack(ephemerides: Sequence[Dict], key: str) -> np.ndarray:
+    return np.array([e[key] for e in ephemerides], dtype=np.float64)
+
+
+def sthana_bala(lon: np.ndarray, ascendant: np.ndarray) -> Dict[str, np.ndarray]:
+    """Uchcha, saptavargaja, ojhayugma, kendradi and drekkana bala"""
+    planets = np.arange(7)
+    _, sign, degree, odd = split = split_longitudes(lon)
+
+    uchcha = angular_distance(lon, (EXALTATION + 180) % 360) / 3
+
+    # Temporary friendship from D1 positions: lord's house counted from the planet
+    def dignity(varga_sign: np.ndarray) -> np.ndarray:
+        lord = SIGN_LORDS[varga_sign]
+        lord_d1 = np.take_along_axis(sign, lord, axis=-1)
+        temporary = np.where(np.isin((lord_d1 - sign) % 12 + 1, TEMPORARY_FRIEND_HOUSES), 1, -1)
+        compound = NATURAL_FRIENDSHIP[planets, lord] + temporary
+        return np.where(lord == planets, OWN_SIGN_VIRUPAS, COMPOUND_VIRUPAS[compound + 2])
+
+    moolatrikona = (sign == MOOLATRIKONA_SIGN) & (degree >= MOOLATRIKONA_START) & (degree < MOOLATRIKONA_END)
+    saptavargaja = np.where(moolatrikona, MOOLATRIKONA_VIRUPAS, dignity(sign))
+    navamsa = None
+    for division in SAPTAVARGA_DIVISIONS:
+        varga = varga_signs(lon, division, split)
+        saptavargaja = saptavargaja + dignity(varga)
+        if division == 9:
+            navamsa = varga
+
+    ojhayugma = 15.0 * ((odd != EVEN_SIGN_PLANETS).astype(float) + ((navamsa % 2 == 0) != EVEN_SIGN_PLANETS))
+
+    house = (sign - (ascendant[:, None] // 30).astype(np.int64)) % 12
+    kendradi = np.choose(house % 3, [60.0, 30.0, 15.0])
+
+    drekkana = np.where((degree // 10).astype(np.int64) == DREKKANA, 15.0, 0.0)
+
+    return {
+        "uchcha": uchcha,
+        "saptavargaja": saptavargaja,
+        "ojhayugma": ojhayugma,
+        "kendradi": kendradi,
+        "drekkana": drekkana,
+    }
+
+
+def dig_bala(lon: np.ndarray, ascendant: np.ndarray, mc: np.ndarray) -> np.ndarray:
+    strongest = np.where(DIG_FROM_MC, mc[:, None], ascendant[:, None]) + DIG_OFFSET
+    return (180 - angular_distance(lon, strongest)) / 3
+
+
+def declinations(ephemerides: Sequence[Dict]) -> np.ndarray:
+    """Declination (degrees) of each graha from ecliptic longitude, latitude and obliquity"""
+    lam = np.radians(stack(ephemerides, "tropical"))
+    beta = np.radians(stack(ephemerides, "latitudes"))
+    eps = np.radians(stack(ephemerides, "obliquity"))[:, None]
+    return np.degrees(np.arcsin(np.sin(beta) * np.cos(eps) + np.cos(beta) * np.sin(eps) * np.sin(lam)))
+
+
+def kala_bala(lon: np.ndarray, ephemerides: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """Nathonnata, paksha, tribhaga, abda/masa/vara/hora and ayana bala"""
+    n = len(ephemerides)
+    planets = np.arange(7)
+
+    day = stack(ephemerides, "day_strength")[:, None]
+    nathonnata = np.select([DAY_STRONG > 0, DAY_STRONG < 0], [60 * day, 60 * (1 - day)], 60.0)
+
+    benefic = angular_distance(lon[:, MOON], lon[:, SUN])[:, None] / 3
+    paksha = np.where(PAKSHA_BENEFICS, benefic, 60 - benefic)
+
+    tribhaga = np.where(planets == stack(ephemerides, "tribhaga_lord")[:, None], 60.0, 0.0)
+    tribhaga[:, JUPITER] = 60.0
+
+    lords = np.zeros((n, 7))
+    for key, virupas in (("abda_lord", 15.0), ("masa_lord", 30.0), ("vara_lord", 45.0), ("hora_lord", 60.0)):
+        lords += np.where(planets == stack(ephemerides, key)[:, None], virupas, 0.0)
+
+    declination = declinations(ephemerides)
+    ayana = np.clip((24 + np.where(AYANA_DIRECTION == 0, np.abs(declination), AYANA_DIRECTION * declination)) * 60 / 48, 0, 60)
+
+    return {
+        "nathonnata": nathonnata,
+        "paksha": paksha,
+        "tribhaga": tribhaga,
+        "abda_masa_vara_hora": lords,
+        "ayana": ayana,
+    }
+
+
+def cheshta_bala(ephemerides: Sequence[Dict], kala: Dict[str, np.ndarray]) -> np.ndarray:
+    sun_tropical = stack(ephemerides, "tropical")[:, SUN]
+    cheshta = np.empty((len(ephemerides), 7))
+    cheshta[:, CHESHTA_PLANETS] = angular_distance(stack(ephemerides, "heliocentric"), sun_tropical[:, None]) / 3
+    cheshta[:, SUN] = kala["ayana"][:, SUN]
+    cheshta[:, MOON] = kala["paksha"][:, MOON]
+    return cheshta
+
+
+def drishti_virupas(angle: np.ndarray) -> np.ndarray:
+    """Sputa drishti of a planet on a point angle degrees ahead of it (0-60)"""
+    return np.select(
+        [angle < 30, angle < 60, angle < 90, angle < 120, angle < 150, angle < 180, angle < 300],
+        [0.0, (angle - 30) / 2, angle - 45, (120 - angle) / 2 + 30, 150 - angle, (angle - 150) * 2, (300 - angle) / 2],
+        0.0,
+    )
+
+
+def drik_bala(lon: np.ndarray) -> np.ndarray:
+    """A quarter of the benefic minus malefic drishti each graha receives"""
+    # angle[n, aspecting, aspected]
+    angle = (lon[:, None, :] - lon[:, :, None]) % 360
+    drishti = drishti_virupas(angle)
+    for planet, ranges in SPECIAL_ASPECTS.items():
+        for low, high in ranges:
+            drishti[:, planet] = np.where((angle[:, planet] >= low) & (angle[:, planet] < high), 60.0, drishti[:, planet])
+    drishti[:, np.arange(7), np.arange(7)] = 0.0
+
+    waxing = (lon[:, MOON] - lon[:, SUN]) % 360 < 180
+    benefic = np.broadcast_to(DRIK_BENEFICS, lon.shape).copy()
+    benefic[:, MOON] = waxing
+    sign = np.where(benefic, 1.0, -1.0)
+    return (sign[:, :, None] * drishti).sum(axis=1) / 4
+
+
+def shadbala_arrays(ephemerides: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """All balas and sub-balas, each (charts, 7) in virupas, plus "total" """
+    ayanamsa = stack(ephemerides, "ayanamsa")[:, None]
+    lon = np.mod(stack(ephemerides, "tropical") - ayanamsa, 360.0)
+    ascendant = stack(ephemerides, "ascendant")
+    mc = stack(ephemerides, "mc")
+
+    sthana = sthana_bala(lon, ascendant)
+    kala = kala_bala(lon, ephemerides)
+    balas = {
+        "sthana": sum(sthana.values()),
+        "dig": dig_bala(lon, ascendant, mc),
+        "kala": sum(kala.values()),
+        "cheshta": cheshta_bala(ephemerides, kala),
+        "naisargika": np.broadcast_to(NAISARGIKA, lon.shape),
+        "drik": drik_bala(lon),
+    }
+    balas["total"] = sum(balas[name] for name in BALAS)
+    return {**balas, **sthana, **kala}
+
+
+def shadbala_reports(ephemerides: Sequence[Dict]) -> List[Dict]:
+    """Per-chart reports: each graha's six balas (virupas), total rupas and ratio to required"""
+    arrays = shadbala_arrays(ephemerides)
+    retrograde = stack(ephemerides, "speeds") < 0
+    retrograde[:, [SUN, MOON]] = False
+    rupas = arrays["total"] / 60
+    ratio = rupas / REQUIRED_RUPAS
+
+    reports = []
+    for n in range(len(ephemerides)):
+        grahas = {}
+        for p, planet in enumerate(SHADBALA_PLANETS):
+            grahas[planet] = {name: round(float(arrays[name][n, p]), 2) for name in BALAS}
+            grahas[planet].update({
+                "total": round(float(arrays["total"][n, p]), 2),
+                "rupas": round(float(rupas[n, p]), 2),
+                "required_rupas": float(REQUIRED_RUPAS[p]),
+                "ratio": round(float(ratio[n, p]), 2),
+                "strong": bool(ratio[n, p] >= 1),
+                "retrograde": bool(retrograde[n, p]),
+            })
+        ranking = [SHADBALA_PLANETS[p] for p in np.argsort(-ratio[n], kind="stable").tolist()]
+        reports.append({"grahas": grahas, "ranking": ranking})
+    return reports
+
+
+def shadbala_for_birth(birth_dt: datetime, latitude: float, longitude: float, tz: TimezoneLike = None) -> Dict:
+    """Shadbala report for one birth"""
+    return shadbala_reports([chart_ephemeris(birth_dt, latitude, longitude, tz)])[0]
+
+
+# ============================================
+# BATCH MODE
+# ============================================
+
+def shadbala_chunk(births: List[Dict]) -> List[Dict]:
+    """Reports for a chunk of births (pool worker); each birth has dt, lat, lon and optional tz"""
+    ephemerides = [chart_ephemeris(b["dt"], b["lat"], b["lon"], b.get("tz")) for b in births]
+    return shadbala_reports(ephemerides)
+
+
+def batch_shadbala(births: List[Dict], workers: Optional[int] = None) -> List[Dict]:
+    """Reports for many births across worker processes (workers=1 runs inline), in input order"""
+    chunks = [births[i:i + WORKER_CHUNK_SIZE] for i in range(0, len(births), WORKER_CHUNK_SIZE)]
+    if workers == 1 or len(chunks) <= 1:
+        results = [shadbala_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(shadbala_chunk, chunks))
+    return [report for chunk in results for report in chunk]
+
+
+# ============================================
+# EXAMPLE: One report, then latency and batch throughput
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    import random
+    from datetime import timedelta
+
+    from sunrise import cell_sun_times
+
+    report = shadbala_for_birth(datetime(1986, 12, 26, 23, 50), 33.7879, -117.8531, tz="America/Los_Angeles")
+    print(f"{'':<8} " + " ".join(f"{name:>10}" for name in BALAS) + "   rupas  ratio")
+    for planet, bala in report["grahas"].items():
+        print(f"{planet:<8} " + " ".join(f"{bala[name]:>10.2f}" for name in BALAS)
+              + f"  {bala['rupas']:>6.2f}  {bala['ratio']:>5.2f}{'' if bala['strong'] else '  (weak)'}")
+    print(f"Strongest to weakest: {', '.join(report['ranking'])}")
+
+    rng = random.Random(50)
+    births = [
+        {
+            "dt": datetime(1950, 1, 1) + timedelta(minutes=rng.randrange(60 * 24 * 365 * 60)),
+            "lat": rng.uniform(-50, 60),
+            "lon": rng.uniform(-180, 180),
+        }
+        for _ in range(2_000)
+    ]
+
+    # Single report latency with a cold sunrise cache (every birth a new place and date)
+    cell_sun_times.cache_clear()
+    latencies = []
+    for birth in births[:200]:
+        start = time.perf_counter()
+        shadbala_for_birth(birth["dt"], birth["lat"], birth["lon"])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p50, p99 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+    print(f"\nSingle report: p50 {p50:.2f} ms, p99 {p99:.2f} ms (target {SHADBALA_TARGET_MS:.0f} ms)")
+
+    # Ephemeris gathering vs the vectorized balas, then the process pool
+    start = time.perf_counter()
+    ephemerides = [chart_ephemeris(b["dt"], b["lat"], b["lon"]) for b in births]
+    ephemeris_time = time.perf_counter() - start
+    start = time.perf_counter()
+    shadbala_arrays(ephemerides)
+    bala_time = time.perf_counter() - start
+    print(f"{len(births):,} charts: ephemeris {ephemeris_time * 1000:.0f} ms, balas {bala_time * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    reports = batch_shadbala(births)
+    print(f"batch_shadbala: {len(reports):,} reports in {time.perf_counter() - start:.2f} s")
+
+    assert p99 < SHADBALA_TARGET_MS, f"p99 {p99:.2f} ms over the {SHADBALA_TARGET_MS} ms target"
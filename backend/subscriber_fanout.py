@@ -0,0 +1,254 @@
+"""
+Subscriber Fan-out Pipeline
+Computes each subscriber's personalization key (Moon sign, nakshatra, mahadasha) from birth data,
+groups subscribers by key, renders each group's horoscope once and emits batched send payloads
+
+Rendering work scales with unique keys (at most 12 x 27 x 9 = 2,916), not subscribers.
+
+Run with: python subscriber_fanout.py subscribers.jsonl --content weekly_horoscope_2026-01-19.json
+Each subscriber line: {"id": ..., "email": ..., "name": ..., "birth_utc": "1986-12-27T07:50:00",
+                       "latitude": 33.79, "longitude": -117.85}
+Instead of birth_utc, records may carry "birth_local": "1986-12-26T23:50:00" and "timezone": "America/Los_Angeles";
+these are converted to UTC in one vectorized pass before the workers start.
+"""
+
+import json
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from vedic_calculator import (
+    PLANETS,
+    datetime_to_jd,
+    get_sidereal_position,
+    get_sign_from_longitude,
+    get_nakshatra_from_longitude,
+    calculate_dasha,
+    get_full_birth_chart,
+)
+from timezones import bulk_records_to_utc, parse_local_datetime
+
+# Recipients per send payload (Resend batch API limit)
+SEND_BATCH_SIZE = 100
+
+# Records per worker task
+WORKER_CHUNK_SIZE = 256
+
+# (moon_sign, nakshatra, mahadasha)
+PersonalizationKey = Tuple[str, str, str]
+
+
+def parse_birth_utc(value: str) -> datetime:
+    """Parse a UTC ISO timestamp from a subscriber record (an explicit offset is converted)"""
+    return parse_local_datetime(value)
+
+
+def compute_moon_only_key(birth_dt: datetime, target_dt: datetime) -> Optional[PersonalizationKey]:
+    """Personalization key from the Moon alone (one ephemeris call, no houses or other planets)
+
+    Matches get_full_birth_chart: sign and nakshatra from the exact Moon longitude,
+    the dasha from the longitude rounded to 2 decimals.
+    """
+    jd = datetime_to_jd(birth_dt)
+    moon_longitude = get_sidereal_position(jd, PLANETS["Moon"])
+    dasha = calculate_dasha(round(moon_longitude, 2), birth_dt, target_dt)
+    if "error" in dasha:
+        return None
+
+    return (
+        get_sign_from_longitude(moon_longitude)["vedic"],
+        get_nakshatra_from_longitude(moon_longitude)["name"],
+        dasha["mahadasha"]["lord"],
+    )
+
+
+def compute_full_chart_key(
+    birth_dt: datetime,
+    latitude: float,
+    longitude: float,
+    target_dt: datetime,
+) -> Optional[PersonalizationKey]:
+    """Personalization key via the full birth chart"""
+    chart = get_full_birth_chart(birth_dt, latitude, longitude, target_dt)
+    if "error" in chart["current_dasha"]:
+        return None
+
+    return (
+        chart["moon_sign"]["vedic"],
+        chart["moon_nakshatra"]["name"],
+        chart["current_dasha"]["mahadasha"]["lord"],
+    )
+
+
+def compute_keys_for_chunk(args: Tuple[List[Dict], str, bool]) -> List[Tuple[Dict, Optional[PersonalizationKey], Optional[str]]]:
+    """Worker task: compute keys for a chunk of subscribers
+
+    Returns (subscriber, key, error) for each record.
+    """
+    records, target_iso, full_chart = args
+    target_dt = datetime.fromisoformat(target_iso)
+    results = []
+
+    for record in records:
+        try:
+            birth_dt = parse_birth_utc(record["birth_utc"])
+            if full_chart:
+                key = compute_full_chart_key(birth_dt, record["latitude"], record["longitude"], target_dt)
+            else:
+                key = compute_moon_only_key(birth_dt, target_dt)
+            error = None if key else "dasha outside calculated range"
+        except (KeyError, TypeError, ValueError) as e:
+            key, error = None, f"invalid birth data: {e}"
+        results.append((record, key, error))
+
+    return results
+
+
+def compute_personalization_keys(
+    subscribers: List[Dict],
+    target_dt: datetime,
+    full_chart: bool = False,
+    workers: Optional[int] = None,
+) -> List[Tuple[Dict, Optional[PersonalizationKey], Optional[str]]]:
+    """Compute keys for all subscribers across worker processes (workers=1 runs inline)"""
+    subscribers = bulk_records_to_utc(subscribers)
+    chunks = [
+        (subscribers[i:i + WORKER_CHUNK_SIZE], target_dt.isoformat(), full_chart)
+        for i in range(0, len(subscribers), WORKER_CHUNK_SIZE)
+    ]
+
+    if workers == 1 or len(chunks) <= 1:
+        results = [compute_keys_for_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(compute_keys_for_chunk, chunks))
+
+    return [item for chunk in results for item in chunk]
+
+
+def group_by_key(
+    keyed: Iterable[Tuple[Dict, Optional[PersonalizationKey], Optional[str]]],
+) -> Tuple[Dict[PersonalizationKey, List[Dict]], List[Dict]]:
+    """Group subscribers by key; returns (groups, unmatched subscribers with reasons)"""
+    groups: Dict[PersonalizationKey, List[Dict]] = {}
+    unmatched = []
+
+    for subscriber, key, error in keyed:
+        if key is None:
+            unmatched.append({**subscriber, "error": error})
+        else:
+            groups.setdefault(key, []).append(subscriber)
+
+    return groups, unmatched
+
+
+def build_send_payloads(
+    content: Dict,
+    groups: Dict[PersonalizationKey, List[Dict]],
+    batch_size: int = SEND_BATCH_SIZE,
+) -> Iterable[Dict]:
+    """Render one horoscope per group and yield batched send payloads"""
+    from weekly_horoscope_api import assemble_personalized_horoscope
+
+    for (moon_sign, nakshatra, mahadasha), members in groups.items():
+        horoscope = assemble_personalized_horoscope(content, moon_sign, nakshatra, mahadasha)
+        recipients = [
+            {"id": m.get("id"), "email": m.get("email"), "name": m.get("name")}
+            for m in members
+        ]
+        for i in range(0, len(recipients), batch_size):
+            yield {
+                "week_start": content["week_start"],
+                "week_end": content["week_end"],
+                "moon_sign": moon_sign,
+                "nakshatra": nakshatra,
+                "mahadasha": mahadasha,
+                "horoscope": horoscope,
+                "recipients": recipients[i:i + batch_size],
+            }
+
+
+def load_subscribers(path: str) -> List[Dict]:
+    """Load subscriber records from a JSONL file"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_fanout(
+    subscribers: List[Dict],
+    content: Dict,
+    output_path: str,
+    full_chart: bool = False,
+    workers: Optional[int] = None,
+    batch_size: int = SEND_BATCH_SIZE,
+) -> Dict:
+    """Run the whole pipeline and write send payloads as JSONL; returns run stats"""
+    target_dt = datetime.strptime(content["week_start"], "%Y-%m-%d").replace(hour=12)
+
+    keyed = compute_personalization_keys(subscribers, target_dt, full_chart, workers)
+    groups, unmatched = group_by_key(keyed)
+
+    payloads = 0
+    with open(output_path, "w") as f:
+        for payload in build_send_payloads(content, groups, batch_size):
+            f.write(json.dumps(payload) + "\n")
+            payloads += 1
+
+    return {
+        "subscribers": len(subscribers),
+        "unique_keys": len(groups),
+        "payloads": payloads,
+        "unmatched": unmatched,
+    }
+
+
+# ============================================
+# EXAMPLE: Fan out a subscriber file (or synthetic subscribers)
+# ============================================
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+    from datetime import timedelta
+
+    parser = argparse.ArgumentParser(description="Group subscribers and build weekly send payloads")
+    parser.add_argument("subscribers", nargs="?", help="Subscriber JSONL file")
+    parser.add_argument("--content", default="weekly_horoscope_2026-01-19.json", help="Weekly content JSON")
+    parser.add_argument("--out", default="send_payloads.jsonl", help="Output JSONL of send payloads")
+    parser.add_argument("--full-chart", action="store_true", help="Use get_full_birth_chart instead of the Moon-only path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=SEND_BATCH_SIZE, help="Recipients per payload")
+    parser.add_argument("--demo", type=int, default=0, help="Generate this many synthetic subscribers")
+    args = parser.parse_args()
+
+    with open(args.content) as f:
+        content = json.load(f)
+
+    if args.demo:
+        rng = random.Random(7)
+        base = datetime(1950, 1, 1)
+        subscribers = [
+            {
+                "id": i,
+                "email": f"subscriber{i}@example.com",
+                "name": None,
+                "birth_utc": (base + timedelta(minutes=rng.randrange(60 * 24 * 365 * 55))).isoformat(),
+                "latitude": rng.uniform(-50, 60),
+                "longitude": rng.uniform(-180, 180),
+            }
+            for i in range(args.demo)
+        ]
+    elif args.subscribers:
+        subscribers = load_subscribers(args.subscribers)
+    else:
+        parser.error("pass a subscriber file or --demo N")
+
+    start = time.perf_counter()
+    stats = run_fanout(subscribers, content, args.out, args.full_chart, args.workers, args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"Subscribers:  {stats['subscribers']:,}")
+    print(f"Unique keys:  {stats['unique_keys']:,}")
+    print(f"Payloads:     {stats['payloads']:,} -> {args.out}")
+    print(f"Unmatched:    {len(stats['unmatched']):,}")
+    print(f"Elapsed:      {elapsed:.2f}s ({stats['subscribers'] / elapsed:,.0f} subscribers/sec)")
@@ -0,0 +1,234 @@
+"""
+Sunrise, Sunset and the Vedic Day
+Swiss Ephemeris rise/set times cached per location cell and date, with vara and hora lookups
+
+The Vedic day (vara) runs from sunrise to the next sunrise, and its 24 horas split daytime
+and night into 12 parts each. Rise/set searches are cached per (CELL_DEGREES lat/lon cell,
+date): everyone in the same quarter-degree cell (about 28 km) on the same date shares one
+search, which moves sunrise by well under a minute outside polar latitudes.
+
+Sunrise is the Hindu rising (centre of the disc on the true horizon, no refraction).
+Where the Sun does not rise or set that day (polar day or night), 06:00 and 18:00 local
+mean time are used and the result is flagged "polar".
+
+Usage:
+    times = sun_times(33.7879, -117.8531, date(2026, 1, 19))     # {"sunrise", "sunset", "next_sunrise", ...}
+    vara = vedic_day(datetime(2026, 1, 19, 13, 0), 33.7879, -117.8531)
+    hora = hora_at(datetime(2026, 1, 19, 18, 0), 33.7879, -117.8531)
+    sunrises, sunsets = bulk_sun_times(lats, lons, dates)       # numpy datetime64 arrays
+"""
+
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from vedic_calculator import datetime_to_jd
+from timezones import to_utc
+
+CELL_DEGREES = 0.25
+
+RISE_FLAGS = swe.CALC_RISE | swe.BIT_HINDU_RISING
+SET_FLAGS = swe.CALC_SET | swe.BIT_HINDU_RISING
+
+# Cached (cell, date) searches; a cell-date costs ~0.4 ms to compute and ~300 bytes to keep
+CACHE_SIZE = 200_000
+
+WEEKDAY_LORDS = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]  # Monday first
+
+# Hora lords follow the Chaldean order, starting from the lord of the day
+CHALDEAN_ORDER = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+
+
+# ============================================
+# RISE/SET SEARCH
+# ============================================
+
+def cell_of(latitude: float, longitude: float) -> Tuple[int, int]:
+    """Grid cell indices for a location"""
+    return int(np.floor(latitude / CELL_DEGREES)), int(np.floor(((longitude + 180) % 360 - 180) / CELL_DEGREES))
+
+
+def cell_center(cell: Tuple[int, int]) -> Tuple[float, float]:
+    return (cell[0] + 0.5) * CELL_DEGREES, (cell[1] + 0.5) * CELL_DEGREES
+
+
+def jd_to_datetime(jd: float) -> datetime:
+    """Naive UTC datetime for a Julian day, to the second"""
+    year, month, day, hours = swe.revjul(jd)
+    return datetime(year, month, day) + timedelta(seconds=round(hours * 3600))
+
+
+def next_event(jd: float, flags: int, latitude: float, longitude: float) -> Optional[float]:
+    """Julian day of the next rise or set after jd, or None if the Sun stays up or down"""
+    res, tret = swe.rise_trans(jd, swe.SUN, flags, (longitude, latitude, 0))
+    return tret[0] if res == 0 else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def cell_sun_times(cell: Tuple[int, int], ordinal: int) -> Tuple[float, float, float, bool]:
+    """(sunrise, sunset, next sunrise) Julian days and the polar flag for a cell and date
+
+    The search starts at local mean midnight of the date at the cell centre.
+    """
+    latitude, longitude = cell_center(cell)
+    local_midnight = datetime_to_jd(datetime.fromordinal(ordinal)) - longitude / 360
+
+    sunrise = next_event(local_midnight, RISE_FLAGS, latitude, longitude)
+    sunset = next_event(sunrise, SET_FLAGS, latitude, longitude) if sunrise is not None else None
+    next_sunrise = next_event(sunset, RISE_FLAGS, latitude, longitude) if sunset is not None else None
+
+    if sunrise is None or sunset is None or next_sunrise is None or next_sunrise - local_midnight > 2:
+        return local_midnight + 0.25, local_midnight + 0.75, local_midnight + 1.25, True
+    return sunrise, sunset, next_sunrise, False
+
+
+def sun_times(latitude: float, longitude: float, day: date) -> Dict:
+    """Sunrise, sunset and next sunrise (naive UTC) for a location on a local civil date"""
+    if isinstance(day, datetime):
+        day = day.date()
+    sunrise, sunset, next_sunrise, polar = cell_sun_times(cell_of(latitude, longitude), day.toordinal())
+    return {
+        "date": day.strftime("%Y-%m-%d"),
+        "sunrise": jd_to_datetime(sunrise),
+        "sunset": jd_to_datetime(sunset),
+        "next_sunrise": jd_to_datetime(next_sunrise),
+        "day_length_hours": round((sunset - sunrise) * 24, 2),
+        "polar": polar,
+    }
+
+
+# ============================================
+# VARA AND HORA
+# ============================================
+
+def local_mean_date(dt: datetime, longitude: float) -> date:
+    """Civil date at the location by mean solar time (close enough to pick the right sunrise)"""
+    return (to_utc(dt) + timedelta(hours=longitude / 15)).date()
+
+
+def vedic_day(dt: datetime, latitude: float, longitude: float) -> Dict:
+    """The sunrise-to-sunrise day containing dt, with its vara (weekday) and lord
+
+    Before sunrise, dt still belongs to the previous day's vara.
+    """
+    utc = to_utc(dt)
+    day = local_mean_date(utc, longitude)
+    times = sun_times(latitude, longitude, day)
+    if utc < times["sunrise"]:
+        day -= timedelta(days=1)
+        times = sun_times(latitude, longitude, day)
+    elif utc >= times["next_sunrise"]:
+        day += timedelta(days=1)
+        times = sun_times(latitude, longitude, day)
+
+    times["vara"] = day.strftime("%A")
+    times["lord"] = WEEKDAY_LORDS[day.weekday()]
+    return times
+
+
+def hora_at(dt: datetime, latitude: float, longitude: float) -> Dict:
+    """Hora (planetary hour, 1-24 from sunrise) running at dt and its lord"""
+    day = vedic_day(dt, latitude, longitude)
+    utc = to_utc(dt)
+
+    if utc < day["sunset"]:
+        length = (day["sunset"] - day["sunrise"]) / 12
+        number = int((utc - day["sunrise"]) / length) + 1
+        start = day["sunrise"] + length * (number - 1)
+    else:
+        length = (day["next_sunrise"] - day["sunset"]) / 12
+        number = min(int((utc - day["sunset"]) / length), 11) + 13
+        start = day["sunset"] + length * (number - 13)
+
+    first = CHALDEAN_ORDER.index(day["lord"])
+    return {
+        "number": number,
+        "lord": CHALDEAN_ORDER[(first + number - 1) % 7],
+        "start": start,
+        "end": start + length,
+        "vara": day["vara"],
+        "day_lord": day["lord"],
+    }
+
+
+# ============================================
+# BULK QUERIES
+# ============================================
+
+def bulk_sun_times(
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+    dates: Sequence,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sunrise and sunset (datetime64[s], UTC) for many subscriber locations and local dates
+
+    dates may be a single date for everyone or one per location. Each distinct
+    (cell, date) is searched once; the rest are array lookups.
+    """
+    lats = np.asarray(latitudes, dtype=np.float64)
+    lons = (np.asarray(longitudes, dtype=np.float64) + 180) % 360 - 180
+    if isinstance(dates, (date, datetime)):
+        ordinals = np.full(len(lats), (dates.date() if isinstance(dates, datetime) else dates).toordinal())
+    else:
+        ordinals = np.array([(d.date() if isinstance(d, datetime) else d).toordinal() for d in dates])
+
+    keys = np.stack([
+        np.floor(lats / CELL_DEGREES).astype(np.int64),
+        np.floor(lons / CELL_DEGREES).astype(np.int64),
+        ordinals.astype(np.int64),
+    ], axis=1)
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+
+    jds = np.array([cell_sun_times((int(lat), int(lon)), int(ordinal))[:2] for lat, lon, ordinal in unique.tolist()])
+    unix_jd = datetime_to_jd(UNIX_EPOCH)
+    seconds = np.round((jds - unix_jd) * 86400).astype(np.int64).astype("datetime64[s]")
+    inverse = inverse.ravel()
+    return seconds[inverse, 0], seconds[inverse, 1]
+
+
+# ============================================
+# EXAMPLE: Sample location, then a global subscriber base
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    import random
+
+    lat, lon = 33.7879, -117.8531
+    times = sun_times(lat, lon, date(2026, 1, 19))
+    print(f"Orange, CA 2026-01-19: sunrise {times['sunrise']:%H:%M:%S} UTC, sunset {times['sunset']:%H:%M:%S} UTC "
+          f"({times['day_length_hours']} h)")
+    for hour in (5, 13, 19):
+        local = datetime(2026, 1, 19, hour) + timedelta(hours=8)  # PST -> UTC
+        day, hora = vedic_day(local, lat, lon), hora_at(local, lat, lon)
+        print(f"  {hour:02d}:00 PST: {day['vara']} ({day['lord']}), hora {hora['number']} of {hora['lord']}")
+
+    # Grid error: exact search at the location vs the cell centre
+    worst = 0.0
+    rng = random.Random(44)
+    for _ in range(500):
+        la, lo = rng.uniform(-60, 60), rng.uniform(-180, 180)
+        day_start = datetime_to_jd(datetime(2026, 3, 1)) - lo / 360
+        exact = next_event(day_start, RISE_FLAGS, la, lo)
+        worst = max(worst, abs(exact - cell_sun_times(cell_of(la, lo), date(2026, 3, 1).toordinal())[0]) * 1440)
+    print(f"\nWorst sunrise difference from the cell centre (500 places, |lat| < 60): {worst:.2f} min")
+
+    # 200k subscribers clustered in 2,000 cities, one week of sunrises
+    cities = [(rng.uniform(-45, 60), rng.uniform(-180, 180)) for _ in range(2_000)]
+    subscribers = [cities[rng.randrange(len(cities))] for _ in range(200_000)]
+    lats = [s[0] + rng.uniform(-0.05, 0.05) for s in subscribers]
+    lons = [s[1] + rng.uniform(-0.05, 0.05) for s in subscribers]
+    cell_sun_times.cache_clear()
+
+    start = time.perf_counter()
+    for offset in range(7):
+        sunrises, sunsets = bulk_sun_times(lats, lons, date(2026, 1, 19) + timedelta(days=offset))
+    elapsed = time.perf_counter() - start
+    searches = cell_sun_times.cache_info().currsize
+    print(f"{len(lats):,} subscribers x 7 days: {elapsed:.2f} s, {searches:,} cell-date searches "
+          f"instead of {len(lats) * 7:,}")
@@ -0,0 +1,209 @@
+"""
+Supabase REST Client
+Pooled keep-alive HTTP client for PostgREST upserts and edge function calls
+Applies timeouts, retries transient failures, chunks bulk upserts and can gzip request bodies
+"""
+
+import os
+import gzip
+import json
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from typing import Dict, Iterable, List, Optional
+
+# Connection pool and timeouts
+POOL_SIZE = 10
+CONNECT_TIMEOUT = 5.0  # seconds
+READ_TIMEOUT = 60.0  # seconds
+
+# Retry transient failures with exponential backoff
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0  # seconds, doubled on each retry
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Gzipped request bodies are opt-in (compress=True or SUPABASE_GZIP=1): they have only
+# been checked against postgrest_standin.py, not a real Supabase project.
+# Bodies smaller than this are sent uncompressed even then.
+GZIP_MIN_BYTES = 1024
+
+# Default rows per bulk upsert request
+UPSERT_CHUNK_SIZE = 500
+
+
+class SupabaseError(Exception):
+    """Raised when a Supabase request fails after retries
+
+    For a failed bulk upsert, chunk is the 1-based chunk that failed and
+    rows_sent the rows upserted before it.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.chunk: Optional[int] = None
+        self.rows_sent = 0
+
+
+def chunked(rows: List[Dict], size: int) -> Iterable[List[Dict]]:
+    """Split rows into lists of at most size rows"""
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def connection_not_established(error: requests.ConnectionError) -> bool:
+    """True when the request never reached the server (connect timeout, refused, DNS)
+
+    Other connection errors ("Connection aborted", RemoteDisconnected) can happen
+    after the body was sent, so the server may already have acted on it.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
+class SupabaseClient:
+    """Reusable client for one Supabase project
+
+    All requests share one requests.Session, so connections are kept alive and
+    pooled across calls. Set compress=True to gzip request bodies of
+    GZIP_MIN_BYTES or more (off by default, see GZIP_MIN_BYTES).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        compress: bool = False,
+        timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT),
+        max_retries: int = MAX_RETRIES,
+        pool_size: int = POOL_SIZE,
+    ):
+        self.url = url.rstrip("/")
+        self.compress = compress
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip",
+        })
+
+    @classmethod
+    def from_env(cls, key_vars: tuple = ("SUPABASE_SERVICE_ROLE_KEY",), **kwargs) -> Optional["SupabaseClient"]:
+        """Build a client from SUPABASE_URL and the first key variable set, or None"""
+        url = os.environ.get("SUPABASE_URL")
+        key = next((os.environ[v] for v in key_vars if os.environ.get(v)), None)
+        if not url or not key:
+            return None
+        if "compress" not in kwargs and os.environ.get("SUPABASE_GZIP") == "1":
+            kwargs["compress"] = True
+        return cls(url, key, **kwargs)
+
+    def encode_body(self, payload, compress: bool = True) -> tuple:
+        """Serialize a JSON payload, gzipping it when worthwhile; returns (body, extra_headers)"""
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        if compress and self.compress and len(body) >= GZIP_MIN_BYTES:
+            return gzip.compress(body, compresslevel=6), {"Content-Encoding": "gzip"}
+        return body, {}
+
+    def post(
+        self,
+        path: str,
+        payload,
+        headers: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        retry_statuses: Optional[set] = None,
+        compress: bool = True,
+    ) -> requests.Response:
+        """POST a JSON payload, retrying connection errors, timeouts and retry_statuses
+
+        Pass retry_statuses=set() for non-idempotent calls, which are then only
+        retried when the connection could not be established (see
+        connection_not_established), never after the request may have been sent.
+        """
+        if retry_statuses is None:
+            retry_statuses = RETRY_STATUSES
+
+        body, extra_headers = self.encode_body(payload, compress)
+        request_headers = {**extra_headers, **(headers or {})}
+        retries = 0
+
+        while True:
+            try:
+                response = self.session.post(
+                    f"{self.url}{path}",
+                    data=body,
+                    headers=request_headers,
+                    params=params,
+                    timeout=self.timeout,
+                )
+                if response.status_code not in retry_statuses or retries >= self.max_retries:
+                    break
+                reason = f"HTTP {response.status_code}"
+            except requests.ConnectionError as e:
+                idempotent = retry_statuses != set()
+                if retries >= self.max_retries or not (idempotent or connection_not_established(e)):
+                    raise SupabaseError(f"POST {path} failed: {e}")
+                reason = str(e)
+            except requests.Timeout as e:
+                if retry_statuses == set() or retries >= self.max_retries:
+                    raise SupabaseError(f"POST {path} timed out: {e}")
+                reason = str(e)
+
+            retries += 1
+            print(f"Supabase POST {path}: {reason} (retry {retries}/{self.max_retries})")
+            time.sleep(RETRY_BACKOFF * 2 ** (retries - 1))
+
+        if not response.ok:
+            raise SupabaseError(
+                f"POST {path} failed: {response.status_code} - {response.text}",
+                status_code=response.status_code,
+            )
+        return response
+
+    def upsert(
+        self,
+        table: str,
+        rows: List[Dict],
+        on_conflict: Optional[str] = None,
+        chunk_size: int = UPSERT_CHUNK_SIZE,
+    ) -> int:
+        """Bulk upsert rows into a table in chunks; returns the number of rows sent
+
+        Stops at the first failed chunk, raising SupabaseError with chunk and rows_sent set.
+        """
+        params = {"on_conflict": on_conflict} if on_conflict else None
+        headers = {"Prefer": "resolution=merge-duplicates,return=minimal"}
+
+        sent = 0
+        for i, chunk in enumerate(chunked(rows, chunk_size)):
+            try:
+                self.post(f"/rest/v1/{table}", chunk, headers=headers, params=params)
+            except SupabaseError as e:
+                e.chunk, e.rows_sent = i + 1, sent
+                raise
+            sent += len(chunk)
+        return sent
+
+    def invoke_function(self, name: str, payload: Dict) -> requests.Response:
+        """Call an edge function (sent uncompressed; since calls may not be idempotent,
+        only retried when the connection could not be established)"""
+        return self.post(f"/functions/v1/{name}", payload, retry_statuses=set(), compress=False)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,257 @@
+"""
+Timezone Handling
+Local-to-UTC conversion for birth times, using cached ZoneInfo objects (historical offsets and DST)
+Includes a vectorized bulk path for converting large batches of birth records
+
+Single record:  to_utc(datetime(1986, 12, 26, 23, 50), "America/Los_Angeles")  -> 1986-12-27 07:50 (naive UTC)
+Bulk:           bulk_to_utc(["1986-12-26T23:50", ...], ["America/Los_Angeles", ...])  -> datetime64[s] array
+
+Naive datetimes without a zone are taken to already be UTC, matching the calculator's convention.
+"""
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from zoneinfo import ZoneInfo
+
+TimezoneLike = Union[str, tzinfo, None]
+
+EPOCH = datetime(1970, 1, 1)
+
+# Spacing of offset probes when locating a zone's transitions (no zone changes offset twice in a week)
+PROBE_STEP_SECONDS = 7 * 86400
+
+# Bulk records this close to a transition are converted one at a time (gaps and repeated hours).
+# Must exceed the largest UTC offset, since offsets are first looked up with wall time as UTC.
+TRANSITION_MARGIN_SECONDS = 86400
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> tzinfo:
+    """Cached ZoneInfo for an IANA name ("UTC" maps to datetime.timezone.utc)"""
+    if name.upper() == "UTC":
+        return timezone.utc
+    return ZoneInfo(name)
+
+
+def resolve_zone(tz: TimezoneLike) -> Optional[tzinfo]:
+    """Accept an IANA zone name, a tzinfo, or None"""
+    if tz is None or isinstance(tz, tzinfo):
+        return tz
+    return get_zone(tz)
+
+
+def to_utc(dt: datetime, tz: TimezoneLike = None) -> datetime:
+    """Convert a local or tz-aware datetime to the naive UTC datetime the calculator expects
+
+    Aware datetimes are converted from their own zone. Naive datetimes are
+    interpreted in tz when given, otherwise returned unchanged (already UTC).
+    Ambiguous or skipped local times resolve like ZoneInfo with fold=0.
+    """
+    if dt.tzinfo is None:
+        zone = resolve_zone(tz)
+        if zone is None:
+            return dt
+        dt = dt.replace(tzinfo=zone)
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_local_datetime(value: str, tz: TimezoneLike = None) -> datetime:
+    """Parse an ISO timestamp (with or without offset) and convert it to naive UTC"""
+    return to_utc(datetime.fromisoformat(value), tz)
+
+
+# ============================================
+# BULK CONVERSION
+# ============================================
+
+def offset_at(zone: tzinfo, utc_seconds: int) -> int:
+    """UTC offset in seconds of a zone at a UTC instant"""
+    return int((EPOCH + timedelta(seconds=utc_seconds)).replace(tzinfo=timezone.utc)
+               .astimezone(zone).utcoffset().total_seconds())
+
+
+@lru_cache(maxsize=4096)
+def year_transitions(zone_name: str, year: int) -> Tuple[int, Tuple[Tuple[int, int], ...]]:
+    """Offset at the start of a UTC year and the (utc_seconds, new_offset) transitions within it"""
+    zone = get_zone(zone_name)
+    start = int((datetime(year, 1, 1) - EPOCH).total_seconds())
+    end = int((datetime(year + 1, 1, 1) - EPOCH).total_seconds())
+
+    transitions = []
+    previous_time, previous_offset = start, offset_at(zone, start)
+    initial_offset = previous_offset
+    probe = start
+    while probe < end:
+        probe = min(probe + PROBE_STEP_SECONDS, end)
+        offset = offset_at(zone, probe)
+        if offset != previous_offset:
+            # Bisect to the first second with the new offset
+            lo, hi = previous_time, probe
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if offset_at(zone, mid) == previous_offset:
+                    lo = mid
+                else:
+                    hi = mid
+            if hi < end:
+                transitions.append((hi, offset))
+        previous_time, previous_offset = probe, offset
+
+    return initial_offset, tuple(transitions)
+
+
+def zone_transition_table(zone_name: str, first_year: int, last_year: int):
+    """Transition instants and offsets covering whole years, as numpy arrays
+
+    Returns (initial_offset, transition_utc_seconds, offsets_after).
+    """
+    import numpy as np
+
+    initial_offset = None
+    times, offsets = [], []
+    for year in range(first_year, last_year + 1):
+        year_offset, transitions = year_transitions(zone_name, year)
+        if initial_offset is None:
+            initial_offset = year_offset
+        for t, offset in transitions:
+            times.append(t)
+            offsets.append(offset)
+    return initial_offset, np.array(times, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+def bulk_to_utc(
+    local_times: Sequence,
+    zones: Union[str, Sequence[str]],
+):
+    """Convert many local wall-clock times to UTC; returns a numpy datetime64[s] array
+
+    local_times: ISO strings, naive datetimes or a datetime64 array (wall-clock time);
+                 ISO strings parse in numpy, datetime objects are converted one by one
+    zones: one IANA name for all records, or one name per record
+
+    Offsets come from per-zone transition tables cached by year, applied with
+    numpy. Records within a day of a transition fall back to exact
+    per-record ZoneInfo conversion so gaps and repeated hours match to_utc.
+    """
+    import numpy as np
+
+    local = np.asarray(local_times, dtype="datetime64[s]").astype(np.int64)
+    result = np.empty_like(local)
+
+    if isinstance(zones, str):
+        zone_names = np.array([zones])
+        inverse = np.zeros(len(local), dtype=np.int64)
+    else:
+        zone_names, inverse = np.unique(np.asarray(zones, dtype=object).astype(str), return_inverse=True)
+
+    for zone_index, zone_name in enumerate(zone_names):
+        idx = np.flatnonzero(inverse == zone_index)
+        if not len(idx):
+            continue
+        wall = local[idx]
+
+        if zone_name.upper() == "UTC":
+            result[idx] = wall
+            continue
+
+        # Pad by a day so local times near New Year see the neighbouring year's transitions
+        first_year = int(str((wall.min() - 86400).astype("datetime64[s]").astype("datetime64[Y]")))
+        last_year = int(str((wall.max() + 86400).astype("datetime64[s]").astype("datetime64[Y]")))
+        initial_offset, times, offsets = zone_transition_table(zone_name, first_year, last_year)
+
+        all_offsets = np.concatenate(([initial_offset], offsets))
+        utc = wall - all_offsets[np.searchsorted(times, wall, side="right")]
+
+        if len(times):
+            # Distance from each record to its nearest transition
+            position = np.searchsorted(times, utc)
+            before = np.abs(utc - times[np.clip(position - 1, 0, len(times) - 1)])
+            after = np.abs(times[np.clip(position, 0, len(times) - 1)] - utc)
+            near = np.flatnonzero(np.minimum(before, after) < TRANSITION_MARGIN_SECONDS)
+            zone = get_zone(zone_name)
+            for i in near:
+                exact = to_utc(EPOCH + timedelta(seconds=int(wall[i])), zone)
+                utc[i] = int((exact - EPOCH).total_seconds())
+
+        result[idx] = utc
+
+    return result.astype("datetime64[s]")
+
+
+def bulk_records_to_utc(
+    records: List[Dict],
+    local_field: str = "birth_local",
+    zone_field: str = "timezone",
+    utc_field: str = "birth_utc",
+) -> List[Dict]:
+    """Fill utc_field (naive UTC ISO) for records that carry a local time and zone
+
+    Records that already have utc_field, or lack a local time, are left as is,
+    as are records with an unknown zone or unparseable time (so callers can
+    report them individually).
+    """
+    pending = [r for r in records if utc_field not in r and r.get(local_field) and r.get(zone_field)]
+    valid_zones = set()
+    for name in {r[zone_field] for r in pending}:
+        try:
+            get_zone(name)
+            valid_zones.add(name)
+        except (ValueError, KeyError):
+            pass
+    pending = [r for r in pending if r[zone_field] in valid_zones]
+    if not pending:
+        return records
+
+    try:
+        converted = bulk_to_utc([r[local_field] for r in pending], [r[zone_field] for r in pending])
+        for record, value in zip(pending, converted.astype(str)):
+            record[utc_field] = value
+    except ValueError:
+        # A malformed timestamp fails the whole array parse; convert one by one instead
+        for record in pending:
+            try:
+                record[utc_field] = parse_local_datetime(record[local_field], record[zone_field]).isoformat()
+            except ValueError:
+                pass
+    return records
+
+
+# ============================================
+# EXAMPLE: Bulk vs per-record conversion
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    zone_names = ["America/Los_Angeles", "America/New_York", "Europe/London", "Asia/Kolkata",
+                  "Australia/Sydney", "America/Sao_Paulo", "Europe/Berlin", "Asia/Tokyo"]
+    rng = random.Random(36)
+    base = datetime(1940, 1, 1)
+    locals_ = [base + timedelta(minutes=rng.randrange(60 * 24 * 365 * 80)) for _ in range(100_000)]
+    iso_strings = [dt.isoformat() for dt in locals_]
+    zones = [rng.choice(zone_names) for _ in locals_]
+
+    print(f"Example: {to_utc(datetime(1986, 12, 26, 23, 50), 'America/Los_Angeles')} UTC "
+          f"(11:50 PM PST, December 26, 1986)")
+
+    start = time.perf_counter()
+    expected = [parse_local_datetime(value, zone) for value, zone in zip(iso_strings, zones)]
+    per_record = time.perf_counter() - start
+
+    year_transitions.cache_clear()
+    start = time.perf_counter()
+    converted = bulk_to_utc(iso_strings, zones)
+    bulk_cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converted = bulk_to_utc(iso_strings, zones)
+    bulk_warm = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(converted.astype(datetime), expected) if a != b)
+    print(f"{len(locals_):,} records across {len(zone_names)} zones")
+    print(f"  per-record parse + to_utc: {per_record * 1000:8.1f} ms")
+    print(f"  bulk_to_utc (cold):        {bulk_cold * 1000:8.1f} ms")
+    print(f"  bulk_to_utc (warm):        {bulk_warm * 1000:8.1f} ms")
+    print(f"  mismatches vs to_utc: {mismatches}")
@@ -0,0 +1,195 @@
+"""
+Transit Alerts over Natal Points
+Finds every subscriber whose natal Moon, Sun or Lagna a transiting planet crosses each day
+
+All subscribers' natal longitudes live in one sorted array (NatalPointIndex). Each day,
+every transiting planet sweeps an arc from its 00:00 UTC position to the next day's;
+the subscribers inside that arc come from a binary search, so a planet's daily alerts
+cost O(log n + k) whatever the size of the base. One ephemeris pass per day serves
+everyone.
+
+Arcs are half-open in the direction of motion ([start, end) direct, (end, start]
+retrograde), so a natal point on a day boundary is alerted once.
+
+Usage:
+    index = NatalPointIndex.from_charts(subscriber_ids, charts)     # get_full_birth_chart outputs
+    alerts = daily_alerts(index, datetime(2026, 1, 19))
+    alerts = alerts_between(index, datetime(2026, 1, 1), datetime(2026, 2, 1))
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from vedic_calculator import (
+    PLANETS,
+    SIGNS,
+    datetime_to_jd,
+    get_sidereal_position,
+)
+
+NATAL_POINTS = ["Moon", "Sun", "Lagna"]
+
+# The Moon crosses every natal point monthly, so it is left out of alerts
+TRANSIT_BODIES = ["Sun", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Rahu", "Ketu"]
+
+
+# ============================================
+# NATAL POINT INDEX
+# ============================================
+
+class NatalPointIndex:
+    """Natal longitudes of every subscriber's natal points, sorted for arc queries"""
+
+    def __init__(self, subscriber_ids: Sequence, point_names: Sequence[str], longitudes: Sequence[float]):
+        """One entry per (subscriber, natal point); the three sequences are parallel"""
+        longitudes = np.mod(np.asarray(longitudes, dtype=np.float64), 360.0)
+        order = np.argsort(longitudes, kind="stable")
+        self.longitudes = longitudes[order]
+        self.subscriber_ids = np.asarray(subscriber_ids, dtype=object)[order]
+        self.point_names = list(dict.fromkeys(point_names))
+        codes = {name: i for i, name in enumerate(self.point_names)}
+        self.points = np.array([codes[name] for name in point_names], dtype=np.int8)[order]
+
+    @classmethod
+    def from_charts(cls, subscriber_ids: Sequence, charts: Sequence[Dict],
+                    points: Sequence[str] = NATAL_POINTS) -> "NatalPointIndex":
+        """Index built from get_full_birth_chart outputs (Lagna is the ascendant)"""
+        ids, names, longitudes = [], [], []
+        for subscriber_id, chart in zip(subscriber_ids, charts):
+            for point in points:
+                ids.append(subscriber_id)
+                names.append(point)
+                longitudes.append(chart["ascendant"]["longitude"] if point == "Lagna"
+                                  else chart["planets"][point]["longitude"])
+        return cls(ids, names, longitudes)
+
+    def __len__(self) -> int:
+        return len(self.longitudes)
+
+    def in_arc(self, start: float, end: float) -> np.ndarray:
+        """Positions of entries in the arc swept from start to end (the shorter way round)
+
+        [start, end) when moving forward, (end, start] when moving backward.
+        """
+        delta = (end - start + 180) % 360 - 180
+        if delta >= 0:
+            lo, hi, side_lo, side_hi = start % 360, (start + delta) % 360, "left", "left"
+        else:
+            lo, hi, side_lo, side_hi = end % 360, start % 360, "right", "right"
+
+        first = np.searchsorted(self.longitudes, lo, side=side_lo)
+        last = np.searchsorted(self.longitudes, hi, side=side_hi)
+        if lo <= hi:
+            return np.arange(first, last)
+        # The arc wraps past 0 degrees
+        return np.concatenate((np.arange(first, len(self.longitudes)), np.arange(0, last)))
+
+
+# ============================================
+# ALERTS
+# ============================================
+
+def transit_longitudes(dt: datetime) -> Dict[str, float]:
+    """Sidereal longitudes of TRANSIT_BODIES at dt (Ketu opposite Rahu)"""
+    jd = datetime_to_jd(dt)
+    longitudes = {body: get_sidereal_position(jd, PLANETS[body]) for body in TRANSIT_BODIES if body != "Ketu"}
+    longitudes["Ketu"] = (longitudes["Rahu"] + 180) % 360
+    return longitudes
+
+
+def alerts_for_arcs(index: NatalPointIndex, day: datetime,
+                    start: Dict[str, float], end: Dict[str, float]) -> List[Dict]:
+    """Alerts for one day given each body's longitude at the day's start and end"""
+    alerts = []
+    for body in TRANSIT_BODIES:
+        hits = index.in_arc(start[body], end[body])
+        if not len(hits):
+            continue
+
+        delta = (end[body] - start[body] + 180) % 360 - 180
+        natal = index.longitudes[hits]
+        # Crossing time by linear interpolation of the day's motion
+        fraction = np.clip(((natal - start[body] + 180) % 360 - 180) / delta, 0, 1) if delta else np.zeros(len(hits))
+        minutes = np.round(fraction * 1440).astype(np.int64)
+
+        for subscriber_id, point, longitude, minute in zip(
+            index.subscriber_ids[hits].tolist(), index.points[hits].tolist(), natal.tolist(), minutes.tolist()
+        ):
+            alerts.append({
+                "subscriber_id": subscriber_id,
+                "planet": body,
+                "natal_point": index.point_names[point],
+                "natal_longitude": round(longitude, 2),
+                "sign": SIGNS[int(longitude // 30)]["vedic"],
+                "retrograde": delta < 0,
+                "time": (day + timedelta(minutes=min(minute, 1439))).strftime("%Y-%m-%dT%H:%M"),
+            })
+    return alerts
+
+
+def daily_alerts(index: NatalPointIndex, day: datetime) -> List[Dict]:
+    """Every crossing of a natal point on the UTC day containing day"""
+    day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+    return alerts_for_arcs(index, day, transit_longitudes(day), transit_longitudes(day + timedelta(days=1)))
+
+
+def alerts_between(index: NatalPointIndex, start: datetime, end: datetime) -> List[Dict]:
+    """Crossings for every UTC day from start up to (not including) end's day"""
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    alerts = []
+    positions = transit_longitudes(day)
+    while day < end:
+        next_day = day + timedelta(days=1)
+        next_positions = transit_longitudes(next_day)
+        alerts.extend(alerts_for_arcs(index, day, positions, next_positions))
+        day, positions = next_day, next_positions
+    return alerts
+
+
+# ============================================
+# EXAMPLE: Real charts checked against brute force, then a large synthetic base
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    import random
+
+    from vedic_calculator import get_full_birth_chart
+
+    rng = random.Random(46)
+    charts = [
+        get_full_birth_chart(datetime(1950, 1, 1) + timedelta(minutes=rng.randrange(60 * 24 * 365 * 55)),
+                             rng.uniform(-50, 60), rng.uniform(-180, 180))
+        for _ in range(500)
+    ]
+    ids = [f"sub-{i}" for i in range(len(charts))]
+    index = NatalPointIndex.from_charts(ids, charts)
+    alerts = alerts_between(index, datetime(2026, 1, 1), datetime(2027, 1, 1))
+
+    # Brute force: every point against every body's daily move
+    expected = 0
+    day = datetime(2026, 1, 1)
+    while day < datetime(2027, 1, 1):
+        start, end = transit_longitudes(day), transit_longitudes(day + timedelta(days=1))
+        for body in TRANSIT_BODIES:
+            delta = (end[body] - start[body] + 180) % 360 - 180
+            for lon in index.longitudes.tolist():
+                offset = (lon - start[body]) % 360 if delta >= 0 else (start[body] - lon) % 360
+                expected += offset < abs(delta)
+        day += timedelta(days=1)
+    print(f"500 subscribers, 2026: {len(alerts):,} alerts (brute force: {expected:,})")
+    for alert in [a for a in alerts if a["subscriber_id"] == "sub-0" and a["planet"] in ("Jupiter", "Saturn", "Rahu")]:
+        print(f"  {alert['time']}  {alert['planet']} over natal {alert['natal_point']} in {alert['sign']}")
+
+    # 1M subscribers (3M natal points), one day
+    n = 1_000_000
+    synthetic = NatalPointIndex(
+        np.repeat(np.arange(n), 3),
+        NATAL_POINTS * n,
+        np.random.default_rng(46).uniform(0, 360, 3 * n),
+    )
+    start = time.perf_counter()
+    day_alerts = daily_alerts(synthetic, datetime(2026, 1, 19))
+    print(f"\n{n:,} subscribers, one day: {len(day_alerts):,} alerts in {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -0,0 +1,192 @@
+"""
+Divisional Charts (Vargas)
+D2, D3, D7, D9, D10, D12, D30 and D60 placements for the grahas and lagna (Parashari rules)
+
+Works on arrays of sidereal longitudes, so any number of charts is placed in one
+numpy pass per division. varga_sign() is the scalar version for single lookups.
+
+Usage:
+    charts = [get_full_birth_chart(...), ...]
+    longitudes = chart_longitudes(charts)          # (n_charts, 10): 9 grahas + Lagna
+    signs = compute_vargas(longitudes)             # {"D9": int array (n_charts, 10), ...}
+    report = varga_chart(charts[0])                # {"D9": {"Sun": {"index", "vedic", "western"}, ...}, ...}
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from vedic_calculator import SIGNS
+
+VARGA_DIVISIONS = [2, 3, 7, 9, 10, 12, 30, 60]
+
+BODIES = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu", "Lagna"]
+
+# Trimsamsa (D30): degree boundaries within the sign and the sign each part maps to
+# Odd signs: Mars 0-5 (Aries), Saturn 5-10 (Aquarius), Jupiter 10-18 (Sagittarius),
+#            Mercury 18-25 (Gemini), Venus 25-30 (Libra)
+# Even signs: Venus 0-5 (Taurus), Mercury 5-12 (Virgo), Jupiter 12-20 (Pisces),
+#             Saturn 20-25 (Capricorn), Mars 25-30 (Scorpio)
+TRIMSAMSA_ODD_BOUNDS = np.array([5.0, 10.0, 18.0, 25.0])
+TRIMSAMSA_ODD_SIGNS = np.array([0, 10, 8, 2, 6])
+TRIMSAMSA_EVEN_BOUNDS = np.array([5.0, 12.0, 20.0, 25.0])
+TRIMSAMSA_EVEN_SIGNS = np.array([1, 5, 11, 9, 7])
+
+LEO = 4
+CANCER = 3
+
+
+def split_longitudes(longitudes):
+    """Normalized longitudes with their D1 sign index, degree in sign and odd-sign mask"""
+    lon = np.mod(np.asarray(longitudes, dtype=np.float64), 360.0)
+    sign = (lon // 30).astype(np.int64)
+    degree = lon - sign * 30
+    odd = sign % 2 == 0  # Aries (index 0) is an odd sign
+    return lon, sign, degree, odd
+
+
+def varga_signs(longitudes, division: int, split=None) -> np.ndarray:
+    """Sign indices (0 = Aries) in divisional chart D<division> for an array of longitudes
+
+    Pass split (from split_longitudes) to reuse the D1 breakdown across divisions.
+    """
+    lon, sign, degree, odd = split if split is not None else split_longitudes(longitudes)
+
+    if division == 2:
+        # Hora: odd signs Sun (Leo) then Moon (Cancer); even signs the reverse
+        return np.where(odd != (degree >= 15), LEO, CANCER)
+    if division == 3:
+        # Drekkana: same sign, 5th, 9th
+        return (sign + 4 * (degree // 10).astype(np.int64)) % 12
+    if division == 7:
+        # Saptamsa: odd signs count from the sign, even signs from the 7th
+        part = np.minimum((degree * 7 / 30).astype(np.int64), 6)
+        return (np.where(odd, sign, sign + 6) + part) % 12
+    if division == 9:
+        # Navamsa: continuous 3°20' parts from Aries (movable/fixed/dual starts fall out of this)
+        return np.minimum((lon * 9 / 30).astype(np.int64), 107) % 12
+    if division == 10:
+        # Dasamsa: odd signs count from the sign, even signs from the 9th
+        part = np.minimum((degree / 3).astype(np.int64), 9)
+        return (np.where(odd, sign, sign + 8) + part) % 12
+    if division == 12:
+        # Dwadasamsa: count from the sign
+        return (sign + np.minimum((degree / 2.5).astype(np.int64), 11)) % 12
+    if division == 30:
+        odd_part = TRIMSAMSA_ODD_SIGNS[np.searchsorted(TRIMSAMSA_ODD_BOUNDS, degree, side="right")]
+        even_part = TRIMSAMSA_EVEN_SIGNS[np.searchsorted(TRIMSAMSA_EVEN_BOUNDS, degree, side="right")]
+        return np.where(odd, odd_part, even_part)
+    if division == 60:
+        # Shashtiamsa: 30' parts counted from the sign
+        return (sign + np.minimum((degree * 2).astype(np.int64), 59)) % 12
+
+    raise ValueError(f"Unsupported division D{division}; expected one of {VARGA_DIVISIONS}")
+
+
+def varga_sign(longitude: float, division: int) -> int:
+    """Scalar varga sign index for one longitude (same rules as varga_signs)"""
+    lon = longitude % 360
+    sign = int(lon // 30)
+    degree = lon - sign * 30
+    odd = sign % 2 == 0
+
+    if division == 2:
+        return LEO if odd != (degree >= 15) else CANCER
+    if division == 3:
+        return (sign + 4 * int(degree // 10)) % 12
+    if division == 7:
+        return ((sign if odd else sign + 6) + min(int(degree * 7 / 30), 6)) % 12
+    if division == 9:
+        return min(int(lon * 9 / 30), 107) % 12
+    if division == 10:
+        return ((sign if odd else sign + 8) + min(int(degree / 3), 9)) % 12
+    if division == 12:
+        return (sign + min(int(degree / 2.5), 11)) % 12
+    if division == 30:
+        bounds, signs = ((TRIMSAMSA_ODD_BOUNDS, TRIMSAMSA_ODD_SIGNS) if odd
+                         else (TRIMSAMSA_EVEN_BOUNDS, TRIMSAMSA_EVEN_SIGNS))
+        return int(signs[sum(1 for bound in bounds if degree >= bound)])
+    if division == 60:
+        return (sign + min(int(degree * 2), 59)) % 12
+
+    raise ValueError(f"Unsupported division D{division}; expected one of {VARGA_DIVISIONS}")
+
+
+def compute_vargas(longitudes, divisions: Sequence[int] = VARGA_DIVISIONS) -> Dict[str, np.ndarray]:
+    """Varga sign indices for every division, keyed "D2", "D3", ...; each has longitudes' shape"""
+    split = split_longitudes(longitudes)
+    return {f"D{division}": varga_signs(None, division, split) for division in divisions}
+
+
+def chart_longitudes(charts: List[Dict]) -> np.ndarray:
+    """(n_charts, 10) longitudes in BODIES order from get_full_birth_chart outputs"""
+    return np.array(
+        [[chart["planets"][body]["longitude"] for body in BODIES[:-1]] + [chart["ascendant"]["longitude"]]
+         for chart in charts],
+        dtype=np.float64,
+    )
+
+
+def sign_entry(index: int) -> Dict:
+    sign = SIGNS[index]
+    return {"index": index, "vedic": sign["vedic"], "western": sign["western"]}
+
+
+def varga_chart(chart: Dict, divisions: Sequence[int] = VARGA_DIVISIONS) -> Dict:
+    """Varga placements for one chart as nested dicts: {"D9": {"Sun": {...sign}, ...}, ...}"""
+    signs = compute_vargas(chart_longitudes([chart])[0], divisions)
+    return {
+        name: {body: sign_entry(int(index)) for body, index in zip(BODIES, row)}
+        for name, row in signs.items()
+    }
+
+
+def varga_charts(charts: List[Dict], divisions: Sequence[int] = VARGA_DIVISIONS) -> List[Dict]:
+    """varga_chart for many charts, computed in one vectorized pass"""
+    signs = compute_vargas(chart_longitudes(charts), divisions)
+    entries = [sign_entry(i) for i in range(12)]
+    return [
+        {name: {body: dict(entries[index]) for body, index in zip(BODIES, rows[n].tolist())}
+         for name, rows in signs.items()}
+        for n in range(len(charts))
+    ]
+
+
+# ============================================
+# EXAMPLE: Navamsa for the sample chart, and vectorized vs per-planet timing
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    import random
+    from datetime import datetime
+
+    from vedic_calculator import get_full_birth_chart
+
+    chart = get_full_birth_chart(datetime(1986, 12, 27, 7, 50), 33.7879, -117.8531)
+    vargas = varga_chart(chart)
+    print("D9 (Navamsa), December 26, 1986, 11:50 PM PST, Orange, California")
+    for body, sign in vargas["D9"].items():
+        print(f"  {body:<8} {sign['vedic']} ({sign['western']})")
+
+    rng = random.Random(39)
+    n = 100_000
+    longitudes = np.array([[rng.uniform(0, 360) for _ in BODIES] for _ in range(n)])
+
+    start = time.perf_counter()
+    vectorized = compute_vargas(longitudes)
+    vector_time = time.perf_counter() - start
+
+    sample = longitudes[:10_000]
+    start = time.perf_counter()
+    looped = {
+        f"D{d}": [[varga_sign(lon, d) for lon in row] for row in sample.tolist()]
+        for d in VARGA_DIVISIONS
+    }
+    loop_time = (time.perf_counter() - start) * n / len(sample)
+
+    assert all((vectorized[name][:len(sample)] == np.array(rows)).all() for name, rows in looped.items())
+    placements = n * len(BODIES) * len(VARGA_DIVISIONS)
+    print(f"\n{n:,} charts x {len(BODIES)} bodies x {len(VARGA_DIVISIONS)} vargas = {placements:,} placements")
+    print(f"  vectorized:       {vector_time * 1000:8.1f} ms")
+    print(f"  per-planet loop:  {loop_time * 1000:8.1f} ms (extrapolated from {len(sample):,} charts)")
@@ -3,10 +3,13 @@ Vedic Astrology Calculator using Swiss Ephemeris
 Core functions for planetary positions, Moon sign, nakshatra, and dasha calculations
 """
 
+import os
+import sys
 import swisseph as swe
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import math
+from timezones import TimezoneLike, get_zone, to_utc
 
 # Initialize Swiss Ephemeris
 swe.set_ephe_path(None)  # Use built-in ephemeris
@@ -91,7 +94,9 @@ PLANETS = {
 
 
 def datetime_to_jd(dt: datetime) -> float:
-    """Convert datetime to Julian Day"""
+    """Convert datetime to Julian Day (naive datetimes are UTC, aware ones are converted)"""
+    if dt.tzinfo is not None:
+        dt = to_utc(dt)
     return swe.julday(dt.year, dt.month, dt.day,
                       dt.hour + dt.minute/60.0 + dt.second/3600.0)
 
@@ -220,6 +225,7 @@ def calculate_dasha(moon_longitude: float, birth_dt: datetime, target_dt: dateti
     """
     if target_dt is None:
         target_dt = datetime.now()
+    birth_dt, target_dt = to_utc(birth_dt), to_utc(target_dt)
 
     # Get birth nakshatra
     nakshatra = get_nakshatra_from_longitude(moon_longitude)
@@ -321,9 +327,15 @@ def get_full_birth_chart(
     birth_dt: datetime,
     latitude: float,
     longitude: float,
-    target_dt: datetime = None
+    target_dt: datetime = None,
+    tz: TimezoneLike = None,
 ) -> Dict:
-    """Generate a complete Vedic birth chart"""
+    """Generate a complete Vedic birth chart
+
+    birth_dt may be naive UTC, tz-aware, or naive local time in tz (an IANA
+    zone name such as "America/Los_Angeles"). birth_time is reported in UTC.
+    """
+    birth_dt = to_utc(birth_dt, tz)
 
     positions = get_all_planetary_positions(birth_dt)
     ascendant = calculate_ascendant(birth_dt, latitude, longitude)
@@ -344,14 +356,22 @@ def get_full_birth_chart(
     }
 
 
-def get_weekly_transits(start_date: datetime, days: int = 7) -> Dict:
-    """Get planetary transits for a week"""
+def get_weekly_transits(start_date: datetime, days: int = 7, location: Tuple[float, float] = None) -> Dict:
+    """Get planetary transits for a week
+
+    Positions are taken at noon UTC, or at each day's sunrise at location
+    (latitude, longitude) when given, the start of the Vedic day there.
+    """
     transits = []
 
     for day in range(days):
         current_date = start_date + timedelta(days=day)
-        # Get positions at noon
-        dt = current_date.replace(hour=12, minute=0, second=0)
+        if location:
+            from sunrise import sun_times
+            dt = sun_times(location[0], location[1], current_date)["sunrise"]
+        else:
+            # Get positions at noon
+            dt = current_date.replace(hour=12, minute=0, second=0)
         positions = get_all_planetary_positions(dt)
 
         transits.append({
@@ -371,27 +391,20 @@ def get_weekly_transits(start_date: datetime, days: int = 7) -> Dict:
     }
 
 
+# Opt-in profiling (COSMICBRIEF_PROFILE=flat|folded), see profiling.py
+if os.environ.get("COSMICBRIEF_PROFILE"):
+    import profiling
+    profiling.enable_from_env(sys.modules[__name__])
+
+
 # ============================================
 # TEST: Run with your birth details
 # ============================================
 
 if __name__ == "__main__":
     # Example: December 26, 1986, 11:50 PM PST, Orange, California
-    # IMPORTANT: Swiss Ephemeris expects UTC time
-    # PST is UTC-8, so 11:50 PM PST = 7:50 AM UTC next day
-
-    # Local birth time
-    local_hour = 23  # 11:50 PM
-    local_minute = 50
-
-    # Convert to UTC (add 8 hours for PST)
-    utc_hour = local_hour + 8
-    utc_day = 26
-    if utc_hour >= 24:
-        utc_hour -= 24
-        utc_day += 1  # Next day
-
-    birth_datetime = datetime(1986, 12, utc_day, utc_hour, local_minute, 0)  # UTC time
+    # Local time in its IANA zone; converted to UTC (7:50 AM next day) for Swiss Ephemeris
+    birth_datetime = datetime(1986, 12, 26, 23, 50, tzinfo=get_zone("America/Los_Angeles"))
 
     # Orange, California coordinates
     lat = 33.7879
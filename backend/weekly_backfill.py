@@ -0,0 +1,321 @@
+"""
+Weekly Content Backfill
+Generates weekly content for a range of weeks in one job: archive pages and weeks ahead
+
+Transit analysis is CPU-bound Swiss Ephemeris work, so weeks are analyzed in a process
+pool. Every week's prompts then go through one asyncio LLM queue: QUEUE_CONCURRENCY
+calls in flight, REQUESTS_PER_MINUTE across the whole job, and earlier weeks served
+first, so weeks finish roughly in order. As soon as a week's last item comes back its
+content file is written (and uploaded) while later weeks are still generating.
+
+Each week keeps its own content log, so rerunning an interrupted backfill resumes it
+without regenerating finished items.
+
+Usage:
+    python cosmicbrief.py backfill --from 2025-01-06 --to 2026-03-30 --upload
+    results, metrics = run_backfill(week_starts(datetime(2025, 1, 6), datetime(2026, 3, 30)))
+"""
+
+import os
+import time
+import asyncio
+import itertools
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from content_log import ContentLog, log_filename_for
+from generation_metrics import RunMetrics, save_run_report
+from weekly_horoscope_api import (
+    BATCH_TOKENS_OVERHEAD,
+    BATCH_TOKENS_PER_NAKSHATRA,
+    MODEL,
+    call_claude_async,
+    parse_snippet_batch,
+    save_content_to_file,
+    upload_to_supabase,
+)
+
+# LLM calls in flight at once, and the request rate for the whole backfill
+QUEUE_CONCURRENCY = 8
+REQUESTS_PER_MINUTE = 300
+
+
+def week_starts(first: datetime, last: datetime) -> List[datetime]:
+    """Mondays of every week from the one containing first to the one containing last"""
+    monday = datetime(first.year, first.month, first.day) - timedelta(days=first.weekday())
+    starts = []
+    while monday <= last:
+        starts.append(monday)
+        monday += timedelta(days=7)
+    return starts
+
+
+def prompt_calls(prompts: Dict) -> int:
+    """LLM calls a fresh week needs (overview, 12 signs, nakshatras single or batched)"""
+    return 1 + len(prompts["moon_signs"]) + len(prompts.get("nakshatra_batches") or prompts["nakshatras"])
+
+
+# ============================================
+# TRANSIT ANALYSIS (process pool)
+# ============================================
+
+def warm_event_calendar(starts: List[datetime]) -> None:
+    """Build the eclipse/lunation disk cache up front so pool workers only read it"""
+    from event_calendar import load_year_events
+    for year in range(starts[0].year - 1, starts[-1].year + 2):
+        load_year_events(year)
+
+
+def analyze_weeks(starts: List[datetime], workers: Optional[int] = None) -> List[Dict]:
+    """generate_weekly_analysis for every week start, in a process pool"""
+    from weekly_transit_analyzer import generate_weekly_analysis
+
+    warm_event_calendar(starts)
+    if workers == 1 or len(starts) <= 1:
+        return [generate_weekly_analysis(start) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(generate_weekly_analysis, starts))
+
+
+# ============================================
+# LLM QUEUE
+# ============================================
+
+class RateLimiter:
+    """Spaces call starts at least 60 / requests_per_minute seconds apart"""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60 / requests_per_minute
+        self.next_time = 0.0
+
+    async def wait(self) -> None:
+        now = asyncio.get_running_loop().time()
+        delay = self.next_time - now
+        self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class LLMQueue:
+    """One prioritized, rate-limited queue for every LLM call in a backfill
+
+    submit() returns a future for the response text. Lower priorities are served
+    first (the backfill uses the week's position), ties in submission order.
+    """
+
+    def __init__(self, concurrency: int = QUEUE_CONCURRENCY, requests_per_minute: float = REQUESTS_PER_MINUTE):
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(requests_per_minute)
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.order = itertools.count()
+        self.workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    def submit(
+        self,
+        priority: int,
+        prompt: str,
+        max_tokens: int,
+        component: str,
+        metrics: Optional[RunMetrics] = None,
+    ) -> "asyncio.Future[str]":
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((priority, next(self.order), future, (prompt, max_tokens, component, metrics)))
+        return future
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, future, args = await self.queue.get()
+            try:
+                # Retries wait on the limiter too, so they count against the request rate
+                future.set_result(await call_claude_async(*args, wait=self.limiter.wait))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def close(self) -> None:
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+
+# ============================================
+# PER-WEEK GENERATION
+# ============================================
+
+async def generate_week(
+    weekly_data: Dict,
+    queue: LLMQueue,
+    priority: int,
+    metrics: RunMetrics,
+    nakshatra_grouping: Optional[str] = None,
+    out_dir: str = ".",
+    upload: bool = False,
+    upload_components: bool = False,
+) -> Dict:
+    """Generate, save and optionally upload one week's content through the shared queue"""
+    from weekly_horoscope_generator import generate_all_prompts, DASHA_CONTEXT_TEMPLATES
+
+    week = weekly_data["week_start"]
+    prompts = generate_all_prompts(weekly_data, nakshatra_grouping)
+
+    with ContentLog(os.path.join(out_dir, log_filename_for(week)), week, weekly_data["week_end"]) as log:
+
+        async def item(prompt: str, max_tokens: int, section: str, key: Optional[str], component: str) -> str:
+            logged = log.get(section, key)
+            if logged is not None:
+                return logged
+            text = await queue.submit(priority, prompt, max_tokens, component, metrics)
+            log.append(section, key, text)
+            return text
+
+        async def master_overview() -> None:
+            await item(prompts["master_overview"], 400, "master_overview", None, "master_overview")
+            log.complete_section("master_overview")
+
+        async def moon_signs() -> None:
+            await asyncio.gather(*(
+                item(prompt, 250, "moon_signs", sign, f"moon_sign:{sign}")
+                for sign, prompt in prompts["moon_signs"].items()
+            ))
+            log.complete_section("moon_signs")
+
+        async def batch(key: str, names: List[str], prompt: str) -> None:
+            missing = [name for name in names if log.get("nakshatras", name) is None]
+            if not missing:
+                return
+            text = await queue.submit(
+                priority, prompt,
+                BATCH_TOKENS_PER_NAKSHATRA * len(names) + BATCH_TOKENS_OVERHEAD,
+                f"nakshatra_batch:{key}", metrics,
+            )
+            for name, snippet in parse_snippet_batch(text, missing).items():
+                log.append("nakshatras", name, snippet)
+
+        async def nakshatras() -> None:
+            batches = prompts.get("nakshatra_batches") or {}
+            await asyncio.gather(*(batch(key, b["nakshatras"], b["prompt"]) for key, b in batches.items()))
+            # Singles for everything not batched, or missing from a batch response
+            await asyncio.gather(*(
+                item(prompt, 100, "nakshatras", name, f"nakshatra:{name}")
+                for name, prompt in prompts["nakshatras"].items()
+            ))
+            log.complete_section("nakshatras")
+
+        await asyncio.gather(master_overview(), moon_signs(), nakshatras())
+        log.complete()
+        content = log.build_content()
+
+    content["dasha_contexts"] = DASHA_CONTEXT_TEMPLATES  # Pre-written, no API call
+    metrics.finish()
+
+    filename = save_content_to_file(content, os.path.join(out_dir, f"weekly_horoscope_{week}.json"))
+    save_run_report(metrics, filename)
+
+    uploaded = None
+    if upload:
+        uploaded = await asyncio.to_thread(upload_to_supabase, content, components=upload_components)
+
+    totals = metrics.summarize(metrics.calls)
+    print(f"Week {week} done: {totals['calls']} calls, {totals['errors']} errors, "
+          f"${totals['cost_usd']:.4f} -> {filename}")
+    return {
+        "week_start": week,
+        "file": filename,
+        "calls": totals["calls"],
+        "errors": totals["errors"],
+        "uploaded": uploaded,
+    }
+
+
+# ============================================
+# BACKFILL
+# ============================================
+
+async def backfill(
+    starts: List[datetime],
+    nakshatra_grouping: Optional[str] = None,
+    out_dir: str = ".",
+    upload: bool = False,
+    upload_components: bool = False,
+    workers: Optional[int] = None,
+    concurrency: int = QUEUE_CONCURRENCY,
+    requests_per_minute: float = REQUESTS_PER_MINUTE,
+) -> Tuple[List[Dict], RunMetrics]:
+    """Analyze every week in a process pool and generate them all through one LLM queue
+
+    Each week starts generating as soon as its analysis returns. Returns one result per
+    week (in week order) and RunMetrics holding every call of the run.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    warm_event_calendar(starts)
+
+    from weekly_transit_analyzer import generate_weekly_analysis
+
+    loop = asyncio.get_running_loop()
+    queue = LLMQueue(concurrency, requests_per_minute)
+    queue.start()
+    week_metrics = [RunMetrics(MODEL) for _ in starts]
+
+    async def run_week(i: int, start: datetime, pool: ProcessPoolExecutor) -> Dict:
+        weekly_data = await loop.run_in_executor(pool, generate_weekly_analysis, start)
+        return await generate_week(
+            weekly_data, queue, i, week_metrics[i], nakshatra_grouping,
+            out_dir, upload, upload_components,
+        )
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = await asyncio.gather(*(run_week(i, start, pool) for i, start in enumerate(starts)))
+    finally:
+        await queue.close()
+
+    metrics = RunMetrics(MODEL)
+    metrics.start_time = min(m.start_time for m in week_metrics)
+    for m in week_metrics:
+        metrics.calls.extend(m.calls)
+    metrics.finish()
+    return list(results), metrics
+
+
+def run_backfill(starts: List[datetime], **kwargs) -> Tuple[List[Dict], RunMetrics]:
+    """Synchronous entry point for backfill()"""
+    return asyncio.run(backfill(starts, **kwargs))
+
+
+def plan_backfill(
+    starts: List[datetime],
+    nakshatra_grouping: Optional[str] = None,
+    workers: Optional[int] = None,
+    requests_per_minute: float = REQUESTS_PER_MINUTE,
+) -> Dict:
+    """Dry run: analyze and build prompts for every week, without calling the API"""
+    from weekly_horoscope_generator import generate_all_prompts
+
+    start = time.time()
+    analyses = analyze_weeks(starts, workers)
+    analysis_seconds = time.time() - start
+
+    calls = sum(prompt_calls(generate_all_prompts(weekly_data, nakshatra_grouping)) for weekly_data in analyses)
+    return {
+        "weeks": [w["week_start"] for w in analyses],
+        "analysis_seconds": round(analysis_seconds, 2),
+        "calls": calls,
+        "minimum_minutes": round(calls / requests_per_minute, 1),
+    }
+
+
+# ============================================
+# EXAMPLE: Dry run for a quarter of archive weeks
+# ============================================
+
+if __name__ == "__main__":
+    starts = week_starts(datetime(2025, 10, 1), datetime(2025, 12, 31))
+    plan = plan_backfill(starts, nakshatra_grouping="lord")
+    print(f"{len(plan['weeks'])} weeks ({plan['weeks'][0]} to {plan['weeks'][-1]})")
+    print(f"Transit analysis in a process pool: {plan['analysis_seconds']} s")
+    print(f"LLM calls: {plan['calls']} (at least {plan['minimum_minutes']} min at {REQUESTS_PER_MINUTE}/min)")
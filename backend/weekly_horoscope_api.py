@@ -2,24 +2,29 @@
 Weekly Horoscope API Caller
 Sends prompts to Claude Haiku API and generates horoscope content
 Optionally uploads to Supabase for distribution via email
+
+The Anthropic SDK, requests, the transit analyzer and the prompt generator are
+imported on first use, so importing this module (e.g. for
+assemble_personalized_horoscope) stays cheap.
 """
 
 import os
 import json
 import time
-import requests
-from datetime import datetime
-from typing import Dict, List, Optional
-from anthropic import Anthropic
-from weekly_transit_analyzer import generate_weekly_analysis, SIGNS, NAKSHATRAS
-from weekly_horoscope_generator import (
-    generate_all_prompts,
-    DASHA_CONTEXT_TEMPLATES,
-)
-
-# Initialize Anthropic client
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional
+from content_log import ContentLog, log_filename_for
+from generation_metrics import RunMetrics, save_run_report, write_prometheus_textfile
+
+if TYPE_CHECKING:
+    from supabase_client import SupabaseClient
+
+# Anthropic client, created on first use by get_client()
 # Expects ANTHROPIC_API_KEY environment variable
-client = Anthropic()
+# Retries are handled in call_claude so they can be counted per call
+client = None
+
+# AsyncAnthropic client for the backfill queue, created on first use by get_async_client()
+async_client = None
 
 # Model to use - Haiku 4.5 for cost efficiency
 MODEL = "claude-haiku-4-5-20251001"
@@ -27,147 +32,483 @@ MODEL = "claude-haiku-4-5-20251001"
 # Rate limiting - be nice to the API
 DELAY_BETWEEN_CALLS = 0.5  # seconds
 
+# Output token budget per nakshatra in a batched call (plus fixed JSON overhead)
+BATCH_TOKENS_PER_NAKSHATRA = 120
+BATCH_TOKENS_OVERHEAD = 100
+
+# Retry failed calls with exponential backoff
+MAX_RETRIES = 2
+RETRY_BACKOFF = 2.0  # seconds, doubled on each retry
+
+
+def get_client():
+    """Return the shared Anthropic client, importing the SDK on first use"""
+    global client
+    if client is None:
+        from anthropic import Anthropic
+        client = Anthropic(max_retries=0)
+    return client
+
+
+def get_async_client():
+    """Return the shared AsyncAnthropic client, importing the SDK on first use"""
+    global async_client
+    if async_client is None:
+        from anthropic import AsyncAnthropic
+        async_client = AsyncAnthropic(max_retries=0)
+    return async_client
+
+
+def request_kwargs(prompt: str, max_tokens: int) -> Dict:
+    """messages.create arguments for a single-prompt call"""
+    return {
+        "model": MODEL,
+        "max_tokens": max_tokens,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+    }
 
-def call_claude(prompt: str, max_tokens: int = 300) -> str:
-    """Call Claude API with a prompt and return the response"""
-    try:
-        response = client.messages.create(
-            model=MODEL,
+
+def retry_delay(error: Exception, retries: int) -> Optional[float]:
+    """Seconds to wait before retrying after retries failed retries, or None when out of retries"""
+    if retries >= MAX_RETRIES:
+        print(f"API Error: {error}")
+        return None
+    print(f"API Error: {error} (retry {retries + 1}/{MAX_RETRIES})")
+    return RETRY_BACKOFF * 2 ** retries
+
+
+def failed_call(
+    error: Exception,
+    component: str,
+    start: float,
+    retries: int,
+    max_tokens: int,
+    metrics: Optional[RunMetrics],
+) -> str:
+    """Record a call that failed after retries; returns the placeholder content"""
+    if metrics is not None:
+        metrics.record(
+            component,
+            time.time() - start,
+            retries=retries,
             max_tokens=max_tokens,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+            error=str(error),
         )
-        return response.content[0].text
-    except Exception as e:
-        print(f"API Error: {e}")
-        return f"[Error generating content: {e}]"
+    return f"[Error generating content: {error}]"
+
+
+def finished_call(
+    response,
+    component: str,
+    start: float,
+    retries: int,
+    max_tokens: int,
+    metrics: Optional[RunMetrics],
+) -> str:
+    """Record a successful call, warn if it was truncated; returns the response text"""
+    if metrics is not None:
+        metrics.record(
+            component,
+            time.time() - start,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            stop_reason=response.stop_reason,
+            retries=retries,
+            max_tokens=max_tokens,
+        )
+    if response.stop_reason == "max_tokens":
+        print(f"Warning: {component} response truncated at max_tokens={max_tokens}")
+
+    return response.content[0].text
+
+
+def call_claude(
+    prompt: str,
+    max_tokens: int = 300,
+    component: str = "unknown",
+    metrics: Optional[RunMetrics] = None,
+) -> str:
+    """Call Claude API with a prompt and return the response
+
+    If metrics is given, latency, token usage, stop reason and retry count
+    for the call are recorded under the component name.
+    """
+    retries = 0
+    start = time.time()
+
+    while True:
+        try:
+            response = get_client().messages.create(**request_kwargs(prompt, max_tokens))
+            break
+        except Exception as e:
+            delay = retry_delay(e, retries)
+            if delay is None:
+                return failed_call(e, component, start, retries, max_tokens, metrics)
+            retries += 1
+            time.sleep(delay)
+
+    return finished_call(response, component, start, retries, max_tokens, metrics)
+
+
+async def call_claude_async(
+    prompt: str,
+    max_tokens: int = 300,
+    component: str = "unknown",
+    metrics: Optional[RunMetrics] = None,
+    wait: Optional[Callable[[], Awaitable[None]]] = None,
+) -> str:
+    """call_claude for asyncio callers (same retries, metrics and error text)
+
+    wait, if given, is awaited before every attempt including retries, e.g. a
+    rate limiter's wait() so retries count against the request rate.
+    """
+    import asyncio
+
+    retries = 0
+    start = time.time()
+
+    while True:
+        try:
+            if wait is not None:
+                await wait()
+            response = await get_async_client().messages.create(**request_kwargs(prompt, max_tokens))
+            break
+        except Exception as e:
+            delay = retry_delay(e, retries)
+            if delay is None:
+                return failed_call(e, component, start, retries, max_tokens, metrics)
+            retries += 1
+            await asyncio.sleep(delay)
+
+    return finished_call(response, component, start, retries, max_tokens, metrics)
+
+
+def generate_item(
+    prompt: str,
+    max_tokens: int,
+    section: str,
+    key: Optional[str],
+    component: str,
+    metrics: Optional[RunMetrics] = None,
+    log: Optional[ContentLog] = None,
+) -> str:
+    """Generate one content item, reusing it from the log if already generated"""
+    if log is not None:
+        logged = log.get(section, key)
+        if logged is not None:
+            print(f"  (using logged {component})")
+            return logged
+
+    text = call_claude(prompt, max_tokens=max_tokens, component=component, metrics=metrics)
+    if log is not None:
+        log.append(section, key, text)
+    time.sleep(DELAY_BETWEEN_CALLS)
+    return text
 
 
-def generate_master_overview(prompts: Dict) -> str:
+def generate_master_overview(
+    prompts: Dict,
+    metrics: Optional[RunMetrics] = None,
+    log: Optional[ContentLog] = None,
+) -> str:
     """Generate the master weekly overview"""
     print("Generating master overview...")
-    content = call_claude(prompts["master_overview"], max_tokens=400)
-    time.sleep(DELAY_BETWEEN_CALLS)
+    content = generate_item(
+        prompts["master_overview"], 400, "master_overview", None,
+        "master_overview", metrics, log,
+    )
+    if log is not None:
+        log.complete_section("master_overview")
     return content
 
 
-def generate_moon_sign_horoscopes(prompts: Dict) -> Dict[str, str]:
+def generate_moon_sign_horoscopes(
+    prompts: Dict,
+    metrics: Optional[RunMetrics] = None,
+    log: Optional[ContentLog] = None,
+) -> Dict[str, str]:
     """Generate horoscopes for all 12 Moon signs"""
     horoscopes = {}
 
     for i, (sign, prompt) in enumerate(prompts["moon_signs"].items()):
         print(f"Generating {sign} horoscope... ({i+1}/12)")
-        horoscopes[sign] = call_claude(prompt, max_tokens=250)
-        time.sleep(DELAY_BETWEEN_CALLS)
+        horoscopes[sign] = generate_item(
+            prompt, 250, "moon_signs", sign,
+            f"moon_sign:{sign}", metrics, log,
+        )
 
+    if log is not None:
+        log.complete_section("moon_signs")
     return horoscopes
 
 
-def generate_nakshatra_snippets(prompts: Dict) -> Dict[str, str]:
-    """Generate snippets for all 27 nakshatras"""
-    snippets = {}
+def parse_snippet_batch(text: str, expected: List[str]) -> Dict[str, str]:
+    """Parse a batched JSON response, keeping only expected keys with non-empty text
+
+    Tolerates markdown fences or stray text around the JSON object. Returns an
+    empty dict if no valid object is found.
+    """
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    return {
+        name: data[name].strip()
+        for name in expected
+        if isinstance(data.get(name), str) and data[name].strip()
+    }
 
-    for i, (nakshatra, prompt) in enumerate(prompts["nakshatras"].items()):
-        print(f"Generating {nakshatra} snippet... ({i+1}/27)")
-        snippets[nakshatra] = call_claude(prompt, max_tokens=100)
+
+def generate_batched_nakshatra_snippets(
+    prompts: Dict,
+    metrics: Optional[RunMetrics] = None,
+    log: Optional[ContentLog] = None,
+) -> Dict[str, str]:
+    """Generate nakshatra snippets with multi-output calls from prompts["nakshatra_batches"]
+
+    Any nakshatra missing or invalid in a batch response falls back to its single prompt.
+    """
+    snippets = {}
+    batches = prompts["nakshatra_batches"]
+
+    for i, (key, batch) in enumerate(batches.items()):
+        names = batch["nakshatras"]
+        if log is not None:
+            logged = {name: log.get("nakshatras", name) for name in names}
+            snippets.update({name: text for name, text in logged.items() if text is not None})
+            names = [name for name in names if logged[name] is None]
+            if not names:
+                continue
+
+        print(f"Generating {len(names)} nakshatra snippets for {key}... ({i+1}/{len(batches)})")
+        text = call_claude(
+            batch["prompt"],
+            max_tokens=BATCH_TOKENS_PER_NAKSHATRA * len(batch["nakshatras"]) + BATCH_TOKENS_OVERHEAD,
+            component=f"nakshatra_batch:{key}", metrics=metrics,
+        )
+        parsed = parse_snippet_batch(text, names)
+        if log is not None:
+            for name, snippet in parsed.items():
+                log.append("nakshatras", name, snippet)
+        snippets.update(parsed)
         time.sleep(DELAY_BETWEEN_CALLS)
 
+    missing = [name for name in prompts["nakshatras"] if name not in snippets]
+    for i, nakshatra in enumerate(missing):
+        print(f"Falling back to single call for {nakshatra}... ({i+1}/{len(missing)})")
+        snippets[nakshatra] = generate_item(
+            prompts["nakshatras"][nakshatra], 100, "nakshatras", nakshatra,
+            f"nakshatra:{nakshatra}", metrics, log,
+        )
+
+    # Keep the canonical nakshatra order
+    return {name: snippets[name] for name in prompts["nakshatras"]}
+
+
+def generate_nakshatra_snippets(
+    prompts: Dict,
+    metrics: Optional[RunMetrics] = None,
+    log: Optional[ContentLog] = None,
+) -> Dict[str, str]:
+    """Generate snippets for all 27 nakshatras"""
+    if prompts.get("nakshatra_batches"):
+        snippets = generate_batched_nakshatra_snippets(prompts, metrics, log)
+    else:
+        snippets = {}
+        for i, (nakshatra, prompt) in enumerate(prompts["nakshatras"].items()):
+            print(f"Generating {nakshatra} snippet... ({i+1}/27)")
+            snippets[nakshatra] = generate_item(
+                prompt, 100, "nakshatras", nakshatra,
+                f"nakshatra:{nakshatra}", metrics, log,
+            )
+
+    if log is not None:
+        log.complete_section("nakshatras")
     return snippets
 
 
-def generate_weekly_content(weekly_data: Optional[Dict] = None) -> Dict:
-    """Generate all weekly horoscope content"""
+def generate_weekly_content(
+    weekly_data: Optional[Dict] = None,
+    metrics: Optional[RunMetrics] = None,
+    nakshatra_grouping: Optional[str] = None,
+    log_path: Optional[str] = None,
+) -> Dict:
+    """Generate all weekly horoscope content
+
+    Pass a RunMetrics instance to keep the per-call metrics for a run report.
+    Set nakshatra_grouping to "lord" (9 calls) or "all" (1 call) to generate the
+    27 nakshatra snippets with multi-output calls instead of one call each.
 
-    start_time = time.time()
+    Each result is appended to a JSONL content log (default
+    weekly_horoscope_<week_start>.jsonl) as soon as it is generated, and the
+    returned content is built from that log. Rerunning after a crash resumes
+    from the log instead of regenerating finished items.
+    """
+
+    from weekly_horoscope_generator import generate_all_prompts, DASHA_CONTEXT_TEMPLATES
+
+    if metrics is None:
+        metrics = RunMetrics(MODEL)
 
     # Generate transit data if not provided
     if weekly_data is None:
+        from weekly_transit_analyzer import generate_weekly_analysis
         print("Analyzing weekly transits...")
         weekly_data = generate_weekly_analysis()
 
     # Generate prompts
     print("Generating prompts...")
-    prompts = generate_all_prompts(weekly_data)
-
-    # Call API for each component
-    content = {
-        "week_start": weekly_data["week_start"],
-        "week_end": weekly_data["week_end"],
-        "generated_at": datetime.now().isoformat(),
-        "master_overview": generate_master_overview(prompts),
-        "moon_signs": generate_moon_sign_horoscopes(prompts),
-        "nakshatras": generate_nakshatra_snippets(prompts),
-        "dasha_contexts": DASHA_CONTEXT_TEMPLATES,  # Pre-written, no API call
-    }
+    prompts = generate_all_prompts(weekly_data, nakshatra_grouping)
+
+    if log_path is None:
+        log_path = log_filename_for(weekly_data["week_start"])
+    print(f"Streaming results to {log_path}")
+
+    # Call API for each component, logging each result as it completes
+    with ContentLog(log_path, weekly_data["week_start"], weekly_data["week_end"]) as log:
+        generate_master_overview(prompts, metrics, log)
+        generate_moon_sign_horoscopes(prompts, metrics, log)
+        generate_nakshatra_snippets(prompts, metrics, log)
+        log.complete()
+        content = log.build_content()
 
-    elapsed = time.time() - start_time
-    print(f"\nCompleted in {elapsed:.1f} seconds")
-    print(f"Total API calls: 40 (1 overview + 12 signs + 27 nakshatras)")
+    content["dasha_contexts"] = DASHA_CONTEXT_TEMPLATES  # Pre-written, no API call
+
+    metrics.finish()
+    print(f"\nCompleted in {metrics.elapsed:.1f} seconds")
+    print(metrics.format_summary())
 
     return content
 
 
 def save_content_to_file(content: Dict, filename: str = None) -> str:
-    """Save generated content to JSON file"""
+    """Save generated content to JSON file (or compact binary if filename ends in .cbc)"""
+    from binary_codec import save
+
     if filename is None:
         filename = f"weekly_horoscope_{content['week_start']}.json"
 
-    with open(filename, 'w') as f:
-        json.dump(content, f, indent=2)
+    save(content, filename, compress=True)
 
     print(f"Saved to {filename}")
     return filename
 
 
-def upload_to_supabase(content: Dict) -> bool:
-    """Upload weekly content to Supabase for email distribution"""
-    supabase_url = os.environ.get("SUPABASE_URL")
-    supabase_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+def content_component_rows(content: Dict) -> List[Dict]:
+    """Split weekly content into one row per component (overview, sign, nakshatra, dasha)"""
+    rows = []
+    base = {"week_start": content["week_start"], "week_end": content["week_end"]}
+
+    for section in ("master_overview", "moon_signs", "nakshatras", "dasha_contexts"):
+        value = content.get(section)
+        if isinstance(value, dict):
+            for key, text in value.items():
+                rows.append({**base, "section": section, "key": key, "content": text})
+        elif value is not None:
+            rows.append({**base, "section": section, "key": "", "content": value})
+
+    return rows
 
-    if not supabase_url or not supabase_key:
+
+def upload_to_supabase(
+    content: Dict,
+    client: Optional["SupabaseClient"] = None,
+    components: bool = False,
+) -> bool:
+    """Upload weekly content to Supabase for email distribution
+
+    Upserts the full content row used by send-weekly-horoscope; with
+    components=True also bulk-upserts one row per component.
+    """
+    from supabase_client import SupabaseClient, SupabaseError
+
+    if client is None:
+        client = SupabaseClient.from_env()
+    if client is None:
         print("Supabase credentials not found. Skipping upload.")
         print("Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY to enable.")
         return False
 
     try:
-        # Prepare the payload
-        payload = {
+        # Upsert to weekly_horoscope_content table
+        client.upsert("weekly_horoscope_content", [{
             "week_start": content["week_start"],
             "week_end": content["week_end"],
             "content": content,
-        }
+        }])
 
-        # Upsert to weekly_horoscope_content table
-        response = requests.post(
-            f"{supabase_url}/rest/v1/weekly_horoscope_content",
-            headers={
-                "apikey": supabase_key,
-                "Authorization": f"Bearer {supabase_key}",
-                "Content-Type": "application/json",
-                "Prefer": "resolution=merge-duplicates",
-            },
-            json=payload,
-        )
+        if components:
+            rows = content_component_rows(content)
+            client.upsert(
+                "weekly_horoscope_components", rows,
+                on_conflict="week_start,section,key",
+            )
+            print(f"Uploaded {len(rows)} component rows")
 
-        if response.status_code in (200, 201):
-            print(f"Uploaded to Supabase successfully")
-            return True
-        else:
-            print(f"Supabase upload failed: {response.status_code} - {response.text}")
-            return False
+        print(f"Uploaded to Supabase successfully")
+        return True
 
-    except Exception as e:
-        print(f"Supabase upload error: {e}")
+    except SupabaseError as e:
+        print(f"Supabase upload failed: {e}")
         return False
 
 
-def trigger_email_send(test_mode: bool = False, test_email: str = None) -> bool:
+def upload_personalized_forecasts(
+    forecasts: List[Dict],
+    client: Optional["SupabaseClient"] = None,
+    chunk_size: Optional[int] = None,
+) -> int:
+    """Bulk upsert per-user rows into personalized_weekly_forecasts in chunks
+
+    Each forecast needs kundli_id, week_start, week_end and forecast_content.
+    chunk_size defaults to supabase_client.UPSERT_CHUNK_SIZE.
+    Returns the number of rows uploaded (0 if credentials are missing).
+    """
+    from supabase_client import SupabaseClient, SupabaseError, UPSERT_CHUNK_SIZE
+
+    if chunk_size is None:
+        chunk_size = UPSERT_CHUNK_SIZE
+    if client is None:
+        client = SupabaseClient.from_env()
+    if client is None:
+        print("Supabase credentials not found. Skipping personalized upload.")
+        return 0
+
+    try:
+        sent = client.upsert(
+            "personalized_weekly_forecasts", forecasts,
+            on_conflict="kundli_id,week_start",
+            chunk_size=chunk_size,
+        )
+    except SupabaseError as e:
+        print(f"Personalized upload failed at chunk {e.chunk}: {e}")
+        sent = e.rows_sent
+
+    print(f"Uploaded {sent}/{len(forecasts)} personalized forecasts")
+    return sent
+
+
+def trigger_email_send(
+    test_mode: bool = False,
+    test_email: str = None,
+    client: Optional["SupabaseClient"] = None,
+) -> bool:
     """Trigger the Supabase edge function to send weekly emails"""
-    supabase_url = os.environ.get("SUPABASE_URL")
-    supabase_key = os.environ.get("SUPABASE_ANON_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    from supabase_client import SupabaseClient, SupabaseError
 
-    if not supabase_url or not supabase_key:
+    if client is None:
+        client = SupabaseClient.from_env(key_vars=("SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY"))
+    if client is None:
         print("Supabase credentials not found. Cannot trigger email send.")
         return False
 
@@ -178,25 +519,13 @@ def trigger_email_send(test_mode: bool = False, test_email: str = None) -> bool:
             if test_email:
                 payload["test_email"] = test_email
 
-        response = requests.post(
-            f"{supabase_url}/functions/v1/send-weekly-horoscope",
-            headers={
-                "Authorization": f"Bearer {supabase_key}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
-
-        if response.status_code == 200:
-            result = response.json()
-            print(f"Email send triggered: {result.get('sent', 0)} sent, {result.get('failed', 0)} failed")
-            return True
-        else:
-            print(f"Email trigger failed: {response.status_code} - {response.text}")
-            return False
+        response = client.invoke_function("send-weekly-horoscope", payload)
+        result = response.json()
+        print(f"Email send triggered: {result.get('sent', 0)} sent, {result.get('failed', 0)} failed")
+        return True
 
-    except Exception as e:
-        print(f"Email trigger error: {e}")
+    except SupabaseError as e:
+        print(f"Email trigger failed: {e}")
         return False
 
 
@@ -253,11 +582,19 @@ Want deeper insights? Get your personalized 2026 Cosmic Brief
 
 if __name__ == "__main__":
     import argparse
+    from weekly_transit_analyzer import generate_weekly_analysis
+    from weekly_horoscope_generator import generate_all_prompts, NAKSHATRA_GROUPINGS
 
     parser = argparse.ArgumentParser(description="Generate weekly horoscope content")
     parser.add_argument("--upload", action="store_true", help="Upload to Supabase after generating")
+    parser.add_argument("--upload-components", action="store_true",
+                        help="Also upload one row per component to weekly_horoscope_components")
     parser.add_argument("--send-emails", action="store_true", help="Trigger email send after uploading")
     parser.add_argument("--test-email", type=str, help="Send test email to this address only")
+    parser.add_argument("--nakshatra-batching", choices=NAKSHATRA_GROUPINGS,
+                        help="Generate nakshatra snippets in multi-output calls grouped by lord, or all at once")
+    parser.add_argument("--metrics-textfile", type=str,
+                        help="Also write run metrics in Prometheus textfile format to this path")
     args = parser.parse_args()
 
     print("=" * 60)
@@ -283,17 +620,24 @@ if __name__ == "__main__":
         print("\n API key found. Generating content...\n")
 
         # Generate all content
-        content = generate_weekly_content()
+        metrics = RunMetrics(MODEL)
+        content = generate_weekly_content(
+            metrics=metrics,
+            nakshatra_grouping=args.nakshatra_batching,
+        )
 
-        # Save to file
-        save_content_to_file(content)
+        # Save to file, with the run report alongside
+        filename = save_content_to_file(content)
+        save_run_report(metrics, filename)
+        if args.metrics_textfile:
+            write_prometheus_textfile(metrics, args.metrics_textfile)
 
         # Upload to Supabase if requested
         if args.upload:
             print("\n" + "=" * 60)
             print("UPLOADING TO SUPABASE")
             print("=" * 60)
-            upload_to_supabase(content)
+            upload_to_supabase(content, components=args.upload_components)
 
         # Trigger email send if requested
         if args.send_emails:
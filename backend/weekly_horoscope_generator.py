@@ -63,6 +63,24 @@ Write a brief, specific insight about this week for this nakshatra. Focus on:
 Keep it to 1-2 sentences. Be specific, not generic.
 """
 
+NAKSHATRA_BATCH_PROMPT = """You are an expert Vedic astrologer. Write a 1-2 sentence personalized snippet for each of the nakshatras below, for someone with Moon in that nakshatra, for the week of {week_start} to {week_end}.
+
+{nakshatra_details}
+
+For each nakshatra, write a brief, specific insight about this week. Focus on:
+- The day Moon transits their nakshatra (if applicable)
+- How their nakshatra lord's current position affects them
+- One actionable insight
+
+Keep each snippet to 1-2 sentences. Be specific, not generic. Make each snippet distinct.
+
+Respond with ONLY a JSON object (no markdown, no commentary). Use exactly these keys: {nakshatra_keys}
+Each value is the snippet text for that nakshatra.
+"""
+
+# Ways to group nakshatra prompts into multi-output calls
+NAKSHATRA_GROUPINGS = ["lord", "all"]
+
 DASHA_CONTEXT_TEMPLATES = {
     "Sun": "You're in Sun mahadasha — a period emphasizing identity, authority, and self-expression. This week's transits interact with that solar energy.",
     "Moon": "You're in Moon mahadasha — a period of emotional processing, intuition, and inner development. This week's lunar journey is especially significant for you.",
@@ -108,6 +126,12 @@ def format_transit_data_for_prompt(weekly_data: Dict) -> str:
         for change in weekly_data["sign_changes"]:
             lines.append(f"- {change['planet']} moves from {change['from_sign']} to {change['to_sign']} on {change['weekday']}")
 
+    # Eclipses, new and full moons
+    if weekly_data.get("special_events"):
+        lines.append("\nECLIPSES AND LUNATIONS:")
+        for event in weekly_data["special_events"]:
+            lines.append(f"- {event['weekday']}: {event['description']}")
+
     return "\n".join(lines)
 
 
@@ -168,6 +192,27 @@ def get_nakshatra_lord_position(nakshatra_name: str, weekly_data: Dict) -> str:
     return f"transiting (check daily positions)"
 
 
+def format_nakshatra_details_for_prompt(nakshatra_names: List[str], weekly_data: Dict) -> str:
+    """Format per-nakshatra inputs for a batched prompt, stating each lord's position once"""
+
+    lines = []
+    described_lords = set()
+
+    for name in nakshatra_names:
+        lord = next(n["lord"] for n in NAKSHATRAS if n["name"] == name)
+        moon_day = find_nakshatra_transit_day(name, weekly_data)
+        lines.append(f"{name.upper()} (ruled by {lord})")
+        lines.append(f"- Moon transits this nakshatra on: {moon_day or 'not this week'}")
+        if lord not in described_lords:
+            lines.append(f"- Current position of {lord}: {get_nakshatra_lord_position(name, weekly_data)}")
+            described_lords.add(lord)
+        else:
+            lines.append(f"- Current position of {lord}: as above")
+        lines.append("")
+
+    return "\n".join(lines).rstrip()
+
+
 # ============================================
 # PROMPT GENERATORS
 # ============================================
@@ -225,8 +270,51 @@ def generate_nakshatra_snippet_prompt(nakshatra_name: str, weekly_data: Dict) ->
     )
 
 
-def generate_all_prompts(weekly_data: Dict) -> Dict:
-    """Generate all prompts needed for weekly horoscope generation"""
+def generate_nakshatra_batch_prompt(nakshatra_names: List[str], weekly_data: Dict) -> str:
+    """Generate a single structured-output prompt covering several nakshatras"""
+
+    for name in nakshatra_names:
+        if not any(n["name"] == name for n in NAKSHATRAS):
+            raise ValueError(f"Unknown nakshatra: {name}")
+
+    return NAKSHATRA_BATCH_PROMPT.format(
+        week_start=weekly_data["week_start"],
+        week_end=weekly_data["week_end"],
+        nakshatra_details=format_nakshatra_details_for_prompt(nakshatra_names, weekly_data),
+        nakshatra_keys=json.dumps(nakshatra_names),
+    )
+
+
+def generate_nakshatra_batch_prompts(weekly_data: Dict, grouping: str = "lord") -> Dict[str, Dict]:
+    """Group the 27 nakshatras into multi-output prompts
+
+    grouping="lord" makes one prompt per nakshatra lord (9 prompts of 3 nakshatras,
+    which share the same lord position); grouping="all" makes a single prompt.
+    Returns {batch_key: {"nakshatras": [...], "prompt": str}}.
+    """
+    if grouping not in NAKSHATRA_GROUPINGS:
+        raise ValueError(f"Unknown nakshatra grouping: {grouping}")
+
+    groups: Dict[str, List[str]] = {}
+    for nakshatra in NAKSHATRAS:
+        key = nakshatra["lord"] if grouping == "lord" else "all"
+        groups.setdefault(key, []).append(nakshatra["name"])
+
+    return {
+        key: {
+            "nakshatras": names,
+            "prompt": generate_nakshatra_batch_prompt(names, weekly_data),
+        }
+        for key, names in groups.items()
+    }
+
+
+def generate_all_prompts(weekly_data: Dict, nakshatra_grouping: Optional[str] = None) -> Dict:
+    """Generate all prompts needed for weekly horoscope generation
+
+    If nakshatra_grouping is set ("lord" or "all"), batched nakshatra prompts are
+    added under "nakshatra_batches" alongside the 27 single prompts.
+    """
 
     prompts = {
         "master_overview": generate_master_overview_prompt(weekly_data),
@@ -247,6 +335,11 @@ def generate_all_prompts(weekly_data: Dict) -> Dict:
             nakshatra["name"], weekly_data
         )
 
+    if nakshatra_grouping:
+        prompts["nakshatra_batches"] = generate_nakshatra_batch_prompts(
+            weekly_data, nakshatra_grouping
+        )
+
     return prompts
 
 
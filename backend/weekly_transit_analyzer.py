@@ -3,8 +3,10 @@ Weekly Transit Analyzer for Vedic Astrology
 Analyzes planetary movements and generates summaries for horoscope generation
 """
 
+import os
+import sys
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from vedic_calculator import (
     get_all_planetary_positions,
     get_sign_from_longitude,
@@ -13,6 +15,8 @@ from vedic_calculator import (
     NAKSHATRAS,
     DASHA_YEARS,
 )
+from event_calendar import describe, events_between
+from ashtakavarga import STRONG_BINDUS, STRONG_SARVA, WEAK_BINDUS, chart_ashtakavarga
 
 # Planetary aspects in Vedic astrology (from the planet's position)
 # These are the houses a planet aspects (1st is conjunction)
@@ -57,21 +61,31 @@ def get_week_dates(start_date: Optional[datetime] = None) -> List[datetime]:
     return [start_date + timedelta(days=i) for i in range(7)]
 
 
-def get_moon_journey(week_dates: List[datetime]) -> List[Dict]:
-    """Track Moon's journey through signs and nakshatras for the week"""
+def get_moon_journey(week_dates: List[datetime], location: Optional[Tuple[float, float]] = None) -> List[Dict]:
+    """Track Moon's journey through signs and nakshatras for the week
+
+    Without a location the Moon is sampled at 06:00, noon and 18:00 UTC. With a
+    (latitude, longitude) it is sampled at that day's sunrise, midday and sunset,
+    so each day is the Vedic day starting at local sunrise.
+    """
     journey = []
 
     for date in week_dates:
-        # Get positions at 6 AM, noon, and 6 PM to catch sign changes
-        times = [6, 12, 18]
+        # Get positions at 6 AM, noon, and 6 PM (or sunrise, midday and sunset) to catch sign changes
+        if location:
+            from sunrise import sun_times
+            sun = sun_times(location[0], location[1], date)
+            times = [sun["sunrise"], sun["sunrise"] + (sun["sunset"] - sun["sunrise"]) / 2, sun["sunset"]]
+        else:
+            sun = None
+            times = [date.replace(hour=hour, minute=0, second=0) for hour in (6, 12, 18)]
         day_positions = []
 
-        for hour in times:
-            dt = date.replace(hour=hour, minute=0, second=0)
+        for dt in times:
             positions = get_all_planetary_positions(dt)
             moon = positions["Moon"]
             day_positions.append({
-                "time": f"{hour:02d}:00",
+                "time": dt.strftime("%H:%M"),
                 "sign": moon["sign"],
                 "nakshatra": moon["nakshatra"],
                 "longitude": moon["longitude"],
@@ -94,6 +108,9 @@ def get_moon_journey(week_dates: List[datetime]) -> List[Dict]:
             "nakshatra_change": nakshatra_change,
             "positions": day_positions,
         })
+        if sun:
+            journey[-1]["sunrise"] = sun["sunrise"].strftime("%Y-%m-%dT%H:%M:%S")
+            journey[-1]["sunset"] = sun["sunset"].strftime("%Y-%m-%dT%H:%M:%S")
 
     return journey
 
@@ -197,14 +214,56 @@ def check_sign_changes(week_dates: List[datetime]) -> List[Dict]:
     return changes
 
 
+def get_special_events(week_dates: List[datetime]) -> List[Dict]:
+    """Eclipses, new moons and full moons this week (from the cached yearly event calendar)"""
+    week_start = week_dates[0].replace(hour=0, minute=0, second=0, microsecond=0)
+    found = events_between(week_start, week_start + timedelta(days=len(week_dates)))
+    eclipse_jds = [e["jd"] for e in found if e["node"]]
+    events = []
+
+    for event in found:
+        # An eclipse already is its new or full moon
+        if not event["node"] and any(abs(event["jd"] - jd) < 1 for jd in eclipse_jds):
+            continue
+        date = datetime.strptime(event["time"], "%Y-%m-%dT%H:%M")
+        events.append({
+            "type": event["type"],
+            "kind": event["kind"],
+            "time": event["time"],
+            "date": date.strftime("%Y-%m-%d"),
+            "weekday": date.strftime("%A"),
+            "sign": SIGNS[event["sign_index"]],
+            "sign_index": event["sign_index"],
+            "nakshatra": NAKSHATRAS[event["nakshatra_index"]]["name"],
+            "node": event["node"],
+            "description": describe(event),
+        })
+
+    return events
+
+
 def get_house_from_moon(transit_sign_index: int, natal_moon_sign_index: int) -> int:
     """Calculate which house a transiting planet is in relative to natal Moon sign"""
     house = (transit_sign_index - natal_moon_sign_index) % 12 + 1
     return house
 
 
-def analyze_week_for_moon_sign(moon_sign_index: int, weekly_data: Dict) -> Dict:
-    """Analyze the week's transits for a specific Moon sign"""
+def ordinal(house: int) -> str:
+    return f"{house}{'st' if house == 1 else 'th'}"
+
+
+def analyze_week_for_moon_sign(moon_sign_index: int, weekly_data: Dict, ashtakavarga: Optional[Dict] = None) -> Dict:
+    """Analyze the week's transits for a specific Moon sign
+
+    With a chart's ashtakavarga (ashtakavarga.chart_ashtakavarga), each transit also gets
+    the planet's natal bindus in the sign it occupies, and those bindus adjust the
+    house-based notes: a hard house with strong bindus is softened, a good house with
+    weak bindus is tempered.
+    """
+    def bindus(planet: str, sign_index: int) -> Optional[int]:
+        if ashtakavarga is None or planet not in ashtakavarga["bhinna"]:
+            return None
+        return ashtakavarga["bhinna"][planet][sign_index]
 
     moon_sign = SIGNS[moon_sign_index]
     analysis = {
@@ -220,55 +279,109 @@ def analyze_week_for_moon_sign(moon_sign_index: int, weekly_data: Dict) -> Dict:
     for day in weekly_data["moon_journey"]:
         transit_moon_index = day["moon_sign"]["index"]
         house = get_house_from_moon(transit_moon_index, moon_sign_index)
+        moon_bindus = bindus("Moon", transit_moon_index)
         analysis["moon_journey_houses"].append({
             "date": day["date"],
             "weekday": day["weekday"],
             "house": house,
             "nakshatra": day["moon_nakshatra"]["name"],
         })
+        if moon_bindus is not None:
+            analysis["moon_journey_houses"][-1]["bindus"] = moon_bindus
 
         # Flag significant Moon transits
         if house in [1, 4, 7, 10]:  # Angular houses
+            strength = f", {moon_bindus} bindus" if moon_bindus is not None else ""
             analysis["key_days"].append({
                 "date": day["date"],
                 "weekday": day["weekday"],
-                "reason": f"Moon transits your {house}{'st' if house == 1 else 'th'} house (angular)",
+                "reason": f"Moon transits your {ordinal(house)} house (angular{strength})",
             })
 
     # Analyze slow planet positions relative to Moon sign
     for planet, data in weekly_data["slow_planets"].items():
         transit_index = data["sign"]["index"]
         house = get_house_from_moon(transit_index, moon_sign_index)
+        planet_bindus = bindus(planet, transit_index)
+        strong = planet_bindus is not None and planet_bindus >= STRONG_BINDUS
+        weak = planet_bindus is not None and planet_bindus <= WEAK_BINDUS
 
         analysis["slow_planet_houses"][planet] = {
             "house": house,
             "sign": data["sign"]["vedic"],
             "retrograde": data["retrograde"],
         }
+        if planet_bindus is not None:
+            analysis["slow_planet_houses"][planet]["bindus"] = planet_bindus
+            analysis["slow_planet_houses"][planet]["sarva_bindus"] = ashtakavarga["sarva"][transit_index]
 
-        # Note challenging or supportive placements
+        # Note challenging or supportive placements, weighed by natal bindus when known
         if planet == "Saturn":
             if house in [1, 4, 7, 10]:
-                analysis["challenges"].append(f"Saturn in {house}{'st' if house == 1 else 'th'} house demands discipline")
+                if strong:
+                    analysis["opportunities"].append(
+                        f"Saturn in {ordinal(house)} house demands discipline, and {planet_bindus} bindus reward it")
+                else:
+                    analysis["challenges"].append(f"Saturn in {ordinal(house)} house demands discipline")
             elif house in [3, 6, 11]:
-                analysis["opportunities"].append(f"Saturn in {house}{'th'} house supports steady effort")
+                if weak:
+                    analysis["challenges"].append(
+                        f"Saturn in {house}th house supports steady effort, but with {planet_bindus} bindus results come slowly")
+                else:
+                    analysis["opportunities"].append(f"Saturn in {house}{'th'} house supports steady effort")
 
         if planet == "Jupiter":
-            if house in [1, 5, 9]:
-                analysis["opportunities"].append(f"Jupiter in {house}{'st' if house == 1 else 'th'} house brings expansion")
-            elif house in [2, 11]:
-                analysis["opportunities"].append(f"Jupiter in {house}{'th'} house favors finances")
+            if house in [1, 2, 5, 9, 11]:
+                promise = "brings expansion" if house in [1, 5, 9] else "favors finances"
+                if weak:
+                    analysis["challenges"].append(
+                        f"Jupiter in {ordinal(house)} house {promise}, though {planet_bindus} bindus keep it modest")
+                else:
+                    analysis["opportunities"].append(f"Jupiter in {ordinal(house)} house {promise}")
+
+        # Any slow planet in a sign it strongly or weakly supports in the natal chart
+        if planet not in ("Saturn", "Jupiter") and planet_bindus is not None:
+            if strong and ashtakavarga["sarva"][transit_index] >= STRONG_SARVA:
+                analysis["opportunities"].append(
+                    f"{planet} moves through a well-supported sign for you ({planet_bindus} bindus)")
+            elif weak:
+                analysis["challenges"].append(f"{planet} moves through a weak sign for you ({planet_bindus} bindus)")
+
+    # Eclipses and lunations by house (older saved analyses have no special_events)
+    for event in weekly_data.get("special_events", []):
+        house = get_house_from_moon(event["sign_index"], moon_sign_index)
+        if event["node"]:
+            analysis["key_days"].append({
+                "date": event["date"],
+                "weekday": event["weekday"],
+                "reason": f"{event['description']} falls in house {house} from your Moon",
+            })
+            analysis["challenges"].append(f"Eclipse in house {house} from your Moon: avoid forcing new starts there")
+        else:
+            lunation = "New moon" if event["type"] == "new_moon" else "Full moon"
+            analysis["key_days"].append({
+                "date": event["date"],
+                "weekday": event["weekday"],
+                "reason": f"{lunation} in house {house} from your Moon",
+            })
 
     return analysis
 
 
-def generate_weekly_analysis(start_date: Optional[datetime] = None) -> Dict:
-    """Generate complete weekly transit analysis"""
+def generate_weekly_analysis(
+    start_date: Optional[datetime] = None,
+    location: Optional[Tuple[float, float]] = None,
+) -> Dict:
+    """Generate complete weekly transit analysis
+
+    location (latitude, longitude) makes the Moon's journey follow sunrise-based
+    Vedic days there; without it days run midnight to midnight UTC.
+    """
 
     week_dates = get_week_dates(start_date)
 
     # Core data collection
-    moon_journey = get_moon_journey(week_dates)
+    moon_journey = get_moon_journey(week_dates, location)
     slow_planets = get_slow_planet_positions(week_dates[0])
 
     # Get all positions for aspect checking
@@ -276,6 +389,7 @@ def generate_weekly_analysis(start_date: Optional[datetime] = None) -> Dict:
     all_positions = get_all_planetary_positions(mid_week.replace(hour=12))
     aspects = check_planet_aspects(all_positions)
     sign_changes = check_sign_changes(week_dates)
+    special_events = get_special_events(week_dates)
 
     weekly_data = {
         "week_start": week_dates[0].strftime("%Y-%m-%d"),
@@ -284,6 +398,7 @@ def generate_weekly_analysis(start_date: Optional[datetime] = None) -> Dict:
         "slow_planets": slow_planets,
         "aspects": aspects,
         "sign_changes": sign_changes,
+        "special_events": special_events,
     }
 
     # Generate analysis for each Moon sign
@@ -296,6 +411,11 @@ def generate_weekly_analysis(start_date: Optional[datetime] = None) -> Dict:
     return weekly_data
 
 
+def analyze_week_for_chart(chart: Dict, weekly_data: Dict) -> Dict:
+    """Moon-sign analysis for one natal chart (get_full_birth_chart), weighed by its ashtakavarga"""
+    return analyze_week_for_moon_sign(chart["moon_sign"]["index"], weekly_data, chart_ashtakavarga(chart))
+
+
 def format_weekly_summary(weekly_data: Dict) -> str:
     """Format weekly analysis as readable summary"""
 
@@ -339,6 +459,13 @@ def format_weekly_summary(weekly_data: Dict) -> str:
                 f"(~{change['weekday']})"
             )
 
+    # Eclipses and lunations
+    if weekly_data.get("special_events"):
+        output.append("\n ECLIPSES AND LUNATIONS")
+        output.append("-" * 40)
+        for event in weekly_data["special_events"]:
+            output.append(f"{event['weekday'][:3]} {event['time'][11:]} UTC: {event['description']}")
+
     return "\n".join(output)
 
 
@@ -360,7 +487,8 @@ def format_moon_sign_analysis(analysis: Dict) -> str:
     output.append("\n Slow planets in your houses:")
     for planet, data in analysis["slow_planet_houses"].items():
         retro = " (R)" if data["retrograde"] else ""
-        output.append(f"  {planet}: House {data['house']}{retro}")
+        strength = f", {data['bindus']} bindus" if data.get("bindus") is not None else ""
+        output.append(f"  {planet}: House {data['house']}{retro}{strength}")
 
     # Key days
     if analysis["key_days"]:
@@ -383,6 +511,12 @@ def format_moon_sign_analysis(analysis: Dict) -> str:
     return "\n".join(output)
 
 
+# Opt-in profiling (COSMICBRIEF_PROFILE=flat|folded), see profiling.py
+if os.environ.get("COSMICBRIEF_PROFILE"):
+    import profiling
+    profiling.enable_from_env(sys.modules[__name__])
+
+
 # ============================================
 # TEST: Generate this week's analysis
 # ============================================
@@ -0,0 +1,294 @@
+"""
+Year-Ahead Forecast Engine
+Sign ingresses, retrograde/direct stations and dasha changes for a year, per subscriber
+
+The astronomy is the same for everyone, so a year's global events come from one daily
+ephemeris pass (one calc_ut per planet per day) with each crossing refined to the minute,
+and are cached per year (in memory, and optionally as year_events_<year>.cbc on disk).
+A subscriber's timeline is then just those events placed in houses from their natal Moon
+and Lagna, merged with their DashaTimeline changes: no ephemeris calls per subscriber.
+
+Usage:
+    events = global_events(2026)                           # computed once per year
+    timeline = build_year_ahead(chart, DashaTimeline(moon_longitude, birth_dt), datetime(2026, 1, 1))
+    timeline = year_ahead_for_birth(birth_dt, lat, lon, 2026, tz="America/Los_Angeles")
+"""
+
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from vedic_calculator import (
+    PLANETS,
+    SIGNS,
+    datetime_to_jd,
+    get_ayanamsa,
+    get_sidereal_position,
+    get_full_birth_chart,
+)
+from dasha_timeline import DashaTimeline
+from timezones import TimezoneLike, to_utc
+
+# Moon is left out: it changes sign every 2.5 days and is covered week by week
+YEAR_AHEAD_BODIES = ["Sun", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu"]
+
+# Bodies that station (Sun never does; the mean node only moves backwards)
+STATION_BODIES = ["Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+
+# Crossings are refined by bisection down to this many days (one minute)
+REFINE_TOLERANCE_DAYS = 1 / 1440
+
+EVENT_CACHE_FILE = "year_events_{year}.cbc"
+
+
+# ============================================
+# GLOBAL EVENTS (shared by every subscriber)
+# ============================================
+
+def daily_positions(year: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Julian days, sidereal longitudes and speeds at 00:00 UTC for every day of the year
+
+    Samples run from January 1 to January 1 of the next year inclusive, so crossings on
+    December 31 are caught. Longitudes and speeds have shape (days + 1, len(YEAR_AHEAD_BODIES)).
+    """
+    start_jd = datetime_to_jd(datetime(year, 1, 1))
+    days = (datetime(year + 1, 1, 1) - datetime(year, 1, 1)).days
+    jds = start_jd + np.arange(days + 1, dtype=np.float64)
+
+    longitudes = np.empty((len(jds), len(YEAR_AHEAD_BODIES)))
+    speeds = np.empty_like(longitudes)
+    for i, jd in enumerate(jds.tolist()):
+        ayanamsa = get_ayanamsa(jd)
+        for j, body in enumerate(YEAR_AHEAD_BODIES):
+            result = swe.calc_ut(jd, PLANETS[body])
+            longitudes[i, j] = result[0][0] - ayanamsa
+            speeds[i, j] = result[0][3]
+
+    return jds, np.mod(longitudes, 360.0), speeds
+
+
+def sign_at(jd: float, body: str) -> int:
+    return int(get_sidereal_position(jd, PLANETS[body]) // 30) % 12
+
+
+def speed_at(jd: float, body: str) -> float:
+    return swe.calc_ut(jd, PLANETS[body])[0][3]
+
+
+def refine(lo: float, hi: float, changed) -> float:
+    """Bisect [lo, hi] for the moment changed(jd) first becomes true"""
+    while hi - lo > REFINE_TOLERANCE_DAYS:
+        mid = (lo + hi) / 2
+        if changed(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def jd_to_datetime(jd: float, year_start_jd: float, year: int) -> datetime:
+    """Naive UTC datetime for a Julian day inside year, rounded to the minute"""
+    return datetime(year, 1, 1) + timedelta(minutes=round((jd - year_start_jd) * 1440))
+
+
+def event(time: datetime, kind: str, body: str, sign_index: int, direction: Optional[str] = None) -> Dict:
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M"),
+        "type": kind,
+        "planet": body,
+        "sign_index": sign_index,
+        "direction": direction,
+    }
+
+
+def compute_global_events(year: int) -> List[Dict]:
+    """Ingresses and stations for the year, in time order (see global_events for the cached version)"""
+    jds, longitudes, speeds = daily_positions(year)
+    signs = (longitudes // 30).astype(np.int64) % 12
+    year_start_jd = jds[0]
+    events = []
+
+    for j, body in enumerate(YEAR_AHEAD_BODIES):
+        for i in np.flatnonzero(signs[1:, j] != signs[:-1, j]).tolist():
+            old_sign = int(signs[i, j])
+            jd = refine(jds[i], jds[i + 1], lambda t: sign_at(t, body) != old_sign)
+            new_sign = sign_at(jd, body)
+            time = jd_to_datetime(jd, year_start_jd, year)
+            events.append(event(time, "ingress", body, new_sign))
+            if body == "Rahu":
+                events.append(event(time, "ingress", "Ketu", (new_sign + 6) % 12))
+
+        if body not in STATION_BODIES:
+            continue
+        retrograde = speeds[:, j] < 0
+        for i in np.flatnonzero(retrograde[1:] != retrograde[:-1]).tolist():
+            was_retrograde = bool(retrograde[i])
+            jd = refine(jds[i], jds[i + 1], lambda t: (speed_at(t, body) < 0) != was_retrograde)
+            direction = "direct" if was_retrograde else "retrograde"
+            events.append(event(jd_to_datetime(jd, year_start_jd, year), "station", body,
+                                sign_at(jd, body), direction))
+
+    events.sort(key=lambda e: e["time"])
+    return events
+
+
+@lru_cache(maxsize=None)
+def _cached_global_events(year: int, cache_dir: Optional[str]) -> Tuple[Dict, ...]:
+    if cache_dir:
+        from binary_codec import load, save
+
+        path = os.path.join(cache_dir, EVENT_CACHE_FILE.format(year=year))
+        if os.path.exists(path):
+            try:
+                return tuple(load(path))
+            except ValueError as e:  # CodecError or JSON error: a corrupt file is a miss
+                print(f"Ignoring corrupt event cache {path}: {e}")
+        events = compute_global_events(year)
+        os.makedirs(cache_dir, exist_ok=True)
+        save(events, path)
+        return tuple(events)
+    return tuple(compute_global_events(year))
+
+
+def global_events(year: int, cache_dir: Optional[str] = None) -> Tuple[Dict, ...]:
+    """The year's ingresses and stations, computed once per process (and once per cache_dir)
+
+    Events are dicts with "time" (UTC, YYYY-MM-DDTHH:MM), "type" ("ingress" or "station"),
+    "planet", "sign_index" and "direction" ("retrograde"/"direct" for stations, else None).
+    Treat them as read-only: the same dicts are returned to every caller.
+    """
+    return _cached_global_events(year, cache_dir)
+
+
+def events_between(start: datetime, end: datetime, cache_dir: Optional[str] = None) -> List[Dict]:
+    """Global events with start <= time < end (naive UTC or tz-aware datetimes)"""
+    start, end = to_utc(start), to_utc(end)
+    lo, hi = start.strftime("%Y-%m-%dT%H:%M"), end.strftime("%Y-%m-%dT%H:%M")
+    # Event times are whole minutes, so the last one that can match is a minute before hi
+    # (an end of Jan 1 00:00 needs nothing from the new year)
+    last_year = (end.replace(second=0, microsecond=0) - timedelta(minutes=1)).year
+    return [
+        e for year in range(start.year, last_year + 1)
+        for e in global_events(year, cache_dir)
+        if lo <= e["time"] < hi
+    ]
+
+
+# ============================================
+# PER-SUBSCRIBER TIMELINE
+# ============================================
+
+def build_year_ahead(
+    chart: Dict,
+    timeline: DashaTimeline,
+    start: datetime,
+    end: Optional[datetime] = None,
+    cache_dir: Optional[str] = None,
+) -> Dict:
+    """Transit and dasha timeline for one natal chart (get_full_birth_chart output)
+
+    end defaults to 365 days after start. Transit events get the sign and the house
+    counted from the natal Moon and from the Lagna; dasha events come from the
+    timeline. Everything is sorted by time.
+    """
+    if end is None:
+        end = start + timedelta(days=365)
+
+    transits = events_between(start, end, cache_dir)
+    moon_sign = chart["moon_sign"]["index"]
+    lagna_sign = chart["ascendant"]["sign"]["index"]
+    sign_indices = np.array([e["sign_index"] for e in transits], dtype=np.int64)
+    houses_from_moon = ((sign_indices - moon_sign) % 12 + 1).tolist()
+    houses_from_lagna = ((sign_indices - lagna_sign) % 12 + 1).tolist()
+
+    entries = []
+    for e, from_moon, from_lagna in zip(transits, houses_from_moon, houses_from_lagna):
+        sign = SIGNS[e["sign_index"]]
+        entries.append({
+            "time": e["time"],
+            "date": e["time"][:10],
+            "type": e["type"],
+            "planet": e["planet"],
+            "direction": e["direction"],
+            "sign": sign["vedic"],
+            "western": sign["western"],
+            "house_from_moon": from_moon,
+            "house_from_lagna": from_lagna,
+        })
+
+    for change in timeline.changes_between(start, end):
+        entries.append({
+            "time": change["datetime"].strftime("%Y-%m-%dT%H:%M"),
+            "date": change["datetime"].strftime("%Y-%m-%d"),
+            "type": change["level"],
+            "mahadasha": change["mahadasha"],
+            "bhukti": change["bhukti"],
+            "end": change["end"],
+        })
+
+    entries.sort(key=lambda entry: entry["time"])
+    return {
+        "start": to_utc(start).strftime("%Y-%m-%d"),
+        "end": to_utc(end).strftime("%Y-%m-%d"),
+        "moon_sign": chart["moon_sign"]["vedic"],
+        "ascendant": chart["ascendant"]["sign"]["vedic"],
+        "dasha_at_start": timeline.at(start),
+        "events": entries,
+    }
+
+
+def year_ahead_for_birth(
+    birth_dt: datetime,
+    latitude: float,
+    longitude: float,
+    year: int,
+    tz: TimezoneLike = None,
+    cache_dir: Optional[str] = None,
+) -> Dict:
+    """Chart, dasha timeline and year-ahead events for a calendar year from birth details"""
+    birth_dt = to_utc(birth_dt, tz)
+    chart = get_full_birth_chart(birth_dt, latitude, longitude)
+    timeline = DashaTimeline(chart["planets"]["Moon"]["longitude"], birth_dt)
+    return build_year_ahead(chart, timeline, datetime(year, 1, 1), datetime(year + 1, 1, 1), cache_dir)
+
+
+# ============================================
+# EXAMPLE: 2026 for the sample chart, and per-subscriber cost
+# ============================================
+
+if __name__ == "__main__":
+    import time
+    import random
+
+    start = time.perf_counter()
+    events = global_events(2026)
+    print(f"2026 global events: {len(events)} ({(time.perf_counter() - start) * 1000:.0f} ms, once per year)")
+
+    report = year_ahead_for_birth(datetime(1986, 12, 26, 23, 50), 33.7879, -117.8531, 2026,
+                                  tz="America/Los_Angeles")
+    print(f"\nYear ahead 2026 - Moon in {report['moon_sign']}, {report['ascendant']} Lagna")
+    for entry in report["events"]:
+        if entry["type"] in ("mahadasha", "bhukti"):
+            print(f"  {entry['time']}  {entry['type']:<9} {entry['mahadasha']}/{entry['bhukti']} until {entry['end']}")
+        elif entry["planet"] not in ("Sun", "Mercury", "Venus"):
+            what = entry["direction"] or "enters"
+            print(f"  {entry['time']}  {entry['planet']:<9} {what} {entry['sign']} "
+                  f"(house {entry['house_from_moon']} from Moon, {entry['house_from_lagna']} from Lagna)")
+
+    rng = random.Random(40)
+    charts = [
+        get_full_birth_chart(datetime(1950, 1, 1) + timedelta(minutes=rng.randrange(60 * 24 * 365 * 55)),
+                             rng.uniform(-50, 60), rng.uniform(-180, 180))
+        for _ in range(200)
+    ]
+    timelines = [DashaTimeline(c["planets"]["Moon"]["longitude"], datetime.strptime(c["birth_time"], "%Y-%m-%d %H:%M:%S"))
+                 for c in charts]
+    start = time.perf_counter()
+    for chart, timeline in zip(charts, timelines):
+        build_year_ahead(chart, timeline, datetime(2026, 1, 1), datetime(2027, 1, 1))
+    per_user = (time.perf_counter() - start) / len(charts) * 1000
+    print(f"\nPer-subscriber timeline (natal chart and dasha timeline given): {per_user:.2f} ms")
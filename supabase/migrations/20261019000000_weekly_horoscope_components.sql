@@ -0,0 +1,25 @@
+-- Weekly Horoscope Components
+-- One row per generated component (overview, Moon sign, nakshatra, dasha context)
+-- Uploaded in bulk by backend/weekly_horoscope_api.py --upload-components
+
+CREATE TABLE IF NOT EXISTS weekly_horoscope_components (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  week_start DATE NOT NULL,
+  week_end DATE NOT NULL,
+  section TEXT NOT NULL, -- 'master_overview', 'moon_signs', 'nakshatras', 'dasha_contexts'
+  key TEXT NOT NULL DEFAULT '', -- sign/nakshatra/dasha lord, '' for the overview
+  content TEXT NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT now(),
+  UNIQUE(week_start, section, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_weekly_horoscope_components_week
+  ON weekly_horoscope_components(week_start);
+
+ALTER TABLE weekly_horoscope_components ENABLE ROW LEVEL SECURITY;
+
+-- Service role has full access (for the Python uploader and edge functions)
+CREATE POLICY "Service role full access on weekly_horoscope_components"
+  ON weekly_horoscope_components
+  FOR ALL
+  USING (auth.role() = 'service_role');